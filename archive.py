@@ -0,0 +1,144 @@
+'''
+Архив выполненных задач.
+
+Выполненные задачи, срок которых прошел больше ARCHIVE_AFTER_DAYS дней
+назад, переносятся из файла с данными в сжатый архив рядом с ним
+(см. TaskStore.archive). Поэтому файл с данными, который читается при
+запуске и перезаписывается при изменениях, содержит только рабочие
+задачи, а архив распаковывается, только когда поиск в нем запрошен.
+
+Архив только дописывается: каждая запись добавляет в конец файла
+новый сжатый поток gzip или lzma с задачами в формате csv без
+заголовка, а при чтении потоки распаковываются подряд.
+'''
+
+import csv
+import gzip
+import io
+import lzma
+import os
+from typing import Iterable, Iterator
+
+from pipeline import match_keyword, where
+from repository import get_file_signature
+from settings import ARCHIVE_COMPRESSION, FIELD_NAMES, FSYNC_POLICY
+
+
+ARCHIVE_SUFFIXES = {
+    'gzip': '.archive.gz',
+    'lzma': '.archive.xz',
+}
+
+
+class Archive():
+    '''
+    Сжатый архив задач рядом с файлом данных.
+
+    Распакованные задачи хранятся в памяти и распаковываются заново,
+    только если время изменения или размер архива изменились.
+    Если задача попала в архив несколько раз (например, запись
+    в файл с данными прервалась после записи в архив), то
+    возвращается последняя копия.
+
+    Атрибуты:
+        name: путь к файлу архива.
+        compression: 'gzip' или 'lzma'.
+
+    Методы:
+        read
+        append
+        search.
+    '''
+
+    def __init__(
+            self,
+            filename: str,
+            compression: str = ARCHIVE_COMPRESSION,
+            ):
+        '''
+        Атрибуты:
+            filename: путь к файлу с данными.
+            compression: 'gzip' или 'lzma', см. ARCHIVE_COMPRESSION.
+
+        Вызывает:
+            ValueError: если compression не поддерживается.
+        '''
+
+        if compression not in ARCHIVE_SUFFIXES:
+            raise ValueError(f'Неизвестный формат архива: {compression}')
+        self.name = filename + ARCHIVE_SUFFIXES[compression]
+        self.compression = compression
+        self._signature = None
+        self._rows = []
+
+    def _open(self, raw, mode: str):
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=raw, mode=mode)
+        return lzma.LZMAFile(raw, mode)
+
+    def _iter(self) -> Iterator[dict]:
+        if not os.path.isfile(self.name):
+            return
+        with open(self.name, 'rb') as raw, self._open(raw, 'rb') as packed:
+            file = io.TextIOWrapper(packed, encoding='utf-8', newline='')
+            yield from csv.DictReader(file, fieldnames=FIELD_NAMES)
+
+    def read(self) -> list[dict]:
+        '''Возвращает задачи архива, отсортированные по id.'''
+
+        signature = get_file_signature(self.name)
+        if signature != self._signature:
+            rows = {int(row.get('id')): row for row in self._iter()}
+            self._rows = [rows[id] for id in sorted(rows)]
+            self._signature = signature
+        return self._rows
+
+    def append(
+            self,
+            rows: Iterable[dict],
+            fsync: bool = FSYNC_POLICY == 'always',
+            ) -> None:
+        '''
+        Дописывает задачи в конец архива одним сжатым потоком.
+
+        Аргументы:
+            rows: задачи.
+            fsync: сбросить ли архив на диск до возврата, чтобы задачи
+            не потерялись, когда их удалят из файла с данными.
+        '''
+
+        with open(self.name, 'ab') as raw:
+            with self._open(raw, 'wb') as packed:
+                file = io.TextIOWrapper(packed, encoding='utf-8', newline='')
+                writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+                writer.writerows(rows)
+                file.flush()
+                file.detach()
+            if fsync:
+                raw.flush()
+                os.fsync(raw.fileno())
+
+    def search(self, params: dict, exclude=()) -> list[dict]:
+        '''
+        Поиск задач в архиве, см. TaskRepository.search.
+
+        Аргументы:
+            params: параметры поиска.
+            exclude: id задач, которые нужно пропустить, например,
+            задач, которые есть в файле с данными.
+
+        Возвращает:
+            список найденных задач, отсортированный по id.
+        '''
+
+        fields = {
+            field: value for field, value in params.items()
+            if field != 'keyword'
+        }
+        tasks = where(
+            (row for row in self.read() if int(row.get('id')) not in exclude),
+            **fields
+        )
+        if params.get('keyword') is not None:
+            tasks = match_keyword(tasks, params.get('keyword'))
+        return list(tasks)
@@ -0,0 +1,120 @@
+'''
+Атомарная перезапись файлов.
+
+Новое содержимое записывается во временный файл в той же папке, после
+чего он заменяет исходный файл через os.replace. Если программа
+завершится во время записи, то исходный файл останется целым, а
+временный файл будет удален или останется рядом с именем *.tmp.
+
+Когда данные сбрасываются на диск (os.fsync), определяет FSYNC_POLICY:
+    'always' - после каждой перезаписи, до замены файла;
+    'on_close' - один раз при закрытии хранилища (см. sync_files);
+    'never' - не сбрасываются, этим занимается операционная система.
+'''
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from settings import FSYNC_POLICY, WRITE_BUFFER_SIZE
+
+
+FSYNC_POLICIES = ('always', 'on_close', 'never')
+
+
+def check_policy(policy: str) -> str:
+    '''
+    Проверяет значение FSYNC_POLICY.
+
+    Вызывает:
+        ValueError: если политика не входит в FSYNC_POLICIES.
+    '''
+
+    if policy not in FSYNC_POLICIES:
+        raise ValueError(f'Неизвестная политика fsync: {policy}')
+    return policy
+
+
+def fsync_directory(path: str) -> None:
+    '''
+    Сбрасывает на диск запись о файлах в папке.
+
+    В Windows папку нельзя открыть для fsync, тогда ничего не делает.
+    '''
+
+    try:
+        descriptor = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(descriptor)
+    except OSError:
+        pass
+    finally:
+        os.close(descriptor)
+
+
+def sync_files(*filenames: str) -> None:
+    '''
+    Сбрасывает на диск указанные файлы и папки, в которых они лежат.
+
+    Отсутствующие файлы пропускаются.
+    '''
+
+    directories = set()
+    for filename in filenames:
+        try:
+            with open(filename, 'rb') as file:
+                os.fsync(file.fileno())
+        except FileNotFoundError:
+            continue
+        directories.add(os.path.dirname(filename))
+    for directory in directories:
+        fsync_directory(directory)
+
+
+@contextmanager
+def atomic_open(filename: str, fsync: bool = FSYNC_POLICY == 'always'):
+    '''
+    Открывает временный файл для записи вместо filename.
+
+    Записи буферизуются блоками по WRITE_BUFFER_SIZE байт. Если блок
+    with завершился без ошибки, то временный файл заменяет filename,
+    иначе удаляется, а filename не меняется.
+
+    Аргументы:
+        filename: путь к перезаписываемому файлу.
+        fsync: сбросить ли данные на диск перед заменой файла.
+
+    Пример:
+        with atomic_open('data.csv') as file:
+            csv.writer(file).writerows(rows)
+    '''
+
+    directory = os.path.dirname(filename)
+    descriptor, temp_name = tempfile.mkstemp(
+        prefix=os.path.basename(filename) + '.', suffix='.tmp',
+        dir=directory or None
+    )
+    try:
+        with open(
+            descriptor, 'w', encoding='utf-8', newline='',
+            buffering=WRITE_BUFFER_SIZE
+        ) as file:
+            yield file
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        try:
+            os.chmod(temp_name, os.stat(filename).st_mode & 0o777)
+        except FileNotFoundError:
+            pass
+        os.replace(temp_name, filename)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync:
+        fsync_directory(directory)
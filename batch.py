@@ -0,0 +1,249 @@
+'''
+Пакетное выполнение операций над задачами без диалога с пользователем.
+
+Операции читаются из файла в формате JSON Lines, по одной на строку:
+    {"op": "create", "title": "...", "description": "...",
+     "category": "...", "date": "DD-MM-YYYY", "prio": "низкий"}
+    {"op": "update", "id": 3, "title": "...", "prio": "высокий"}
+    {"op": "complete", "id": 3}
+    {"op": "delete", "id": 3}
+    {"op": "delete", "category": "..."}
+
+Поля проверяются по тем же правилам, что и при вводе в главном меню
+(см. validation.py). Неверные операции пропускаются и попадают в отчет,
+остальные применяются по порядку к копии задач в памяти и записываются
+в файл одной записью в конце (см. TaskStore.write_batch).
+
+Запуск из корневой папки проекта:
+    python -m main batch ops.jsonl
+'''
+
+import json
+from collections.abc import Mapping
+from typing import Iterable, Iterator
+
+from settings import STATUSES
+from validation import TASK_FIELDS, check_field, validate_task
+
+
+OPERATIONS = ('create', 'update', 'complete', 'delete')
+
+
+def parse_operation(line: str) -> dict:
+    '''
+    Разбирает и проверяет одну операцию.
+
+    Возвращает:
+        словарь операции, в котором id - целое число.
+
+    Вызывает:
+        ValueError: если строка не является верной операцией.
+    '''
+
+    try:
+        operation = json.loads(line)
+    except ValueError:
+        raise ValueError('строка не является объектом JSON')
+    if not isinstance(operation, dict):
+        raise ValueError('строка не является объектом JSON')
+    return check_operation(operation)
+
+
+def check_operation(operation: dict) -> dict:
+    '''
+    Проверяет словарь операции, например, из запроса к server.py.
+
+    Возвращает:
+        словарь операции, в котором id - целое число.
+
+    Вызывает:
+        ValueError: если словарь не является верной операцией.
+    '''
+
+    op = operation.get('op')
+    if op not in OPERATIONS:
+        raise ValueError(f'неизвестная операция "{op}"')
+    if op == 'create':
+        errors = validate_task(operation)
+    elif op == 'delete' and 'category' in operation:
+        errors = validate_task(operation, ('category',))
+    else:
+        try:
+            operation['id'] = int(operation.get('id'))
+        except (TypeError, ValueError):
+            raise ValueError('id должно быть целым числом!')
+        errors = []
+        if op == 'update':
+            fields = [
+                field for field in operation if field not in ('op', 'id')
+            ]
+            if not fields:
+                raise ValueError('не указаны поля для изменения')
+            for field in fields:
+                if field not in TASK_FIELDS:
+                    errors.append(f'поле "{field}" нельзя изменить')
+                elif check_field(field, operation.get(field)) is not None:
+                    errors.append(check_field(field, operation.get(field)))
+    if errors:
+        raise ValueError(' '.join(errors))
+    return operation
+
+
+class Batch():
+    '''
+    Изменения задач, накопленные в памяти до записи в файл.
+
+    Атрибуты:
+        store: TaskStore, к задачам которого применяются операции.
+        created: новые задачи, ключи - id.
+        updated: измененные существующие задачи, ключи - id.
+        deleted: id удаленных существующих задач.
+        applied: количество примененных операций.
+        errors: сообщения об отклоненных операциях.
+
+    Методы:
+        get
+        apply
+        get_changes
+        commit.
+    '''
+
+    def __init__(self, store):
+        self.store = store
+        self.created = {}
+        self.updated = {}
+        self.deleted = set()
+        self.applied = 0
+        self.errors = []
+
+    def get(self, id: int) -> Mapping | None:
+        '''
+        Возвращает задачу с учетом уже примененных операций или None.
+        '''
+
+        if id in self.deleted:
+            return None
+        for tasks in (self.created, self.updated, self.store.tasks):
+            if id in tasks:
+                return tasks[id]
+        return None
+
+    def _put(self, row: dict) -> None:
+        id = int(row.get('id'))
+        if id in self.created:
+            self.created[id] = row
+        else:
+            self.updated[id] = row
+
+    def _remove(self, id: int) -> None:
+        if id in self.created:
+            del self.created[id]
+            return
+        self.updated.pop(id, None)
+        self.deleted.add(id)
+
+    def _delete_category(self, category: str) -> None:
+        ids = self.store.indexes['category'].get(category) | set(
+            self.created
+        ) | set(self.updated)
+        ids = [
+            id for id in sorted(ids)
+            if self.get(id) is not None
+            and self.get(id).get('category') == category
+        ]
+        if not ids:
+            raise ValueError('Задач с такой категорией нет')
+        for id in ids:
+            self._remove(id)
+
+    def apply(self, operation: dict, ids: Iterator[int]) -> None:
+        '''
+        Применяет проверенную операцию (см. parse_operation).
+
+        Аргументы:
+            operation: словарь операции.
+            ids: источник id для новых задач.
+
+        Вызывает:
+            ValueError: если операция ссылается на несуществующую задачу.
+        '''
+
+        op = operation.get('op')
+        if op == 'create':
+            id = next(ids)
+            self.created[id] = dict(
+                {'id': str(id)},
+                **{field: operation.get(field) for field in TASK_FIELDS},
+                status=STATUSES[0],
+            )
+        elif op == 'delete' and 'category' in operation:
+            self._delete_category(operation.get('category'))
+        else:
+            row = self.get(operation.get('id'))
+            if row is None:
+                raise ValueError('Задачи с таким id не существует')
+            if op == 'update':
+                self._put(dict(row, **{
+                    field: operation.get(field) for field in TASK_FIELDS
+                    if field in operation
+                }))
+            elif op == 'complete':
+                self._put(dict(row, status=STATUSES[1]))
+            else:
+                self._remove(operation.get('id'))
+        self.applied += 1
+
+    def get_changes(self) -> tuple[list[dict], list[dict], set[int]]:
+        '''
+        Возвращает новые задачи, измененные задачи и id удаленных
+        задач для TaskStore.write_batch.
+        '''
+
+        return (
+            list(self.created.values()),
+            list(self.updated.values()),
+            self.deleted,
+        )
+
+    def commit(self) -> None:
+        '''Записывает все изменения в файл одной записью.'''
+
+        if self.created or self.updated or self.deleted:
+            self.store.write_batch(*self.get_changes())
+
+
+def run_batch(store, lines: Iterable[str]) -> Batch:
+    '''
+    Выполняет операции из строк JSON Lines.
+
+    Аргументы:
+        store: TaskStore, к которому применяются операции.
+        lines: строки с операциями, например, открытый файл.
+
+    Возвращает:
+        Batch с количеством примененных операций и ошибками.
+    '''
+
+    store.refresh()
+    batch = Batch(store)
+    operations = []
+    errors = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            operations.append((number, parse_operation(line)))
+        except ValueError as error:
+            errors.append((number, error))
+    count = sum(operation.get('op') == 'create' for _, operation in operations)
+    ids = iter(store.next_ids(count) if count else ())
+    for number, operation in operations:
+        try:
+            batch.apply(operation, ids)
+        except ValueError as error:
+            errors.append((number, error))
+    batch.errors = [f'Строка {number}: {error}' for number, error in sorted(
+        errors, key=lambda item: item[0]
+    )]
+    batch.commit()
+    return batch
@@ -0,0 +1,90 @@
+'''
+Пропускная способность записи при одновременной работе нескольких
+процессов с одним файлом данных.
+
+Каждый процесс, как TaskStore, держит копию задач в памяти, создает
+задачи и отмечает их выполнение. Копия перечитывается, только если
+CsvRepository сообщил, что файл изменил другой процесс (stale).
+В конце проверяется, что ни одно изменение не потерялось.
+
+Запуск из корневой папки проекта:
+    python benchmarks/bench_concurrency.py [задач в файле] [операций]
+        [количество процессов ...]
+
+По умолчанию: 1000 задач, 200 операций на процесс, 1 2 4 8 процессов.
+'''
+
+import csv
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from bench_sorting import make_rows  # noqa: E402
+from meta import IdAllocator  # noqa: E402
+from repository import CsvRepository  # noqa: E402
+from settings import FIELD_NAMES  # noqa: E402
+
+
+def worker(filename: str, use_log: bool, count: int) -> int:
+    repository = CsvRepository(filename, use_log)
+    allocator = IdAllocator(filename)
+    data = repository.read_all()
+    reloads = 0
+    for _ in range(count // 2):
+        id = allocator.next_id()
+        row = dict(data[0], id=str(id), status='не выполнено')
+        repository.insert(row)
+        data.append(row)
+        if repository.stale:
+            data = repository.read_all()
+            reloads += 1
+        repository.set_status(id, 'выполнено', data)
+        if repository.stale:
+            data = repository.read_all()
+            reloads += 1
+        else:
+            data = [
+                dict(task, status='выполнено') if int(task['id']) == id
+                else task for task in data
+            ]
+    return reloads
+
+
+def run(size: int, count: int, processes: int, use_log: bool) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'data.csv')
+        with open(filename, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, FIELD_NAMES)
+            writer.writeheader()
+            writer.writerows(make_rows(size))
+        IdAllocator(filename).observe(size)
+        start = time.perf_counter()
+        with multiprocessing.Pool(processes) as pool:
+            reloads = sum(pool.starmap(
+                worker, [(filename, use_log, count)] * processes
+            ))
+        elapsed = time.perf_counter() - start
+        rows = CsvRepository(filename, use_log).read_all()
+        done = sum(row['status'] == 'выполнено' for row in rows[size:])
+        expected = processes * (count // 2)
+        lost = expected - done + (expected + size - len(rows))
+        print(f'    {processes:>3} проц.{processes * count / elapsed:12.0f} '
+              f'опер./с  перечитываний: {reloads:<6} потеряно: {lost}')
+
+
+def main(size: int, count: int, processes: list[int]) -> None:
+    for use_log in (False, True):
+        print(f'{size} задач, {count} операций на процесс, '
+              f'USE_LOG = {use_log}:')
+        for number in processes:
+            run(size, count, number, use_log)
+
+
+if __name__ == '__main__':
+    args = [int(arg) for arg in sys.argv[1:]]
+    size = args[0] if len(args) > 0 else 1000
+    count = args[1] if len(args) > 1 else 200
+    main(size, count, args[2:] or [1, 2, 4, 8])
@@ -0,0 +1,60 @@
+'''
+Сравнение памяти, которую занимают задачи в виде словарей
+csv.DictReader и в виде объектов Task.
+
+Запуск из корневой папки проекта:
+    python benchmarks/bench_memory.py [количество задач]
+
+По умолчанию: 100000.
+'''
+
+import csv
+import io
+import os
+import sys
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from bench_sorting import make_rows  # noqa: E402
+from main import Task  # noqa: E402
+from settings import FIELD_NAMES  # noqa: E402
+
+
+def make_csv(count: int) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, FIELD_NAMES)
+    writer.writeheader()
+    writer.writerows(make_rows(count))
+    return buffer.getvalue()
+
+
+def measure(build, text: str) -> int:
+    tracemalloc.start()
+    data = build(text)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del data
+    return size
+
+
+def build_dicts(text: str) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+def build_tasks(text: str) -> list[Task]:
+    return [Task.from_row(row) for row in csv.DictReader(io.StringIO(text))]
+
+
+def main(count: int) -> None:
+    text = make_csv(count)
+    dicts = measure(build_dicts, text)
+    tasks = measure(build_tasks, text)
+    print(f'{count} задач:')
+    print(f'    list[dict]  {dicts / 2**20:8.1f} МБ')
+    print(f'    list[Task]  {tasks / 2**20:8.1f} МБ')
+    print(f'    экономия    {(dicts - tasks) / 2**20:8.1f} МБ '
+          f'({(1 - tasks / dicts) * 100:.0f}%)')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
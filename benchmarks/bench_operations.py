@@ -0,0 +1,249 @@
+'''
+Замеры времени и пиковой памяти для операций TaskManager и TaskStore.
+
+Для каждого размера создается csv файл со случайными задачами
+(см. bench_sorting.make_rows), после чего каждая операция выполняется
+repeat раз и записывается лучшее время. Пиковая память измеряется
+отдельным запуском под tracemalloc, чтобы он не влиял на время.
+Операции, которые меняют файл, получают перед каждым запуском свежую
+копию файла, и ее создание не входит в замер.
+
+Результаты можно сохранить в JSON файл (--save) и сравнить с ним
+следующий запуск (--compare). Операция считается регрессией, если
+ее время или память выросли больше чем в threshold раз. Тогда скрипт
+завершается с кодом 1. Базовые замеры зависят от компьютера, поэтому
+в репозитории их нет: сначала сохраните замеры на своем компьютере
+с --save, а затем сравнивайте с ними следующие запуски. Операции,
+для которых в сохраненном файле нет замеров (например, добавленные
+позже), выводятся отдельным списком.
+
+Запуск из корневой папки проекта:
+    python benchmarks/bench_operations.py [количество задач ...]
+        [--repeat N] [--save baseline.json] [--compare baseline.json]
+        [--threshold 1.25]
+
+По умолчанию: 1000 10000 100000.
+'''
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from bench_sorting import make_rows  # noqa: E402
+from main import TaskManager, TaskStore, get_id  # noqa: E402
+from settings import FIELD_NAMES  # noqa: E402
+from sorting import sort_tasks  # noqa: E402
+
+
+# Замеряемые величины: ключ, единица для вывода и множитель для нее.
+METRICS = (('time', 'мс', 1000), ('peak', 'КБ', 1 / 1024))
+
+
+def write_rows(filename: str, count: int) -> None:
+    '''Создает csv файл с count случайными задачами по порядку id.'''
+
+    rows = make_rows(count)
+    sort_tasks(rows)
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, FIELD_NAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def get_cases(
+        manager: TaskManager,
+        filename: str,
+        count: int,
+        ) -> list[tuple]:
+    '''
+    Возвращает список операций (название, функция, меняет ли файл).
+    '''
+
+    data = manager.read_all(filename)
+    id = count // 2
+    task = dict(data[id - 1], title='new_title')
+    new_task = [count + 1, 'new', 'new_desc', 'cat1', '01-01-2030', 'низкий']
+    store = TaskStore(filename, manager)
+    return [
+        ('read_all', lambda: manager.read_all(filename), False),
+        ('search_id', lambda: manager.search_id(data, id), False),
+        ('get_task', lambda: manager.get_task(filename, id), False),
+        ('search_params(category)',
+         lambda: manager.search_params(data, {'category': 'cat7'}), False),
+        ('search_params(status)',
+         lambda: manager.search_params(data, {'status': 'выполнено'}),
+         False),
+        ('search_params(keyword)',
+         lambda: manager.search_params(data, {'keyword': f'title {id}'}),
+         False),
+        ('sort_tasks', lambda: sort_tasks(list(data)), False),
+        ('get_id', lambda: get_id(data), False),
+        ('create_new_task',
+         lambda: manager.create_new_task(new_task, filename), True),
+        ('update_tasks',
+         lambda: manager.update_tasks(data, task, filename), True),
+        ('delete_tasks(id)',
+         lambda: manager.delete_tasks(data, {'id': id}, filename), True),
+        ('delete_tasks(category)',
+         lambda: manager.delete_tasks(data, {'category': 'cat7'}, filename),
+         True),
+        ('TaskStore()', lambda: TaskStore(filename, manager), False),
+        ('TaskStore.search(category)',
+         lambda: store.search({'category': 'cat7'}), False),
+        ('TaskStore.search(keyword)',
+         lambda: store.search({'keyword': f'title {id}'}), False),
+    ]
+
+
+def run_case(func, restore, repeat: int) -> dict:
+    '''
+    Выполняет операцию repeat раз и один раз под tracemalloc.
+
+    Возвращает:
+        словарь с лучшим временем в секундах и пиковой памятью в байтах.
+    '''
+
+    best = None
+    for _ in range(repeat):
+        restore()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    restore()
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'time': best, 'peak': peak}
+
+
+def run_size(count: int, repeat: int) -> dict:
+    '''Замеряет все операции для файла с count задачами.'''
+
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'data.csv')
+        backup = os.path.join(directory, 'backup.csv')
+        write_rows(filename, count)
+        shutil.copy(filename, backup)
+        manager = TaskManager(use_log=False, backend='csv')
+
+        def restore():
+            shutil.copy(backup, filename)
+            for name in os.listdir(directory):
+                if name.startswith('data.csv.'):
+                    os.remove(os.path.join(directory, name))
+            # Иначе CsvRepository посчитает переданные данные
+            # устаревшими и перечитает файл во время замера.
+            manager.read_all(filename)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            cases = get_cases(manager, filename, count)
+            for name, func, mutates in cases:
+                results[name] = run_case(
+                    func, restore if mutates else lambda: None, repeat
+                )
+    return results
+
+
+def get_missing(results: dict, baseline: dict) -> list[str]:
+    '''
+    Возвращает описания замеров, для которых нет базовых замеров,
+    например, операций, добавленных после сохранения baseline.
+    '''
+
+    return [
+        f'{size} задач, {name}'
+        for size, cases in results.items()
+        for name in cases
+        if name not in baseline.get(size, {})
+    ]
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[str]:
+    '''
+    Сравнивает замеры с базовыми. Замеры без базовых пропускаются,
+    см. get_missing.
+
+    Возвращает:
+        список описаний регрессий.
+    '''
+
+    regressions = []
+    for size, cases in results.items():
+        for name, result in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            for key, unit, scale in METRICS:
+                # Мелкие значения слишком шумные для сравнения.
+                if result[key] * scale < 1:
+                    continue
+                if result[key] > base[key] * threshold:
+                    regressions.append(
+                        f'{size} задач, {name}: {key} '
+                        f'{base[key] * scale:.1f} -> '
+                        f'{result[key] * scale:.1f} {unit}'
+                    )
+    return regressions
+
+
+def print_results(size: str, cases: dict, baseline: dict) -> None:
+    print(f'{size} задач:')
+    for name, result in cases.items():
+        line = (f'    {name:<30}{result["time"] * 1000:12.2f} мс'
+                f'{result["peak"] / 1024 / 1024:10.2f} МБ')
+        base = baseline.get(size, {}).get(name)
+        if base is not None and base['time']:
+            line += f'{result["time"] / base["time"]:8.2f}x'
+        elif baseline:
+            line += '   нет базового замера'
+        print(line)
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Замеры операций TaskManager и TaskStore.'
+    )
+    parser.add_argument('sizes', nargs='*', type=int,
+                        default=[1000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save')
+    parser.add_argument('--compare')
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args(args)
+    baseline = {}
+    if args.compare is not None:
+        with open(args.compare, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+    random.seed(0)
+    results = {}
+    for count in args.sizes:
+        results[str(count)] = run_size(count, args.repeat)
+        print_results(str(count), results[str(count)], baseline)
+    if args.save is not None:
+        with open(args.save, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2, ensure_ascii=False)
+    if args.compare is not None:
+        for missing in get_missing(results, baseline):
+            print('Нет базового замера:', missing)
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print('Регрессия:', regression)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+'''
+Нагрузочный тест HTTP сервера (server.py).
+
+Скрипт создает csv файл со случайными задачами (см. bench_sorting.make_rows),
+запускает сервер в отдельном процессе и открывает clients соединений,
+каждое из которых выполняет requests запросов подряд. Запросы - поиск
+по id, страница списка и поиск по категории, а доля writes из них -
+создание задачи. Выводятся количество запросов в секунду и время ответа.
+
+Запуск из корневой папки проекта:
+    python benchmarks/bench_server.py [--tasks N] [--clients N]
+        [--requests N] [--writes 0.05]
+
+По умолчанию: 10000 задач, 200 соединений по 50 запросов, 5% изменений.
+'''
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(ROOT)
+from bench_operations import write_rows  # noqa: E402
+
+
+NEW_TASK = json.dumps({
+    'title': 'new',
+    'description': 'new_desc',
+    'category': 'cat1',
+    'date': '01-01-2030',
+    'prio': 'низкий',
+}).encode('utf-8')
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+            continue
+        writer.close()
+        return
+
+
+def make_request(count: int, writes: float) -> bytes:
+    '''Возвращает случайный HTTP запрос.'''
+
+    if random.random() < writes:
+        return (b'POST /tasks HTTP/1.1\r\nHost: bench\r\n'
+                b'Content-Length: %d\r\n\r\n' % len(NEW_TASK) + NEW_TASK)
+    choice = random.random()
+    if choice < 0.5:
+        path = f'/tasks/{random.randint(1, count)}'
+    elif choice < 0.8:
+        path = f'/tasks?offset={random.randint(0, count)}&limit=20'
+    else:
+        path = f'/tasks?category=cat{random.randint(0, 9)}&limit=20'
+    return f'GET {path} HTTP/1.1\r\nHost: bench\r\n\r\n'.encode('utf-8')
+
+
+async def client(
+        port: int,
+        count: int,
+        requests: int,
+        writes: float,
+        latencies: list[float],
+        ) -> int:
+    '''
+    Выполняет requests запросов через одно соединение.
+
+    Возвращает:
+        количество ответов с ошибкой.
+    '''
+
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    errors = 0
+    for _ in range(requests):
+        start = time.perf_counter()
+        writer.write(make_request(count, writes))
+        await writer.drain()
+        status = await reader.readline()
+        length = 0
+        while (line := await reader.readline()) != b'\r\n':
+            name, _, value = line.partition(b':')
+            if name.lower() == b'content-length':
+                length = int(value)
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if status.split()[1][:1] != b'2':
+            errors += 1
+    writer.close()
+    return errors
+
+
+async def run_load(
+        port: int,
+        count: int,
+        clients: int,
+        requests: int,
+        writes: float,
+        ) -> None:
+    await wait_for_server(port)
+    latencies = []
+    start = time.perf_counter()
+    errors = await asyncio.gather(*(
+        client(port, count, requests, writes, latencies)
+        for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f'{clients} соединений, {len(latencies)} запросов '
+          f'за {elapsed:.2f} с: {len(latencies) / elapsed:.0f} запросов/с')
+    for share in (0.5, 0.95, 0.99):
+        latency = latencies[int(share * (len(latencies) - 1))]
+        print(f'    p{int(share * 100)}: {latency * 1000:.2f} мс')
+    print(f'    ошибок: {sum(errors)}')
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Нагрузочный тест HTTP сервера.'
+    )
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--writes', type=float, default=0.05)
+    args = parser.parse_args(args)
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, 'data.csv')
+        write_rows(filename, args.tasks)
+        port = get_free_port()
+        process = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, 'server.py'),
+             '--port', str(port), '--file', filename],
+            stdout=subprocess.DEVNULL,
+        )
+        try:
+            asyncio.run(run_load(
+                port, args.tasks, args.clients, args.requests, args.writes
+            ))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+'''
+Сравнение скорости сортировки задач.
+
+Сравнивает прежнюю реализацию TimSort (legacy_sort_tasks) с
+sorting.sort_tasks и sorting.sort_rows на случайных данных.
+
+Запуск из корневой папки проекта:
+    python benchmarks/bench_sorting.py [количество задач ...]
+
+По умолчанию: 10000 100000 1000000.
+'''
+
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+from settings import PRIORITIES, STATUSES  # noqa: E402
+from sorting import sort_rows, sort_tasks  # noqa: E402
+
+
+def legacy_merge(left: list[dict], right: list[dict]):
+    if len(left) == 0:
+        return right
+    if len(right) == 0:
+        return left
+    result = []
+    index_left = index_right = 0
+    while len(result) < (len(left) + len(right)):
+        if int(left[index_left].get('id')) <= int(right[index_right].get(
+            'id'
+        )):
+            result.append(left[index_left])
+            index_left += 1
+        else:
+            result.append(right[index_right])
+            index_right += 1
+        if index_right == len(right):
+            result += left[index_left:]
+            break
+        if index_left == len(left):
+            result += right[index_right:]
+            break
+    return result
+
+
+def legacy_insertion_sort(data: list[dict], left: int, right: int):
+    for i in range(left + 1, right + 1):
+        key = data[i]
+        j = i - 1
+        while j >= left and int(data[j].get('id')) > int(key.get('id')):
+            data[j + 1] = data[j]
+            j -= 1
+        data[j + 1] = key
+    return data
+
+
+def legacy_sort_tasks(data: list[dict]):
+    '''Реализация sorting.sort_tasks до перехода на sort_rows.'''
+
+    min_run = 32
+    n = len(data)
+    for i in range(0, n, min_run):
+        legacy_insertion_sort(data, i, min((i + min_run - 1), n - 1))
+    size = min_run
+    while size < n:
+        for start in range(0, n, size * 2):
+            mid = start + size - 1
+            end = min((start + size*2 - 1), (n - 1))
+            merged_data = legacy_merge(
+                data[start:mid + 1],
+                data[mid + 1:end + 1]
+            )
+            data[start:start + len(merged_data)] = merged_data
+        size *= 2
+    return data
+
+
+def make_rows(count: int) -> list[dict]:
+    ids = list(range(1, count + 1))
+    random.shuffle(ids)
+    return [
+        {
+            'id': str(id),
+            'title': f'title {id}',
+            'description': 'desc',
+            'category': f'cat{id % 50}',
+            'date': (f'{random.randint(1, 28):02}-{random.randint(1, 12):02}'
+                     f'-{random.randint(2024, 2030)}'),
+            'prio': random.choice(PRIORITIES),
+            'status': random.choice(STATUSES),
+        }
+        for id in ids
+    ]
+
+
+def measure(func, data: list[dict]) -> float:
+    data = list(data)
+    start = time.perf_counter()
+    func(data)
+    return time.perf_counter() - start
+
+
+def main(sizes: list[int]) -> None:
+    cases = [
+        ('legacy_sort_tasks(id)', legacy_sort_tasks),
+        ('sort_tasks(id)', sort_tasks),
+        ('sort_rows(id)', lambda data: sort_rows(data, ['id'])),
+        ('sort_rows(-prio, date)',
+         lambda data: sort_rows(data, ['-prio', 'date'])),
+        ('sort_rows(status, -prio, date, id)',
+         lambda data: sort_rows(data, ['status', '-prio', 'date', 'id'])),
+    ]
+    random.seed(0)
+    for size in sizes:
+        data = make_rows(size)
+        print(f'{size} задач:')
+        for name, func in cases:
+            print(f'    {name:<38}{measure(func, data):10.3f} с')
+
+
+if __name__ == '__main__':
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    main(sizes)
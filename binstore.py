@@ -0,0 +1,462 @@
+'''
+Двоичное хранилище задач с доступом через mmap.
+
+Хранилище состоит из двух файлов:
+    <filename> - заголовок и записи фиксированной длины (RECORD).
+    <filename>.heap - строки задач в UTF-8, которые только дописываются.
+
+Запись содержит id, флаг удаления, коды приоритета и статуса,
+срок выполнения в виде порядкового номера дня и смещения и длины строк
+в .heap. Поэтому статус и удаление меняются на месте одним байтом,
+а задача по id читается без разбора остальных записей.
+
+Перенос данных между форматами:
+    python -m binstore import data.csv data.tasks
+    python -m binstore export data.tasks data.csv
+'''
+
+import csv
+import mmap
+import os
+import struct
+import sys
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from locking import FileLock
+from meta import bump_generation, get_generation
+from repository import TaskRepository, get_file_signature
+from settings import BINARY_HEAP_SUFFIX, FIELD_NAMES, PRIORITIES, STATUSES
+from sorting import (MAX_ORDINAL, PRIO_RANK, STATUS_RANK, format_date,
+                     parse_date)
+
+
+MAGIC = b'TSK1'
+
+VERSION = 1
+
+# magic, версия, количество записей.
+HEADER = struct.Struct('<4sII')
+
+# id, флаг удаления, приоритет, статус, срок (0 - срок хранится строкой),
+# затем смещение и длина в .heap для title, description, category, date.
+RECORD = struct.Struct('<qBBBxi' + 'QI' * 4)
+
+STRING_FIELDS = ('title', 'description', 'category', 'date')
+
+DELETED_OFFSET = 8
+
+STATUS_OFFSET = 10
+
+
+class BinaryStorage(TaskRepository):
+    '''
+    Двоичное хранилище задач, реализация TaskRepository.
+
+    Новые задачи дописываются в конец файла, изменения перезаписывают
+    запись на месте, а новые строки дописываются в .heap. Старые строки
+    и удаленные записи остаются в файлах до экспорта и повторного
+    импорта. Все изменения выполняются под исключительной блокировкой
+    FileLock, чтобы процессы не записали строки в одно и то же место
+    .heap. Как в CsvRepository, при чтении всех задач запоминается
+    номер поколения (см. meta.get_generation), а каждая запись его
+    увеличивает. Если перед записью номер изменился, то stale = True.
+
+    Методы:
+        read_all
+        get
+        insert
+        update
+        set_status
+        delete
+        delete_category
+        write_batch
+        export_csv
+        import_csv
+        close.
+    '''
+
+    def __init__(self, filename: str):
+        '''
+        Открывает хранилище, создавая файлы, если их нет.
+
+        Атрибуты:
+            filename: путь к файлу с записями.
+        '''
+
+        self.filename = filename
+        self.heap_name = filename + BINARY_HEAP_SUFFIX
+        self.lock = FileLock(filename)
+        self.generation = None
+        self._writing = 0
+        if not os.path.isfile(filename):
+            with open(filename, 'wb') as file:
+                file.write(HEADER.pack(MAGIC, VERSION, 0))
+            with open(self.heap_name, 'wb') as file:
+                file.write(b'\0')
+        with open(filename, 'rb') as file:
+            header = file.read(HEADER.size)
+        if len(header) != HEADER.size or HEADER.unpack(header)[:2] != (
+            MAGIC, VERSION
+        ):
+            raise ValueError(f'{filename} не является файлом задач')
+        self._file = open(filename, 'r+b')
+        self._heap = open(self.heap_name, 'r+b')
+        self._map = None
+        self._heap_map = None
+        self._slots = {}
+        self._indexed = 0
+        self._remap()
+
+    def __len__(self) -> int:
+        self._sync()
+        return len(self._slots)
+
+    def close(self) -> None:
+        '''Закрывает файлы хранилища.'''
+
+        for item in (self._map, self._heap_map, self._file, self._heap):
+            if item is not None:
+                item.close()
+        self._map = self._heap_map = None
+
+    def _remap(self) -> None:
+        if self._map is not None:
+            self._map.close()
+        if self._heap_map is not None:
+            self._heap_map.close()
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        self._heap_map = mmap.mmap(self._heap.fileno(), 0)
+
+    def _get_count(self) -> int:
+        return HEADER.unpack_from(self._map, 0)[2]
+
+    def _sync(self) -> None:
+        '''
+        Подхватывает записи, добавленные другими процессами.
+        '''
+
+        if (os.fstat(self._file.fileno()).st_size != len(self._map)
+                or os.fstat(self._heap.fileno()).st_size != len(
+                    self._heap_map
+                )):
+            self._remap()
+        count = self._get_count()
+        for slot in range(self._indexed, count):
+            offset = HEADER.size + slot * RECORD.size
+            id, deleted = struct.unpack_from('<qB', self._map, offset)
+            if not deleted:
+                self._slots[id] = slot
+        self._indexed = count
+
+    def get_signature(self) -> tuple:
+        return get_file_signature(self.filename, self.heap_name)
+
+    @contextmanager
+    def _write(self):
+        '''
+        Захватывает исключительную блокировку на время записи.
+
+        Номер поколения проверяется и увеличивается только во внешнем
+        вызове, поэтому пакет изменений (write_batch) считается одной
+        записью.
+        '''
+
+        with self.lock.exclusive():
+            outer = not self._writing
+            if outer:
+                self._sync()
+                self.stale = get_generation(self.filename) != self.generation
+            self._writing += 1
+            try:
+                yield
+            finally:
+                self._writing -= 1
+                if outer:
+                    self.generation = bump_generation(self.filename)
+
+    def _touch(self) -> None:
+        self._map.flush()
+        os.utime(self.filename)
+
+    def _get_offset(self, id: int) -> int | None:
+        self._sync()
+        slot = self._slots.get(id)
+        if slot is None:
+            return None
+        offset = HEADER.size + slot * RECORD.size
+        if self._map[offset + DELETED_OFFSET]:
+            del self._slots[id]
+            return None
+        return offset
+
+    def _read_string(self, offset: int, length: int) -> str:
+        if offset + length > len(self._heap_map):
+            self._remap()
+        return self._heap_map[offset:offset + length].decode('utf-8')
+
+    def _write_string(self, value: str) -> tuple[int, int]:
+        data = value.encode('utf-8')
+        self._heap.seek(0, os.SEEK_END)
+        offset = self._heap.tell()
+        self._heap.write(data)
+        self._heap.flush()
+        return offset, len(data)
+
+    def _read(self, offset: int) -> dict:
+        values = RECORD.unpack_from(self._map, offset)
+        id, deleted, prio, status, date = values[:5]
+        strings = [
+            self._read_string(values[i], values[i + 1])
+            for i in range(5, len(values), 2)
+        ]
+        return {
+            'id': str(id),
+            'title': strings[0],
+            'description': strings[1],
+            'category': strings[2],
+            'date': format_date(date) if date else strings[3],
+            'prio': PRIORITIES[prio],
+            'status': STATUSES[status],
+        }
+
+    def _pack(self, row: dict) -> bytes:
+        prio = row.get('prio')
+        status = row.get('status')
+        if prio not in PRIO_RANK:
+            raise ValueError(f'Неизвестный приоритет: {prio}')
+        if status not in STATUS_RANK:
+            raise ValueError(f'Неизвестный статус: {status}')
+        date = row.get('date') or ''
+        ordinal = parse_date(date)
+        if ordinal > MAX_ORDINAL or format_date(ordinal) != date:
+            ordinal = 0
+        strings = []
+        for field in STRING_FIELDS:
+            value = row.get(field) or ''
+            if field == 'date' and ordinal:
+                value = ''
+            strings.extend(self._write_string(value) if value else (0, 0))
+        return RECORD.pack(
+            int(row.get('id')), 0, PRIO_RANK[prio], STATUS_RANK[status],
+            ordinal, *strings
+        )
+
+    def __iter__(self) -> Iterator[dict]:
+        self.generation = get_generation(self.filename)
+        self._sync()
+        for slot in range(self._indexed):
+            offset = HEADER.size + slot * RECORD.size
+            if not self._map[offset + DELETED_OFFSET]:
+                yield self._read(offset)
+
+    def read_all(self) -> list[dict]:
+        '''
+        Возвращает все задачи в порядке записи в виде списка словарей,
+        как TaskManager.read_all.
+        '''
+
+        return list(self)
+
+    def get(self, id: int) -> dict | None:
+        '''Возвращает словарь задачи с указанным id или None.'''
+
+        offset = self._get_offset(id)
+        if offset is None:
+            return None
+        return self._read(offset)
+
+    def insert(self, row: dict) -> None:
+        '''Дописывает новую задачу в конец хранилища.'''
+
+        self.insert_many([row])
+
+    def insert_many(self, rows: Iterable[dict]) -> None:
+        '''
+        Дописывает новые задачи в конец хранилища одной записью.
+
+        Запись выполняется под исключительной блокировкой FileLock,
+        чтобы процессы не записали задачи в одно и то же место.
+        '''
+
+        with self._write():
+            records = []
+            ids = set()
+            for row in rows:
+                id = int(row.get('id'))
+                if id in self._slots or id in ids:
+                    raise ValueError(f'Задача с id {id} уже существует')
+                ids.add(id)
+                records.append(self._pack(row))
+            if not records:
+                return
+            count = self._get_count()
+            self._file.seek(HEADER.size + count * RECORD.size)
+            self._file.write(b''.join(records))
+            self._file.flush()
+            self._remap()
+            HEADER.pack_into(
+                self._map, 0, MAGIC, VERSION, count + len(records)
+            )
+            self._touch()
+            self._sync()
+
+    def update(self, row: dict, data: list[dict] | None = None) -> bool:
+        '''
+        Перезаписывает задачу с тем же id.
+
+        Возвращает:
+            False, если задачи с таким id нет.
+        '''
+
+        with self._write():
+            offset = self._get_offset(int(row.get('id')))
+            if offset is None:
+                return False
+            record = self._pack(row)
+            if len(self._map) < offset + RECORD.size:
+                self._remap()
+            self._map[offset:offset + RECORD.size] = record
+            self._touch()
+        return True
+
+    def set_status(
+            self,
+            id: int,
+            status: str,
+            data: list[dict] | None = None,
+            ) -> bool:
+        '''
+        Изменяет статус задачи на месте.
+
+        Возвращает:
+            False, если задачи с таким id нет.
+        '''
+
+        if status not in STATUS_RANK:
+            raise ValueError(f'Неизвестный статус: {status}')
+        with self._write():
+            offset = self._get_offset(id)
+            if offset is None:
+                return False
+            self._map[offset + STATUS_OFFSET] = STATUS_RANK[status]
+            self._touch()
+        return True
+
+    def delete(self, id: int, data: list[dict] | None = None) -> bool:
+        '''
+        Помечает задачу удаленной.
+
+        Возвращает:
+            False, если задачи с таким id нет.
+        '''
+
+        with self._write():
+            offset = self._get_offset(id)
+            if offset is None:
+                return False
+            self._map[offset + DELETED_OFFSET] = 1
+            del self._slots[id]
+            self._touch()
+        return True
+
+    def delete_category(
+            self,
+            category: str,
+            data: list[dict] | None = None,
+            ) -> int:
+        '''
+        Помечает удаленными все задачи категории.
+
+        Возвращает:
+            количество удаленных задач.
+        '''
+
+        with self._write():
+            ids = [
+                int(row.get('id')) for row in self
+                if row.get('category') == category
+            ]
+            for id in ids:
+                self._map[self._get_offset(id) + DELETED_OFFSET] = 1
+                del self._slots[id]
+            if ids:
+                self._touch()
+        return len(ids)
+
+    def update_many(
+            self,
+            rows: Iterable[dict],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            super().update_many(rows, data)
+
+    def delete_many(
+            self,
+            ids: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            super().delete_many(ids, data)
+
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Записывает все изменения под одной блокировкой.'''
+
+        with self._write():
+            super().write_batch(created, updated, deleted, data)
+
+    def export_csv(self, csv_filename: str) -> int:
+        '''
+        Записывает все задачи в csv файл.
+
+        Возвращает:
+            количество записанных задач.
+        '''
+
+        count = 0
+        with open(csv_filename, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writeheader()
+            for row in self:
+                writer.writerow(row)
+                count += 1
+        return count
+
+    @classmethod
+    def import_csv(cls, csv_filename: str, filename: str):
+        '''
+        Создает двоичное хранилище из csv файла.
+
+        Существующее хранилище filename перезаписывается.
+
+        Возвращает:
+            открытое BinaryStorage.
+        '''
+
+        for name in (filename, filename + BINARY_HEAP_SUFFIX):
+            if os.path.isfile(name):
+                os.remove(name)
+        storage = cls(filename)
+        with open(csv_filename, 'r', encoding='utf-8', newline='') as file:
+            storage.insert_many(csv.DictReader(file))
+        return storage
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in ('import', 'export'):
+        print('Использование: python -m binstore import|export '
+              '<откуда> <куда>')
+        sys.exit(1)
+    if sys.argv[1] == 'import':
+        with BinaryStorage.import_csv(sys.argv[2], sys.argv[3]) as storage:
+            print(f'Импортировано задач: {len(storage)}')
+    else:
+        with BinaryStorage(sys.argv[2]) as storage:
+            print(f'Выгружено задач: {storage.export_csv(sys.argv[3])}')
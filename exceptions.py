@@ -2,3 +2,17 @@ class FileError(Exception):
     '''Вызывается при попытке создать файл с неверным расширением'''
 
     pass
+
+
+class RequestError(Exception):
+    '''Вызывается при неверном запросе к HTTP серверу'''
+
+    def __init__(self, status: int, message: str):
+        '''
+        Атрибуты:
+            status: код ответа HTTP.
+            message: описание ошибки для клиента.
+        '''
+
+        super().__init__(message)
+        self.status = status
@@ -0,0 +1,211 @@
+'''
+Индекс id задач в csv файле.
+
+Индекс хранится в файле <filename>.idx: заголовок и отсортированные
+по id записи фиксированной длины (id, смещение строки задачи в csv
+файле в байтах). Задача по id находится бинарным поиском по файлу
+индекса - O(log n) чтений по RECORD.size байт - и разбором одной
+строки csv файла, поэтому весь файл с данными не читается.
+
+Заголовок хранит время изменения и размер csv файла, для которых
+индекс построен. Если csv файл изменили без обновления индекса
+(например, другой процесс или journal.compact), то при следующем
+поиске индекс строится заново одним проходом по файлу.
+'''
+
+import csv
+import io
+import os
+import struct
+import tempfile
+from typing import Iterator
+
+from settings import ID_INDEX_SUFFIX
+
+
+MAGIC = b'IDX1'
+
+# magic, время изменения и размер csv файла.
+HEADER = struct.Struct('<4sqq')
+
+# id, смещение строки в csv файле.
+RECORD = struct.Struct('<qq')
+
+
+def iter_records(file, offset: int = 0) -> Iterator[tuple[int, bytes]]:
+    '''
+    Читает записи csv файла, открытого в двоичном режиме.
+
+    Запись заканчивается на строке, после которой количество кавычек
+    с начала записи четное, поэтому переводы строк внутри полей
+    в кавычках не разбивают запись.
+
+    Аргументы:
+        file: csv файл.
+        offset: смещение начала первой записи.
+
+    Возвращает:
+        генератор пар (смещение записи, байты записи).
+    '''
+
+    file.seek(offset)
+    start = offset
+    record = b''
+    for line in file:
+        record += line
+        if record.count(b'"') % 2 == 0:
+            yield start, record
+            start += len(record)
+            record = b''
+    if record:
+        yield start, record
+
+
+def parse_record(record: bytes) -> list[str]:
+    return next(csv.reader(io.StringIO(record.decode('utf-8'))))
+
+
+class IdIndex():
+    '''
+    Индекс id -> смещение строки в csv файле.
+
+    Атрибуты:
+        filename: путь к csv файлу с данными.
+        name: путь к файлу индекса.
+
+    Методы:
+        exists
+        is_valid
+        build
+        update_after_append
+        find
+        get.
+    '''
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.name = filename + ID_INDEX_SUFFIX
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.name)
+
+    def _get_header(self) -> bytes:
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return HEADER.pack(MAGIC, 0, 0)
+        return HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size)
+
+    def is_valid(self) -> bool:
+        '''Проверяет, построен ли индекс для текущей версии csv файла.'''
+
+        try:
+            with open(self.name, 'rb') as file:
+                return file.read(HEADER.size) == self._get_header()
+        except FileNotFoundError:
+            return False
+
+    def _scan(self, offset: int = 0) -> list[tuple[int, int]]:
+        '''
+        Возвращает пары (id, смещение) для записей csv файла,
+        начиная со смещения offset, без заголовка и пустых строк.
+        '''
+
+        entries = []
+        with open(self.filename, 'rb') as file:
+            for start, record in iter_records(file, offset):
+                if start == 0 or not record.strip():
+                    continue
+                id = record.split(b',', 1)[0].strip(b'"')
+                entries.append((int(id), start))
+        return entries
+
+    def _write(self, entries: list[tuple[int, int]]) -> None:
+        descriptor, temp_name = tempfile.mkstemp(
+            prefix=os.path.basename(self.name) + '.', suffix='.tmp',
+            dir=os.path.dirname(self.name) or None
+        )
+        with open(descriptor, 'wb') as file:
+            file.write(self._get_header())
+            file.write(b''.join(RECORD.pack(*entry) for entry in entries))
+        os.replace(temp_name, self.name)
+
+    def build(self) -> None:
+        '''Строит индекс заново одним проходом по csv файлу.'''
+
+        entries = self._scan()
+        entries.sort()
+        self._write(entries)
+
+    def update_after_append(self, offset: int, was_valid: bool) -> None:
+        '''
+        Добавляет в индекс задачи, дописанные в конец csv файла.
+
+        Если индекс был построен для файла до записи, а id новых задач
+        больше всех id в индексе, то записи дописываются в конец
+        индекса. Иначе индекс строится заново.
+
+        Аргументы:
+            offset: размер csv файла до записи.
+            was_valid: результат is_valid до записи.
+        '''
+
+        if not was_valid:
+            self.build()
+            return
+        entries = self._scan(offset)
+        ids = [id for id, _ in entries]
+        with open(self.name, 'r+b') as file:
+            size = file.seek(0, os.SEEK_END)
+            if size > HEADER.size:
+                file.seek(size - RECORD.size)
+                ids.insert(0, RECORD.unpack(file.read(RECORD.size))[0])
+            if all(a < b for a, b in zip(ids, ids[1:])):
+                file.seek(size)
+                file.write(b''.join(
+                    RECORD.pack(*entry) for entry in entries
+                ))
+                file.seek(0)
+                file.write(self._get_header())
+                return
+        self.build()
+
+    def find(self, id: int) -> int | None:
+        '''
+        Возвращает смещение строки задачи с указанным id или None.
+
+        Если индекс устарел, то сначала строит его заново.
+        '''
+
+        if not self.is_valid():
+            self.build()
+        with open(self.name, 'rb') as file:
+            low = 0
+            high = (file.seek(0, os.SEEK_END) - HEADER.size) // RECORD.size
+            while low < high:
+                mid = (low + high) // 2
+                file.seek(HEADER.size + mid * RECORD.size)
+                mid_id, offset = RECORD.unpack(file.read(RECORD.size))
+                if mid_id < id:
+                    low = mid + 1
+                elif mid_id > id:
+                    high = mid
+                else:
+                    return offset
+        return None
+
+    def get(self, id: int) -> dict | None:
+        '''
+        Возвращает задачу с указанным id из csv файла или None.
+
+        Читается только заголовок csv файла и строка задачи.
+        '''
+
+        offset = self.find(id)
+        if offset is None:
+            return None
+        with open(self.filename, 'rb') as file:
+            _, header = next(iter_records(file))
+            _, record = next(iter_records(file, offset))
+        row = dict(zip(parse_record(header), parse_record(record)))
+        return row if row.get('id') == str(id) else None
@@ -0,0 +1,329 @@
+'''
+Массовый импорт задач из csv или JSON Lines файла.
+
+Файл читается потоково и делится на части по IMPORT_CHUNK_SIZE строк.
+Части проверяются и приводятся к общему виду в ProcessPoolExecutor:
+лишние пробелы убираются, дата приводится к формату DD-MM-YYYY,
+приоритет и статус - к нижнему регистру и проверяются по тем же
+правилам, что и в главном меню (см. validation.py). Для строк JSON
+Lines в процессах выполняется и разбор JSON.
+
+Принятым задачам выдаются новые id одной записью в служебный файл
+(IdAllocator.next_ids), после чего они дописываются в хранилище одной
+записью (TaskRepository.insert_many). id из импортируемого файла
+не используются. Отклоненные строки выводятся с причинами.
+
+Запуск из корневой папки проекта:
+    python -m importer tasks.jsonl [--file data.csv] [--workers N]
+        [--chunk-size N] [--rejected rejected.csv]
+'''
+
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from datetime import date
+from typing import Iterable, Iterator
+
+from instrumentation import enable_from_environment
+from main import TaskManager, check_file
+from meta import IdAllocator
+from repository import get_data_file
+from settings import (FIELD_NAMES, IMPORT_CHUNK_SIZE, STATUSES,
+                      STORAGE_BACKEND)
+from validation import ERRORS, check_field
+
+
+DATE_RE = re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})')
+
+
+def normalize_date(value) -> str | None:
+    '''
+    Приводит дату вида D-M-YYYY к формату DD-MM-YYYY.
+
+    Работает быстрее datetime.strptime, которую использует
+    validation.is_valid_date, и принимает те же даты.
+
+    Возвращает:
+        дату в формате DD-MM-YYYY или None, если дата неверная.
+    '''
+
+    match = DATE_RE.fullmatch(value) if isinstance(value, str) else None
+    if match is None:
+        return None
+    day, month, year = map(int, match.groups())
+    try:
+        date(year, month, day)
+    except ValueError:
+        return None
+    return f'{day:02}-{month:02}-{year}'
+
+
+def normalize_row(item: dict | str) -> dict:
+    '''
+    Проверяет одну импортируемую задачу и приводит ее к общему виду.
+
+    Аргументы:
+        item: словарь задачи или строка JSON.
+
+    Возвращает:
+        словарь задачи без id со значениями-строками.
+
+    Вызывает:
+        ValueError: с перечислением ошибок, если задачу нельзя принять.
+    '''
+
+    if isinstance(item, str):
+        try:
+            item = json.loads(item)
+        except ValueError:
+            raise ValueError('строка не является объектом JSON')
+        if not isinstance(item, dict):
+            raise ValueError('строка не является объектом JSON')
+    row = {}
+    for field in FIELD_NAMES[1:]:
+        value = item.get(field)
+        row[field] = value.strip() if isinstance(value, str) else value
+    if row.get('status') in (None, ''):
+        row['status'] = STATUSES[0]
+    # Значения не строкой (например, {"prio": 1}) не приводятся
+    # к нижнему регистру и отклоняются проверкой check_field.
+    for field in ('prio', 'status'):
+        if isinstance(row.get(field), str):
+            row[field] = row[field].lower()
+    row['date'] = normalize_date(row.get('date'))
+    errors = []
+    for field, value in row.items():
+        if field == 'date':
+            error = ERRORS['date'] if value is None else None
+        else:
+            error = check_field(field, value)
+        if error is not None:
+            errors.append(error)
+    if errors:
+        raise ValueError(' '.join(errors))
+    return row
+
+
+def normalize_chunk(
+        chunk: list[tuple[int, dict | str]],
+        ) -> tuple[list[dict], list[tuple[int, str]]]:
+    '''
+    Проверяет часть файла. Выполняется в процессе из пула.
+
+    Аргументы:
+        chunk: пары (номер строки, задача).
+
+    Возвращает:
+        принятые задачи и пары (номер строки, причина) для отклоненных.
+    '''
+
+    accepted = []
+    rejected = []
+    for number, item in chunk:
+        try:
+            accepted.append(normalize_row(item))
+        except ValueError as error:
+            rejected.append((number, str(error)))
+    return accepted, rejected
+
+
+def read_items(source: str) -> Iterator[tuple[int, dict | str]]:
+    '''
+    Читает задачи из файла по одной.
+
+    Файлы с расширением .jsonl или .json читаются как JSON Lines
+    (строки разбираются в normalize_row), остальные - как csv файлы
+    с заголовком из FIELD_NAMES.
+
+    Возвращает:
+        генератор пар (номер строки, задача).
+    '''
+
+    with open(source, 'r', encoding='utf-8', newline='') as file:
+        if os.path.splitext(source)[1] in ('.jsonl', '.json'):
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    yield number, line
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def iter_chunks(
+        items: Iterable,
+        size: int,
+        ) -> Iterator[list]:
+    '''Делит поток на списки по size элементов.'''
+
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def validate_chunks(
+        chunks: Iterable[list],
+        executor: Executor | None,
+        max_pending: int,
+        ) -> Iterator[tuple[list[dict], list[tuple[int, str]]]]:
+    '''
+    Проверяет части в executor, сохраняя их порядок.
+
+    В обработке одновременно находится не больше max_pending частей,
+    поэтому файл не считывается в память целиком. Если executor = None,
+    то части проверяются в текущем процессе.
+    '''
+
+    if executor is None:
+        yield from map(normalize_chunk, chunks)
+        return
+    pending = deque()
+    for chunk in chunks:
+        pending.append(executor.submit(normalize_chunk, chunk))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+class ImportResult():
+    '''
+    Итоги импорта.
+
+    Атрибуты:
+        read: количество прочитанных задач.
+        accepted: количество записанных задач.
+        rejected: пары (номер строки, причина) для отклоненных задач.
+        ids: диапазон id, выданных записанным задачам.
+        validate_time: время чтения и проверки в секундах.
+        write_time: время записи в секундах.
+    '''
+
+    def __init__(self):
+        self.read = 0
+        self.accepted = 0
+        self.rejected = []
+        self.ids = range(0)
+        self.validate_time = 0.0
+        self.write_time = 0.0
+
+    def get_stats(self) -> str:
+        '''Возвращает строку со скоростью импорта.'''
+
+        total = self.validate_time + self.write_time
+        speed = self.read / total if total else 0
+        return (f'Прочитано: {self.read}, записано: {self.accepted}, '
+                f'отклонено: {len(self.rejected)}. '
+                f'Проверка: {self.validate_time:.2f} с, '
+                f'запись: {self.write_time:.2f} с, '
+                f'{speed:.0f} задач/с')
+
+
+def import_file(
+        source: str,
+        filename: str,
+        manager: TaskManager | None = None,
+        workers: int | None = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        ) -> ImportResult:
+    '''
+    Импортирует задачи из source в хранилище filename.
+
+    Аргументы:
+        source: путь к csv или JSON Lines файлу.
+        filename: путь к файлу хранилища.
+        manager: TaskManager, через который выполняется запись.
+        workers: количество процессов для проверки, по умолчанию -
+        количество ядер. При workers = 0 проверка выполняется в
+        текущем процессе.
+        chunk_size: количество задач в одной части.
+
+    Возвращает:
+        ImportResult.
+    '''
+
+    manager = manager or TaskManager()
+    repository = manager.get_repository(filename)
+    result = ImportResult()
+    accepted = []
+    start = time.perf_counter()
+    workers = os.cpu_count() if workers is None else workers
+    executor = ProcessPoolExecutor(workers) if workers else None
+    try:
+        chunks = iter_chunks(read_items(source), chunk_size)
+        for rows, rejected in validate_chunks(
+            chunks, executor, max(2 * workers, 1)
+        ):
+            result.read += len(rows) + len(rejected)
+            accepted.extend(rows)
+            result.rejected.extend(rejected)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    result.validate_time = time.perf_counter() - start
+    start = time.perf_counter()
+    if accepted:
+        allocator = IdAllocator(filename)
+        for row in repository:
+            allocator.observe(int(row.get('id')))
+        result.ids = allocator.next_ids(len(accepted))
+        for id, row in zip(result.ids, accepted):
+            row['id'] = str(id)
+        repository.insert_many(
+            {field: row.get(field) for field in FIELD_NAMES}
+            for row in accepted
+        )
+        result.accepted = len(accepted)
+    result.write_time = time.perf_counter() - start
+    return result
+
+
+def write_rejected(rejected: list[tuple[int, str]], filename: str) -> None:
+    '''Записывает номера отклоненных строк и причины в csv файл.'''
+
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['line', 'reason'])
+        writer.writerows(rejected)
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Массовый импорт задач из csv или JSON Lines файла.'
+    )
+    parser.add_argument('source')
+    parser.add_argument('--file', default=get_data_file(STORAGE_BACKEND))
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+    parser.add_argument('--rejected')
+    args = parser.parse_args(args)
+    enable_from_environment()
+    check_file(args.file)
+    manager = TaskManager()
+    try:
+        result = import_file(
+            args.source, args.file, manager, args.workers, args.chunk_size
+        )
+    finally:
+        manager.close()
+    for number, reason in result.rejected[:20]:
+        print(f'Строка {number}: {reason}')
+    if len(result.rejected) > 20:
+        print(f'... и еще {len(result.rejected) - 20}')
+    if args.rejected is not None:
+        write_rejected(result.rejected, args.rejected)
+    print(result.get_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,328 @@
+import heapq
+import json
+import re
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from itertools import islice
+from typing import Iterable
+
+from settings import TEXT_FIELDS, TEXT_PREFIX_SEARCH
+from sorting import MAX_ORDINAL, parse_date
+
+
+WORD_RE = re.compile(r'\w+')
+
+OR_WORDS = ('или', 'or')
+
+
+class FieldIndex():
+    '''
+    Инвертированный индекс по одному полю задачи.
+
+    Хранит словарь, в котором ключи - значения поля, а
+    значения - множества id задач с этим значением.
+
+    Методы:
+        add
+        remove
+        get.
+    '''
+
+    def __init__(self, field: str):
+        '''
+        Атрибуты:
+            field: название поля задачи, по которому строится индекс.
+        '''
+
+        self.field = field
+        self.ids = {}
+
+    def __contains__(self, value: str) -> bool:
+        return value in self.ids
+
+    def add(self, row: dict) -> None:
+        '''Добавляет задачу в индекс.'''
+
+        value = row.get(self.field)
+        self.ids.setdefault(value, set()).add(int(row.get('id')))
+
+    def remove(self, row: dict) -> None:
+        '''Удаляет задачу из индекса.'''
+
+        value = row.get(self.field)
+        ids = self.ids.get(value)
+        if ids is None:
+            return
+        ids.discard(int(row.get('id')))
+        if not ids:
+            del self.ids[value]
+
+    def get(self, value: str) -> set[int]:
+        '''Возвращает множество id задач с указанным значением поля.'''
+
+        return self.ids.get(value, set())
+
+
+class DateIndex():
+    '''
+    Индекс сроков выполнения задач.
+
+    Для каждого статуса хранит отсортированный список пар
+    (порядковый номер дня срока, id). Дата разбирается один раз при
+    добавлении задачи (см. Task.date_ordinal), а границы интервала
+    находятся бисекцией, поэтому поиск занимает O(log n + k), где
+    k - количество найденных задач. Задачи с неверной датой в индекс
+    не попадают.
+
+    Методы:
+        add
+        remove
+        search
+        from_rows.
+    '''
+
+    def __init__(self):
+        self.keys = {}
+
+    @staticmethod
+    def get_key(row: Mapping) -> tuple[int, int] | None:
+        '''
+        Возвращает пару (порядковый номер дня срока, id) или None,
+        если дата неверная.
+        '''
+
+        ordinal = getattr(row, 'date_ordinal', None)
+        if ordinal is None:
+            ordinal = parse_date(row.get('date'))
+        if ordinal > MAX_ORDINAL:
+            return None
+        return ordinal, int(row.get('id'))
+
+    def add(self, row: Mapping) -> None:
+        '''Добавляет задачу в индекс.'''
+
+        key = self.get_key(row)
+        if key is not None:
+            insort(self.keys.setdefault(row.get('status'), []), key)
+
+    def remove(self, row: Mapping) -> None:
+        '''Удаляет задачу из индекса.'''
+
+        key = self.get_key(row)
+        keys = self.keys.get(row.get('status'))
+        if key is None or keys is None:
+            return
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping]):
+        '''
+        Строит индекс по всем задачам, сортируя каждый список один раз.
+        '''
+
+        index = cls()
+        for row in rows:
+            key = cls.get_key(row)
+            if key is not None:
+                index.keys.setdefault(row.get('status'), []).append(key)
+        for keys in index.keys.values():
+            keys.sort()
+        return index
+
+    def search(
+            self,
+            start: int | None = None,
+            end: int | None = None,
+            status: str | None = None,
+            ) -> list[int]:
+        '''
+        Поиск задач со сроком в интервале.
+
+        Аргументы:
+            start: первый день интервала (порядковый номер) или None.
+            end: последний день интервала включительно или None.
+            status: если указан, то ищутся только задачи с этим статусом.
+
+        Возвращает:
+            список id, отсортированный по сроку, а затем по id.
+        '''
+
+        if status is not None:
+            lists = [self.keys.get(status, [])]
+        else:
+            lists = list(self.keys.values())
+        parts = []
+        for keys in lists:
+            low = 0 if start is None else bisect_left(keys, (start,))
+            high = len(keys) if end is None else bisect_left(
+                keys, (end + 1,)
+            )
+            parts.append(keys[low:high])
+        return [id for _, id in heapq.merge(*parts)]
+
+
+class TextIndex():
+    '''
+    Полнотекстовый индекс по полям TEXT_FIELDS.
+
+    Текст разбивается на слова и приводится к нижнему регистру.
+    Хранит словарь, в котором ключи - слова, а значения - множества id
+    задач, в которых они встречаются. Для поиска по началу слова
+    используется отсортированный список слов.
+
+    Методы:
+        add
+        remove
+        search
+        save
+        load.
+    '''
+
+    def __init__(self, fields: list[str] = TEXT_FIELDS):
+        '''
+        Атрибуты:
+            fields: поля задачи, по которым строится индекс.
+        '''
+
+        self.fields = fields
+        self.ids = {}
+        self._words = None
+
+    def get_words(self, row: dict) -> set[str]:
+        '''Возвращает множество слов из индексируемых полей задачи.'''
+
+        words = set()
+        for field in self.fields:
+            words.update(tokenize(row.get(field) or ''))
+        return words
+
+    def add(self, row: dict) -> None:
+        '''Добавляет задачу в индекс.'''
+
+        id = int(row.get('id'))
+        for word in self.get_words(row):
+            if word not in self.ids:
+                self.ids[word] = set()
+                if self._words is not None:
+                    insort(self._words, word)
+            self.ids[word].add(id)
+
+    def remove(self, row: dict) -> None:
+        '''Удаляет задачу из индекса.'''
+
+        id = int(row.get('id'))
+        for word in self.get_words(row):
+            ids = self.ids.get(word)
+            if ids is None:
+                continue
+            ids.discard(id)
+            if not ids:
+                del self.ids[word]
+                if self._words is not None:
+                    del self._words[bisect_left(self._words, word)]
+
+    def _match(self, word: str, prefix: bool) -> set[int]:
+        if not prefix:
+            return self.ids.get(word, set())
+        if self._words is None:
+            self._words = sorted(self.ids)
+        result = set()
+        start = bisect_left(self._words, word)
+        for item in islice(self._words, start, None):
+            if not item.startswith(word):
+                break
+            result |= self.ids[item]
+        return result
+
+    def search(
+            self,
+            query: str,
+            prefix: bool = TEXT_PREFIX_SEARCH,
+            mode: str | None = None,
+            ) -> set[int]:
+        '''
+        Поиск задач по словам запроса.
+
+        Аргументы:
+            query: строка запроса. Если в ней есть слово "или" ("or"),
+            то по умолчанию ищутся задачи с любым из слов.
+            prefix: если True, то слово запроса совпадает со всеми
+            словами, которые с него начинаются.
+            mode: 'and' - задачи со всеми словами запроса,
+            'or' - задачи с любым из слов.
+
+        Возвращает:
+            множество id найденных задач.
+        '''
+
+        words, query_mode = parse_query(query)
+        mode = mode or query_mode
+        result = None
+        for word in words:
+            ids = self._match(word, prefix)
+            if result is None:
+                result = set(ids)
+            elif mode == 'or':
+                result |= ids
+            else:
+                result &= ids
+        return result or set()
+
+    def save(self, filename: str, signature) -> None:
+        '''
+        Сохраняет индекс в файл вместе с подписью файла с данными.
+        '''
+
+        to_write = {
+            'signature': signature,
+            'fields': self.fields,
+            'ids': {word: sorted(ids) for word, ids in self.ids.items()},
+        }
+        with open(filename, 'w', encoding='utf-8') as file:
+            json.dump(to_write, file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, filename: str, signature):
+        '''
+        Загружает индекс из файла.
+
+        Возвращает:
+            TextIndex или None, если файла нет, он поврежден или
+            подпись не совпадает с текущей подписью файла с данными.
+        '''
+
+        try:
+            with open(filename, 'r', encoding='utf-8') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if saved.get('signature') != json.loads(json.dumps(signature)):
+            return None
+        index = cls(saved.get('fields'))
+        index.ids = {word: set(ids) for word, ids in saved['ids'].items()}
+        return index
+
+
+def tokenize(text: str) -> list[str]:
+    '''Разбивает текст на слова в нижнем регистре.'''
+
+    return WORD_RE.findall(text.casefold())
+
+
+def parse_query(query: str) -> tuple[list[str], str]:
+    '''
+    Разбирает строку запроса.
+
+    Возвращает:
+        список слов запроса и режим поиска: 'or', если в запросе есть
+        слово "или" ("or"), иначе 'and'.
+    '''
+
+    words = tokenize(query)
+    mode = 'and'
+    if any(word in OR_WORDS for word in words):
+        mode = 'or'
+        words = [word for word in words if word not in OR_WORDS]
+    return words, mode
@@ -0,0 +1,329 @@
+'''
+Замеры операций TaskManager и TaskStore.
+
+Замеры выключены по умолчанию. Включить их можно настройкой INSTRUMENT
+или переменной окружения TASKS_INSTRUMENT:
+    TASKS_INSTRUMENT=1 или table - при выходе вывести таблицу;
+    TASKS_INSTRUMENT=json - при выходе вывести JSON;
+    TASKS_INSTRUMENT=путь.json - при выходе записать JSON в файл.
+
+Для каждой операции, отмеченной декоратором instrumented, собираются
+количество вызовов, гистограмма времени выполнения, количество
+просмотренных и найденных задач (см. count_rows), количество открытых
+файлов и, в Linux, количество прочитанных и записанных байт
+(по /proc/self/io). Вложенные операции входят в замеры внешних.
+
+В главном меню любую команду можно выполнить под cProfile, добавив
+перед ней слово "профиль", например, "профиль 5" (см. profile_call).
+'''
+
+import atexit
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import time
+
+from settings import INSTRUMENT, INSTRUMENT_OUTPUT
+
+
+# Верхние границы интервалов гистограммы времени в миллисекундах.
+BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000, float('inf'))
+
+PROC_IO = '/proc/self/io'
+
+
+def read_io() -> tuple[int, int, int] | None:
+    '''
+    Возвращает количество прочитанных и записанных процессом байт и
+    размер самого отчета /proc/self/io или None, если он недоступен.
+    '''
+
+    try:
+        with open(PROC_IO, 'r') as file:
+            text = file.read()
+    except OSError:
+        return None
+    values = dict(line.split(': ') for line in text.splitlines())
+    return int(values['rchar']), int(values['wchar']), len(text)
+
+
+class OperationStats():
+    '''
+    Накопленные замеры одной операции.
+
+    Атрибуты:
+        calls: количество вызовов.
+        total: суммарное время в секундах.
+        max: наибольшее время одного вызова в секундах.
+        histogram: количество вызовов по интервалам BUCKETS.
+        scanned: количество просмотренных задач.
+        returned: количество найденных задач.
+        bytes_read: количество прочитанных байт.
+        bytes_written: количество записанных байт.
+        opens: количество открытых файлов.
+    '''
+
+    def __init__(self):
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * len(BUCKETS)
+        self.scanned = 0
+        self.returned = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.opens = 0
+
+    def add_time(self, elapsed: float) -> None:
+        self.calls += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        for i, bound in enumerate(BUCKETS):
+            if elapsed * 1000 <= bound:
+                self.histogram[i] += 1
+                break
+
+    def get_percentile(self, share: float) -> float:
+        '''
+        Возвращает верхнюю границу интервала гистограммы, в который
+        попадает указанная доля вызовов, в миллисекундах.
+        '''
+
+        needed = share * self.calls
+        count = 0
+        for bound, calls in zip(BUCKETS, self.histogram):
+            count += calls
+            if count >= needed:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+    def to_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total_ms': self.total * 1000,
+            'max_ms': self.max * 1000,
+            'p50_ms': self.get_percentile(0.5),
+            'p95_ms': self.get_percentile(0.95),
+            'histogram_ms': {
+                str(bound): calls
+                for bound, calls in zip(BUCKETS, self.histogram) if calls
+            },
+            'scanned': self.scanned,
+            'returned': self.returned,
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written,
+            'opens': self.opens,
+        }
+
+
+class Metrics():
+    '''
+    Замеры всех операций процесса.
+
+    Методы:
+        enable
+        operation
+        count_rows
+        to_dict
+        format_table
+        dump.
+    '''
+
+    def __init__(self):
+        self.enabled = False
+        self.output = INSTRUMENT_OUTPUT
+        self.operations = {}
+        self._stack = []
+        self._opens = 0
+        self._hooked = False
+        self._reading_io = False
+        self._io_overhead = 0
+
+    def _audit(self, event: str, args: tuple) -> None:
+        if event == 'open' and self.enabled and not self._reading_io:
+            self._opens += 1
+
+    def _read_io(self) -> tuple[int, int] | None:
+        '''
+        Читает /proc/self/io, не учитывая это чтение в замерах.
+
+        Возвращает:
+            количество прочитанных и записанных процессом байт без
+            учета чтений самого /proc/self/io или None.
+        '''
+
+        self._reading_io = True
+        try:
+            result = read_io()
+        finally:
+            self._reading_io = False
+        if result is None:
+            return None
+        overhead = self._io_overhead
+        self._io_overhead += result[2]
+        return result[0] - overhead, result[1]
+
+    def enable(self, output: str = INSTRUMENT_OUTPUT) -> None:
+        '''
+        Включает замеры и вывод результатов при выходе.
+
+        Аргументы:
+            output: 'table', 'json' или путь к JSON файлу.
+        '''
+
+        self.output = output
+        if not self._hooked:
+            sys.addaudithook(self._audit)
+            atexit.register(self.dump)
+            self._hooked = True
+        self.enabled = True
+
+    def operation(self, name: str):
+        '''
+        Контекстный менеджер, который замеряет операцию name.
+        '''
+
+        return _Operation(self, name)
+
+    def count_rows(self, scanned: int, returned: int) -> None:
+        '''
+        Добавляет количество просмотренных и найденных задач
+        к текущей операции.
+        '''
+
+        if self.enabled and self._stack:
+            stats = self._stack[-1]
+            stats.scanned += scanned
+            stats.returned += returned
+
+    def to_dict(self) -> dict:
+        return {
+            name: stats.to_dict()
+            for name, stats in sorted(self.operations.items())
+        }
+
+    def format_table(self) -> str:
+        '''Возвращает таблицу с замерами всех операций.'''
+
+        lines = [
+            f'{"операция":<28}{"вызовы":>7}{"всего мс":>10}{"p50":>8}'
+            f'{"p95":>8}{"макс":>8}{"просм.":>9}{"найд.":>8}'
+            f'{"чтение":>10}{"запись":>10}{"open":>6}'
+        ]
+        for name, stats in sorted(self.operations.items()):
+            lines.append(
+                f'{name:<28}{stats.calls:>7}{stats.total * 1000:>10.1f}'
+                f'{stats.get_percentile(0.5):>8.1f}'
+                f'{stats.get_percentile(0.95):>8.1f}'
+                f'{stats.max * 1000:>8.1f}{stats.scanned:>9}'
+                f'{stats.returned:>8}{stats.bytes_read:>10}'
+                f'{stats.bytes_written:>10}{stats.opens:>6}'
+            )
+        return '\n'.join(lines)
+
+    def dump(self, output: str | None = None) -> None:
+        '''
+        Выводит замеры в виде таблицы или JSON, либо записывает
+        JSON в файл, см. enable.
+        '''
+
+        output = output or self.output
+        if not self.operations:
+            return
+        if output == 'table':
+            print(self.format_table())
+        elif output == 'json':
+            print(json.dumps(self.to_dict(), indent=2, ensure_ascii=False))
+        else:
+            with open(output, 'w', encoding='utf-8') as file:
+                json.dump(self.to_dict(), file, indent=2, ensure_ascii=False)
+
+
+class _Operation():
+
+    def __init__(self, metrics: Metrics, name: str):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        metrics = self.metrics
+        if not metrics.enabled:
+            self.stats = None
+            return self
+        self.stats = metrics.operations.setdefault(
+            self.name, OperationStats()
+        )
+        metrics._stack.append(self.stats)
+        self.io = metrics._read_io()
+        self.opens = metrics._opens
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args) -> None:
+        if self.stats is None:
+            return
+        elapsed = time.perf_counter() - self.start
+        stats = self.stats
+        metrics = self.metrics
+        metrics._stack.pop()
+        stats.add_time(elapsed)
+        stats.opens += metrics._opens - self.opens
+        end = metrics._read_io()
+        if self.io is not None and end is not None:
+            stats.bytes_read += end[0] - self.io[0]
+            stats.bytes_written += end[1] - self.io[1]
+
+
+metrics = Metrics()
+
+
+def instrumented(name: str):
+    '''
+    Декоратор, который замеряет каждый вызов функции как операцию name.
+    '''
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            with metrics.operation(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def profile_call(func, *args, limit: int = 20, **kwargs):
+    '''
+    Выполняет func под cProfile и выводит limit самых долгих функций.
+
+    Возвращает:
+        результат func.
+    '''
+
+    profiler = cProfile.Profile()
+    result = profiler.runcall(func, *args, **kwargs)
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(
+        'cumulative'
+    ).print_stats(limit)
+    print(stream.getvalue())
+    return result
+
+
+def enable_from_environment() -> None:
+    '''
+    Включает замеры, если это указано в INSTRUMENT или TASKS_INSTRUMENT.
+    '''
+
+    value = os.environ.get('TASKS_INSTRUMENT', '')
+    if value == '0':
+        return
+    if value:
+        metrics.enable('table' if value == '1' else value)
+    elif INSTRUMENT:
+        metrics.enable()
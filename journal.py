@@ -0,0 +1,217 @@
+import csv
+import os
+from typing import Iterable, Iterator
+
+from atomic import atomic_open
+from settings import (FIELD_NAMES, FSYNC_POLICY, LOG_FIELD_NAMES,
+                      LOG_MAX_SIZE, LOG_SUFFIX)
+
+
+OPERATIONS = ('create', 'update', 'status', 'delete', 'delete_category')
+
+
+def get_log_name(filename: str) -> str:
+    '''
+    Возвращает путь к журналу изменений для указанного файла данных.
+    '''
+
+    return filename + LOG_SUFFIX
+
+
+def append_record(filename: str, op: str, row: dict) -> None:
+    '''
+    Дописывает одну запись в журнал изменений.
+
+    Аргументы:
+        filename: путь к файлу с данными.
+        op: тип операции, одна из OPERATIONS.
+        row: данные операции. Для 'delete' достаточно id,
+        для 'delete_category' - категории, для 'status' - id и статуса.
+    '''
+
+    append_records(filename, [(op, row)])
+
+
+def append_records(
+        filename: str,
+        records: Iterable[tuple[str, dict]],
+        ) -> None:
+    '''
+    Дописывает несколько записей в журнал изменений за одно открытие
+    файла.
+
+    Аргументы:
+        filename: путь к файлу с данными.
+        records: пары (операция, данные), как аргументы append_record.
+    '''
+
+    with open(
+        get_log_name(filename), 'a', encoding='utf-8', newline=''
+    ) as file:
+        writer = csv.DictWriter(file, fieldnames=LOG_FIELD_NAMES)
+        if file.tell() == 0:
+            writer.writeheader()
+        for op, row in records:
+            if op not in OPERATIONS:
+                raise ValueError(f'Неизвестная операция журнала: {op}')
+            record = {'op': op}
+            for field in FIELD_NAMES:
+                record[field] = row.get(field, '')
+            writer.writerow(record)
+
+
+def replay(data: list[dict], filename: str) -> list[dict]:
+    '''
+    Применяет записи журнала к данным, прочитанным из основного файла.
+
+    Создание задачи, которая уже есть в данных, заменяет ее, поэтому
+    повторное применение журнала (например, если compact прервался
+    после замены основного файла) не создает копий задач.
+
+    Аргументы:
+        data: список словарей задач из основного файла.
+        filename: путь к файлу с данными.
+
+    Возвращает:
+        список словарей задач с учетом всех изменений из журнала.
+    '''
+
+    log_name = get_log_name(filename)
+    if not os.path.isfile(log_name):
+        return data
+    positions = {int(row.get('id')): i for i, row in enumerate(data)}
+    with open(log_name, 'r', encoding='utf-8', newline='') as file:
+        for record in csv.DictReader(file):
+            op = record.pop('op')
+            if op == 'delete_category':
+                for i, row in enumerate(data):
+                    if row is not None and row.get('category') == (
+                        record.get('category')
+                    ):
+                        data[i] = None
+                        del positions[int(row.get('id'))]
+                continue
+            id = int(record.get('id'))
+            if op == 'create' and id not in positions:
+                positions[id] = len(data)
+                data.append(record)
+            elif id not in positions:
+                continue
+            elif op in ('create', 'update'):
+                data[positions[id]] = record
+            elif op == 'status':
+                data[positions[id]]['status'] = record.get('status')
+            elif op == 'delete':
+                data[positions.pop(id)] = None
+    return [row for row in data if row is not None]
+
+
+def iter_replay(rows: Iterable[dict], filename: str) -> Iterator[dict]:
+    '''
+    Потоковый вариант replay.
+
+    Журнал считывается в память целиком (его размер ограничен
+    LOG_MAX_SIZE), а строки основного файла обрабатываются по одной,
+    поэтому основной файл не загружается в память.
+
+    Аргументы:
+        rows: строки основного файла, например, csv.DictReader.
+        filename: путь к файлу с данными.
+
+    Возвращает:
+        генератор словарей задач с учетом изменений из журнала.
+    '''
+
+    log_name = get_log_name(filename)
+    if not os.path.isfile(log_name):
+        yield from rows
+        return
+    events = {}
+    category_events = []
+    created = []
+    with open(log_name, 'r', encoding='utf-8', newline='') as file:
+        for number, record in enumerate(csv.DictReader(file)):
+            op = record.pop('op')
+            if op == 'delete_category':
+                category_events.append((number, op, record))
+                continue
+            id = int(record.get('id'))
+            if op == 'create':
+                created.append((number, record))
+            else:
+                events.setdefault(id, []).append((number, op, record))
+
+    def apply(row: dict, start: int) -> dict | None:
+        history = [
+            event for event in events.get(int(row.get('id')), [])
+            if event[0] > start
+        ]
+        if category_events:
+            history = sorted(history + [
+                event for event in category_events if event[0] > start
+            ], key=lambda event: event[0])
+        for number, op, record in history:
+            if op == 'update':
+                row = record
+            elif op == 'status':
+                row['status'] = record.get('status')
+            elif op == 'delete' or row.get('category') == record.get(
+                'category'
+            ):
+                return None
+        return row
+
+    created_ids = {int(record.get('id')) for number, record in created}
+    present = set()
+    for row in rows:
+        if created_ids and int(row.get('id')) in created_ids:
+            present.add(int(row.get('id')))
+        row = apply(row, -1)
+        if row is not None:
+            yield row
+    for number, record in created:
+        if int(record.get('id')) in present:
+            continue
+        row = apply(record, number)
+        if row is not None:
+            yield row
+
+
+def compact(filename: str, fsync: bool = FSYNC_POLICY == 'always') -> None:
+    '''
+    Сворачивает журнал изменений в основной файл и удаляет журнал.
+
+    Основной файл перезаписывается атомарно (см. atomic.atomic_open),
+    а журнал удаляется только после замены файла.
+    Если журнала нет, то ничего не делает.
+    '''
+
+    log_name = get_log_name(filename)
+    if not os.path.isfile(log_name):
+        return
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        data = replay(list(csv.DictReader(file)), filename)
+    with atomic_open(filename, fsync) as file:
+        writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+        writer.writeheader()
+        writer.writerows(data)
+    os.remove(log_name)
+
+
+def compact_if_needed(
+        filename: str,
+        max_size: int = LOG_MAX_SIZE,
+        fsync: bool = FSYNC_POLICY == 'always',
+        ) -> bool:
+    '''
+    Сворачивает журнал, если его размер превысил max_size байт.
+
+    Возвращает:
+        True, если журнал был свернут.
+    '''
+
+    log_name = get_log_name(filename)
+    if os.path.isfile(log_name) and os.path.getsize(log_name) > max_size:
+        compact(filename, fsync)
+        return True
+    return False
@@ -0,0 +1,98 @@
+'''
+Рекомендательные блокировки файла с данными для нескольких процессов.
+
+Блокировка ставится на отдельный файл <filename>.lock, а не на сам файл
+с данными, поэтому она не теряется, когда файл с данными
+перезаписывается или заменяется. Если модуль fcntl недоступен
+(например, в Windows), то блокировки ничего не делают.
+'''
+
+from contextlib import contextmanager
+
+from settings import LOCK_SUFFIX
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def get_lock_name(filename: str) -> str:
+    '''
+    Возвращает путь к файлу блокировки для указанного файла данных.
+    '''
+
+    return filename + LOCK_SUFFIX
+
+
+class FileLock():
+    '''
+    Разделяемая (чтение) и исключительная (запись) блокировка через flock.
+
+    Повторный захват тем же объектом внутри уже захваченной блокировки
+    не обращается к flock, поэтому запись может перечитать файл под
+    своей исключительной блокировкой. Захватить исключительную
+    блокировку внутри разделяемой нельзя: два процесса, которые делают
+    это одновременно, ждали бы друг друга бесконечно.
+
+    Методы:
+        shared
+        exclusive.
+    '''
+
+    def __init__(self, filename: str):
+        '''
+        Атрибуты:
+            filename: путь к файлу с данными.
+        '''
+
+        self.lock_name = get_lock_name(filename)
+        self._file = None
+        self._depth = 0
+        self._exclusive = False
+
+    def _acquire(self, exclusive: bool) -> None:
+        if self._depth:
+            if exclusive and not self._exclusive:
+                raise RuntimeError(
+                    'Нельзя захватить исключительную блокировку '
+                    'внутри разделяемой'
+                )
+            self._depth += 1
+            return
+        if fcntl is not None:
+            self._file = open(self.lock_name, 'a')
+            fcntl.flock(
+                self._file.fileno(),
+                fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            )
+        self._depth = 1
+        self._exclusive = exclusive
+
+    def _release(self) -> None:
+        self._depth -= 1
+        if self._depth or self._file is None:
+            return
+        fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    @contextmanager
+    def shared(self):
+        '''Разделяемая блокировка для чтения.'''
+
+        self._acquire(False)
+        try:
+            yield self
+        finally:
+            self._release()
+
+    @contextmanager
+    def exclusive(self):
+        '''Исключительная блокировка для записи.'''
+
+        self._acquire(True)
+        try:
+            yield self
+        finally:
+            self._release()
@@ -1,11 +1,40 @@
 import csv
+import gc
 import os
-
-from datetime import datetime
-
-from settings import FIELD_NAMES, RU_TO_ENG, FILE_NAME
+import sqlite3
+import sys
+import threading
+
+from bisect import bisect_left, insort
+from collections.abc import Mapping
+from datetime import date
+
+from settings import (FIELD_NAMES, RU_TO_ENG, USE_LOG, INDEXED_FIELDS,
+                      TEXT_INDEX_SUFFIX, PRIORITIES, STATUSES,
+                      STORAGE_BACKEND, ARCHIVE_AFTER_DAYS,
+                      SNAPSHOT_MIN_TASKS)
+from archive import Archive
+from batch import run_batch
+from binstore import BinaryStorage
 from exceptions import FileError
-from sorting import sort_tasks
+from indexes import DateIndex, FieldIndex, TextIndex
+from instrumentation import (enable_from_environment, instrumented, metrics,
+                             profile_call)
+from meta import IdAllocator
+from pager import Pager
+from querycache import QueryCache
+from repository import (CsvRepository, SqliteRepository, TaskRepository,
+                        get_data_file)
+from shards import ShardedRepository
+from snapshot import Snapshot
+from sorting import (MAX_ORDINAL, PRIO_RANK, STATUS_RANK, format_date,
+                     get_deadline_range, parse_date)
+from validation import check_field
+
+
+# Команда главного меню, начинающаяся с этого слова, выполняется
+# под cProfile, см. instrumentation.profile_call.
+PROFILE_PREFIX = 'профиль '
 
 
 class AskUser():
@@ -54,7 +83,7 @@ class AskUser():
         title = input(self.title)
         validated = False
         while validated is False:
-            if title != '':
+            if check_field('title', title) is None:
                 validated = True
             else:
                 print('У задания должно быть название!')
@@ -73,7 +102,7 @@ class AskUser():
         description = input(self.description)
         validated = False
         while validated is False:
-            if description != '':
+            if check_field('description', description) is None:
                 validated = True
             else:
                 print('У задания должно быть описание!')
@@ -92,7 +121,7 @@ class AskUser():
         cat = input(self.category)
         validated = False
         while validated is False:
-            if cat != '':
+            if check_field('category', cat) is None:
                 validated = True
             else:
                 print('У задания должна быть категория!')
@@ -111,12 +140,9 @@ class AskUser():
         validated = False
         date = input(self.date)
         while validated is False:
-            try:
-                datetime.strptime(date, '%d-%m-%Y').strftime(
-                    '%d-%m-%Y'
-                )
+            if check_field('date', date) is None:
                 validated = True
-            except Exception:
+            else:
                 print('Срок выполнения указан неверно!')
                 print('Укажите дату, к которой задачу нужно выполнить ',
                       'в формате DD-MM-YYYY')
@@ -135,7 +161,7 @@ class AskUser():
         prio = input(self.prio)
         validated = False
         while validated is False:
-            if prio in ['низкий', 'средний', 'высокий']:
+            if check_field('prio', prio) is None:
                 validated = True
             else:
                 print('Приоритет может быть низким средним или высоким!')
@@ -162,7 +188,7 @@ class AskUser():
         title = input(self.title_update)
         validated = False
         while validated is False:
-            if title != '':
+            if check_field('title', title) is None:
                 validated = True
             else:
                 print('У задания должно быть название!')
@@ -181,7 +207,7 @@ class AskUser():
         description = input(self.description_update)
         validated = False
         while validated is False:
-            if description != '':
+            if check_field('description', description) is None:
                 validated = True
             else:
                 print('У задания должно быть описание!')
@@ -200,7 +226,7 @@ class AskUser():
         cat = input(self.category_update)
         validated = False
         while validated is False:
-            if cat != '':
+            if check_field('category', cat) is None:
                 validated = True
             else:
                 print('У задания должна быть категория!')
@@ -219,12 +245,9 @@ class AskUser():
         validated = False
         date = input(self.date)
         while validated is False:
-            try:
-                datetime.strptime(date, '%d-%m-%Y').strftime(
-                    '%d-%m-%Y'
-                )
+            if check_field('date', date) is None:
                 validated = True
-            except ValueError:
+            else:
                 print('Срок выполнения указан неверно!')
                 print('Укажите дату, к которой задачу нужно выполнить ',
                       'в формате DD-MM-YYYY')
@@ -243,7 +266,7 @@ class AskUser():
         prio = input(self.prio_update)
         validated = False
         while validated is False:
-            if prio in ['низкий', 'средний', 'высокий']:
+            if check_field('prio', prio) is None:
                 validated = True
             else:
                 print('Приоритет может быть низким средним или высоким!')
@@ -307,7 +330,7 @@ class AskUser():
         return id
 
 
-class Task():
+class Task(Mapping):
     '''
     Класс для объектов Task.
 
@@ -325,12 +348,30 @@ class Task():
         prio может принимать значения "низкий", "средний", "высокий".
         date может принимать значения дат в формате DD-MM-YYYY.
 
+    Хранение:
+        Экземпляры используют __slots__. id хранится как число,
+        date - как порядковый номер дня, prio и status - как номера
+        значений в PRIORITIES и STATUSES, category - как общая для всех
+        задач строка (sys.intern). Значения, которые не удалось
+        преобразовать, хранятся как есть.
+
+        Task можно использовать как словарь, который возвращает
+        csv.DictReader: task.get('id'), task['date'], task.keys() и т.п.
+        возвращают строки, поэтому методы TaskManager работают и со
+        списками Task, и со списками словарей.
+
     Методы:
+        from_row: создает Task из словаря задачи.
+        get_columns: списки значений атрибутов задач для снимка.
+        from_columns: создает задачи из списков значений атрибутов.
         get_dict: формирует словарь с данными об экземпляре.
         write_csv: добавляет информацию об экземпляре в файл.
         update_csv: перезаписывает файл c данными, включая данные экземпляра.
     '''
 
+    __slots__ = ('id', 'title', 'description', '_category', '_date',
+                 '_prio', '_status')
+
     def __init__(self,
                  id,
                  title: str,
@@ -353,7 +394,7 @@ class Task():
             status: статус выполнения задания. По умолчанию: "не выполнено".
         '''
 
-        self.id = id
+        self.id = int(id)
         self.title = title
         self.description = description
         self.category = category
@@ -361,18 +402,140 @@ class Task():
         self.prio = prio
         self.status = status
 
+    @classmethod
+    def from_row(cls, row: Mapping):
+        '''
+        Создает Task из словаря задачи, например, из строки csv.DictReader.
+        '''
+
+        return cls(*(row.get(field) for field in FIELD_NAMES))
+
+    @classmethod
+    def get_columns(cls, tasks: list) -> list[list]:
+        '''
+        Возвращает списки значений атрибутов из __slots__ для задач,
+        которые уже разобраны, например, для снимка (см. snapshot.py).
+        '''
+
+        return [[getattr(task, slot) for task in tasks]
+                for slot in cls.__slots__]
+
+    @classmethod
+    def from_columns(cls, columns: list[list]) -> list:
+        '''
+        Создает задачи из списков значений атрибутов (см. get_columns)
+        без повторного разбора дат, приоритетов и статусов.
+        '''
+
+        tasks = []
+        for id, title, description, category, date, prio, status in zip(
+            *columns
+        ):
+            task = cls.__new__(cls)
+            task.id = id
+            task.title = title
+            task.description = description
+            task._category = category
+            task._date = date
+            task._prio = prio
+            task._status = status
+            tasks.append(task)
+        return tasks
+
+    @property
+    def category(self) -> str:
+        return self._category
+
+    @category.setter
+    def category(self, value: str) -> None:
+        if type(value) is str:
+            value = sys.intern(value)
+        self._category = value
+
+    @property
+    def date(self) -> str:
+        if type(self._date) is int:
+            return format_date(self._date)
+        return self._date
+
+    @date.setter
+    def date(self, value: str) -> None:
+        ordinal = parse_date(value)
+        if ordinal <= MAX_ORDINAL and format_date(ordinal) == value:
+            self._date = ordinal
+        else:
+            self._date = value
+
+    @property
+    def date_ordinal(self) -> int:
+        '''
+        Порядковый номер дня срока выполнения, см. sorting.parse_date.
+        '''
+
+        if type(self._date) is int:
+            return self._date
+        return parse_date(self._date)
+
+    @property
+    def prio(self) -> str:
+        if type(self._prio) is int:
+            return PRIORITIES[self._prio]
+        return self._prio
+
+    @prio.setter
+    def prio(self, value: str) -> None:
+        self._prio = PRIO_RANK.get(value, value)
+
+    @property
+    def status(self) -> str:
+        if type(self._status) is int:
+            return STATUSES[self._status]
+        return self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = STATUS_RANK.get(value, value)
+
+    def __getitem__(self, key: str) -> str:
+        if key == 'id':
+            return str(self.id)
+        if key in FIELD_NAMES:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in FIELD_NAMES:
+            raise KeyError(key)
+        if key == 'id':
+            value = int(value)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(FIELD_NAMES)
+
+    def __len__(self) -> int:
+        return len(FIELD_NAMES)
+
+    def __repr__(self) -> str:
+        return repr(self.get_dict())
+
+    def get(self, key: str, default=None):
+        if key == 'id':
+            return str(self.id)
+        if key in FIELD_NAMES:
+            return getattr(self, key)
+        return default
+
     def get_dict(self) -> dict:
         '''
         Формирует словарь на основе экземпляра класса Task.
 
         Возвращает:
-            словарь, в котором ключи - названия атрибутов, а
-            значения - значения атрибутов текущего экземпляра.
+            словарь, в котором ключи - названия полей файла данных, а
+            значения - строковые значения атрибутов текущего экземпляра.
         '''
-        to_write = {}
-        for attr, value in self.__dict__.items():
-            to_write[attr.replace('_', '')] = value
-        return to_write
+
+        return {field: self.get(field) for field in FIELD_NAMES}
 
     def write_csv(self, filename: str) -> None:
         '''
@@ -383,10 +546,7 @@ class Task():
             записать данные.
         '''
 
-        to_write = self.get_dict()
-        with open(filename, 'a', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
-            writer.writerow(to_write)
+        CsvRepository(filename, use_log=False).insert(self)
 
     def update_csv(self, data: list[dict], filename: str) -> None:
         '''
@@ -400,31 +560,79 @@ class Task():
             записать данные.
         '''
 
-        to_write = self.get_dict()
-        with open(filename, 'w', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
-            writer.writeheader()
-            for row in data:
-                if int(row.get('id')) == self.id:
-                    row = to_write
-                writer.writerow(row)
+        CsvRepository(filename, use_log=False).update(self, data)
 
 
 class TaskManager():
     '''
     Класс для чтения, удаления, и изменения данных в файле.
 
+    Чтение и запись выполняются через хранилище TaskRepository,
+    которое выбирается по backend: 'csv' - CsvRepository, 'binary' -
+    BinaryStorage, 'sqlite' - SqliteRepository, 'sharded' -
+    ShardedRepository. filename - путь к файлу или папке выбранного
+    хранилища.
+
+    Если use_log = True, то CsvRepository не перезаписывает файл при
+    изменениях и удалениях, а дописывает их в журнал (см. journal.py).
+
     Методы:
         get_id
         search_id
+        get_task
         validate_task
+        get_repository
+        close
         read_all
         create_new_task
         search_params
         delete_tasks
-        update_tasks.
+        update_tasks
+        set_status.
     '''
 
+    def __init__(
+            self,
+            use_log: bool = USE_LOG,
+            backend: str = STORAGE_BACKEND,
+            ):
+        self.use_log = use_log
+        self.backend = backend
+        self._repositories = {}
+
+    def get_repository(self, filename: str) -> TaskRepository:
+        '''
+        Возвращает хранилище задач для указанного файла.
+
+        Хранилище открывается один раз для каждого файла и
+        используется повторно.
+
+        Вызывает:
+            ValueError: если backend не поддерживается.
+        '''
+
+        if filename not in self._repositories:
+            if self.backend == 'csv':
+                repository = CsvRepository(filename, self.use_log)
+            elif self.backend == 'binary':
+                repository = BinaryStorage(filename)
+            elif self.backend == 'sqlite':
+                repository = SqliteRepository(filename)
+            elif self.backend == 'sharded':
+                repository = ShardedRepository(filename)
+            else:
+                raise ValueError(f'Неизвестное хранилище: {self.backend}')
+            self._repositories[filename] = repository
+        return self._repositories[filename]
+
+    def close(self) -> None:
+        '''Закрывает все открытые хранилища.'''
+
+        for repository in self._repositories.values():
+            repository.close()
+        self._repositories = {}
+
+    @instrumented('TaskManager.search_id')
     def search_id(self, data: list[dict], id: int) -> dict | str:
         '''
         Метод для поиска задачи с указанным id.
@@ -453,6 +661,30 @@ class TaskManager():
                 return data[mid]
         return 'Задачи с таким id не существует'
 
+    @instrumented('TaskManager.get_task')
+    def get_task(self, filename: str, id: int) -> dict | str:
+        '''
+        Метод для поиска задачи с указанным id без чтения всего файла.
+
+        В отличие от search_id не требует списка всех задач: csv
+        хранилище находит задачу по индексу id (см. idindex.py),
+        остальные хранилища - своими средствами.
+
+        Аргументы:
+            filename: путь к файлу с данными.
+            id: id задачи, которую необходимо найти.
+
+        Возвращает:
+            словарь с данными искомой задачи или строку с
+            данными об ошибке.
+        '''
+
+        row = self.get_repository(filename).get(id)
+        if row is None:
+            return 'Задачи с таким id не существует'
+        return row
+
+    @instrumented('TaskManager.read_all')
     def read_all(self, filename: str) -> list[dict]:
         '''
         Считывает данные из указанного файла.
@@ -465,14 +697,15 @@ class TaskManager():
             ключи - названия полей, а значения - данные строки.
         '''
 
-        with open(filename, 'r', encoding='utf-8', newline='') as file:
-            reader = csv.DictReader(file)
-            return list(reader)
+        data = self.get_repository(filename).read_all()
+        metrics.count_rows(len(data), len(data))
+        return data
 
+    @instrumented('TaskManager.create_new_task')
     def create_new_task(self, new_task_data: list, filename: str) -> None:
         '''
-        Создает экземпляр Task с введенными данными и вызывает
-        Task.write_csv
+        Создает экземпляр Task с введенными данными и добавляет его
+        в хранилище.
 
         Аргументы:
             new_task_data: данные новой задачи.
@@ -481,8 +714,9 @@ class TaskManager():
         '''
 
         task = Task(*new_task_data)
-        task.write_csv(filename)
+        self.get_repository(filename).insert(task)
 
+    @instrumented('TaskManager.search_params')
     def search_params(self, data: list[dict], params: dict) -> list[dict]:
         '''
         Метод для поиска задачи по параметрам.
@@ -504,25 +738,30 @@ class TaskManager():
         result = []
         if len(data) == 0:
             result = ['Сейчас нет активных задач']
+        category = params.get('category')
+        status = params.get('status')
+        keyword = params.get('keyword')
         for row in data:
-            if 'category' in params.keys() and (
-                row.get('category') == params.get('category')
-            ):
+            # Задача, которая уже найдена по категории или статусу,
+            # не добавляется второй раз по ключевому слову.
+            found = False
+            if category is not None and row.get('category') == category:
                 result.append(row)
-            if 'status' in params.keys() and row.get('status') == params.get(
-                'status'
-            ):
+                found = True
+            if status is not None and row.get('status') == status:
                 result.append(row)
-            if 'keyword' in params.keys():
+                found = True
+            if keyword is not None and not found:
                 for item in list(row.values())[1:]:
-                    if params.get('keyword') in item.lower() and (
-                        row not in result
-                    ):
+                    if keyword in item.lower():
                         result.append(row)
+                        break
+        metrics.count_rows(len(data), len(result))
         if result == []:
             result = ['Такой задачи не существует']
         return result
 
+    @instrumented('TaskManager.delete_tasks')
     def delete_tasks(
             self,
             data: list[dict],
@@ -543,19 +782,13 @@ class TaskManager():
             записать данные.
         '''
 
-        with open(filename, 'w', encoding='utf-8', newline='') as file:
-            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
-            writer.writeheader()
-            for row in data:
-                if 'id' in params.keys() and int(row.get('id')) != params.get(
-                    'id'
-                ):
-                    writer.writerow(row)
-                if 'category' in params.keys() and row.get(
-                    'category'
-                ) != params.get('category'):
-                    writer.writerow(row)
+        repository = self.get_repository(filename)
+        if 'id' in params.keys():
+            repository.delete(params.get('id'), data)
+        if 'category' in params.keys():
+            repository.delete_category(params.get('category'), data)
 
+    @instrumented('TaskManager.update_tasks')
     def update_tasks(
             self,
             data: list[dict],
@@ -572,7 +805,35 @@ class TaskManager():
             записать данные.
         '''
         new_task = Task(*list(params.values()))
-        new_task.update_csv(data, filename)
+        self.get_repository(filename).update(new_task, data)
+        print('Задача успешно обновлена')
+
+    @instrumented('TaskManager.set_status')
+    def set_status(
+            self,
+            data: list[dict],
+            task: dict,
+            status: str,
+            filename: str,
+            ) -> None:
+        '''
+        Изменяет статус задачи.
+
+        В режиме журнала записывает только id и новый статус,
+        в двоичном хранилище меняет статус на месте.
+
+        Аргументы:
+            data: список словарей всех задач
+            task: словарь с данными задачи
+            status: новый статус задачи
+            filename: строка с путем к файлу, в который нужно
+            записать данные.
+        '''
+
+        task = self.get_updated_task(task, {'status': status})
+        self.get_repository(filename).set_status(
+            int(task.get('id')), status, data
+        )
         print('Задача успешно обновлена')
 
     def get_updated_task(self, task: dict, params: dict) -> dict:
@@ -594,19 +855,668 @@ class TaskManager():
         return task
 
 
-def check_file(filename: str) -> None:
+class TaskStore():
+    '''
+    Хранилище задач в памяти, общее для всех итераций главного меню.
+
+    Загружает файл с данными один раз и хранит задачи в словаре,
+    в котором ключи - id задач. Перед каждой командой refresh сравнивает
+    время изменения и размер файла (и журнала) с запомненными и
+    перечитывает файл, только если его изменил кто-то другой.
+    Если другой процесс изменил файл между refresh и записью, то
+    запись применяется к перечитанному файлу (см. CsvRepository),
+    а хранилище перечитывает его при следующем refresh.
+    Файл читается и записывается через TaskManager, поэтому хранилище
+    работает с любым TaskRepository.
+
+    Для полей из INDEXED_FIELDS поддерживает индексы FieldIndex,
+    а для поиска по ключевым словам - TextIndex. Индексы обновляются
+    при каждой записи, поэтому поиск по ним зависит от количества
+    найденных задач, а не от размера файла. TextIndex сохраняется
+    в файл рядом с файлом данных и загружается при следующем запуске,
+    если файл с данными с тех пор не менялся. Результаты поиска
+    хранятся в QueryCache и удаляются из него при изменении задач,
+    которые могут в них входить. Поиск по срокам выполнения
+    выполняется по DateIndex. Отсортированный список id задач (ids)
+    используется для постраничного вывода (см. pager.Pager).
+
+    Старые выполненные задачи переносятся в сжатый архив
+    (см. archive.py) методом archive. Архив не загружается вместе
+    с файлом, а читается только при поиске выполненных задач или
+    если поиск в архиве запрошен явно.
+
+    Если задач не меньше snapshot_min_tasks, то после чтения файла
+    разобранные задачи и индексы записываются в фоновом потоке
+    в снимок (см. snapshot.py), а при выходе снимок обновляется.
+    При следующем запуске, если метка снимка совпадает с файлом
+    с данными, снимок загружается в фоновом потоке вместо чтения
+    файла, а обращение к задачам и индексам (SNAPSHOT_FIELDS) ждет
+    окончания загрузки. Поэтому главное меню выводится сразу.
+    Если снимок не загрузился, то файл читается как обычно.
+
+    Методы:
+        refresh
+        get_data
+        get
+        has_value
+        search
+        search_dates
+        save_indexes
+        save_snapshot
+        next_id
+        next_ids
+        create
+        update
+        set_status
+        delete
+        write_batch
+        write_batch_file
+        apply_batch
+        archive.
+    '''
+
+    SNAPSHOT_FIELDS = ('tasks', 'ids', 'indexes', 'text_index', 'date_index')
+
+    def __init__(
+            self,
+            filename: str,
+            manager: TaskManager | None = None,
+            snapshot_min_tasks: int = SNAPSHOT_MIN_TASKS,
+            ):
+        '''
+        Атрибуты:
+            filename: путь к файлу с данными.
+            manager: TaskManager, через который выполняется запись в файл.
+            snapshot_min_tasks: с какого количества задач записывается
+            снимок, см. SNAPSHOT_MIN_TASKS.
+        '''
+
+        self.filename = filename
+        self.manager = manager or TaskManager()
+        self.cache = QueryCache()
+        self.allocator = IdAllocator(filename)
+        self.archived = Archive(filename)
+        self.snapshot = Snapshot(filename)
+        self.snapshot_min_tasks = snapshot_min_tasks
+        self._snapshot_tag = None
+        self._snapshot_lock = threading.Lock()
+        self._loader = None
+        self._signature = None
+        if not self._start_snapshot_load():
+            self.tasks = {}
+            self.ids = []
+            self.indexes = {}
+            self.text_index = TextIndex()
+            self.date_index = DateIndex()
+            self.refresh()
+
+    def __getattr__(self, name: str):
+        '''
+        Ждет загрузки снимка при первом обращении к задачам и индексам.
+        '''
+
+        if (name not in self.SNAPSHOT_FIELDS
+                or self.__dict__.get('_loader') is None):
+            raise AttributeError(name)
+        self._wait()
+        return getattr(self, name)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.tasks
+
+    def _get_signature(self) -> tuple:
+        '''
+        Возвращает подпись хранилища, см. TaskRepository.get_signature.
+        '''
+
+        return self.manager.get_repository(self.filename).get_signature()
+
+    def _written(self) -> None:
+        '''
+        Запоминает подпись файла после собственной записи.
+
+        Если перед записью оказалось, что файл изменил другой процесс
+        (TaskRepository.stale), то подпись сбрасывается, и следующий
+        refresh перечитает файл с изменениями этого процесса.
+        '''
+
+        repository = self.manager.get_repository(self.filename)
+        self._signature = None if repository.stale else self._get_signature()
+
+    def get_text_index_name(self) -> str:
+        return self.filename + TEXT_INDEX_SUFFIX
+
+    def _start_snapshot_load(self) -> bool:
+        '''
+        Начинает загрузку снимка в фоновом потоке, если метка снимка
+        совпадает с текущей версией файла с данными.
+
+        Возвращает:
+            True, если загрузка начата.
+        '''
+
+        signature = self._get_signature()
+        tag = self.snapshot.get_tag(signature)
+        if self.snapshot.read_tag() != tag:
+            return False
+        self._signature = signature
+        self._snapshot_tag = tag
+        self._loader = threading.Thread(
+            target=self._load_snapshot, args=(tag,), daemon=True
+        )
+        self._loader.start()
+        return True
+
+    def _load_snapshot(self, tag: tuple) -> None:
+        '''
+        Загружает задачи и индексы из снимка. Если снимок не совпадает
+        с tag или поврежден, то атрибуты не устанавливаются, и _wait
+        читает файл с данными.
+        '''
+
+        # Сборщик мусора проходит по всем объектам при создании каждой
+        # новой порции объектов, поэтому на время загрузки миллионов
+        # объектов он отключается.
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state = self.snapshot.load(tag)
+            if state is None:
+                return
+            tasks = Task.from_columns(state['columns'])
+        finally:
+            if enabled:
+                gc.enable()
+        indexes = {}
+        for field, ids in state['indexes'].items():
+            indexes[field] = FieldIndex(field)
+            indexes[field].ids = ids
+        text_index = TextIndex(state['text_fields'])
+        text_index.ids = state['text_ids']
+        date_index = DateIndex()
+        date_index.keys = state['date_keys']
+        if state['ids']:
+            self.allocator.observe(state['ids'][-1])
+        # Все атрибуты устанавливаются сразу, поэтому основной поток
+        # не увидит частично загруженный снимок.
+        self.__dict__.update(
+            tasks={task.id: task for task in tasks},
+            ids=state['ids'],
+            indexes=indexes,
+            text_index=text_index,
+            date_index=date_index,
+        )
+
+    def _wait(self) -> None:
+        '''
+        Ждет окончания загрузки снимка. Если снимок не загрузился,
+        то читает файл с данными.
+        '''
+
+        loader = self._loader
+        if loader is None or loader is threading.current_thread():
+            return
+        loader.join()
+        self._loader = None
+        if 'tasks' not in self.__dict__:
+            self._signature = None
+            self._snapshot_tag = None
+            self.refresh()
+
+    def _load(self, data: list[dict]) -> None:
+        self._wait()
+        text_index = TextIndex.load(
+            self.get_text_index_name(), self._signature
+        )
+        self.text_index = text_index or TextIndex()
+        self.cache.clear()
+        self.tasks = {}
+        self.indexes = {field: FieldIndex(field) for field in INDEXED_FIELDS}
+        # Список id и индекс сроков строятся одной сортировкой
+        # после загрузки.
+        self.ids = None
+        self.date_index = None
+        for row in data:
+            self._add(Task.from_row(row), text_index is None)
+        self.ids = sorted(self.tasks)
+        self.date_index = DateIndex.from_rows(self.tasks.values())
+        if text_index is None:
+            self.text_index.save(self.get_text_index_name(), self._signature)
+        if len(self.tasks) >= self.snapshot_min_tasks:
+            threading.Thread(target=self.save_snapshot).start()
+
+    def _add(self, row: Task, with_text: bool = True) -> None:
+        '''
+        Добавляет или заменяет задачу, сохраняя ее место в порядке записи.
+        '''
+
+        old_row = self.tasks.get(int(row.get('id')))
+        self.cache.invalidate(old_row, row)
+        if old_row is not None:
+            for index in self.indexes.values():
+                index.remove(old_row)
+            self.text_index.remove(old_row)
+            if self.date_index is not None:
+                self.date_index.remove(old_row)
+        elif self.ids is not None:
+            insort(self.ids, int(row.get('id')))
+        self.tasks[int(row.get('id'))] = row
+        self.allocator.observe(int(row.get('id')))
+        for index in self.indexes.values():
+            index.add(row)
+        if self.date_index is not None:
+            self.date_index.add(row)
+        if with_text:
+            self.text_index.add(row)
+
+    def _remove(self, id: int) -> None:
+        row = self.tasks.pop(id, None)
+        if row is None:
+            return
+        self.cache.invalidate(row)
+        for index in self.indexes.values():
+            index.remove(row)
+        self.text_index.remove(row)
+        self.date_index.remove(row)
+        del self.ids[bisect_left(self.ids, id)]
+
+    @instrumented('TaskStore.refresh')
+    def refresh(self) -> bool:
+        '''
+        Перечитывает файл, если он изменился с момента последнего чтения.
+
+        Возвращает:
+            True, если файл был перечитан.
+        '''
+
+        signature = self._get_signature()
+        if signature == self._signature:
+            return False
+        self._signature = signature
+        self._load(self.manager.read_all(self.filename))
+        return True
+
+    def get_data(self) -> list[Task]:
+        '''
+        Возвращает список всех задач в порядке их записи.
+        '''
+
+        return list(self.tasks.values())
+
+    def get(self, id: int) -> Task | str:
+        '''
+        Возвращает задачу с указанным id или
+        строку с данными об ошибке.
+
+        Пока снимок загружается в фоновом потоке, задача читается из
+        файла через TaskManager.get_task (csv файл - по индексу id,
+        см. idindex.py), поэтому поиск по id не ждет загрузки.
+        '''
+
+        loader = self._loader
+        if loader is not None and loader.is_alive():
+            row = self.manager.get_task(self.filename, id)
+            return row if isinstance(row, str) else Task.from_row(row)
+        return self.tasks.get(id, 'Задачи с таким id не существует')
+
+    def has_value(self, field: str, value: str) -> bool:
+        '''
+        Проверяет, есть ли задачи с указанным значением
+        индексированного поля.
+        '''
+
+        return value in self.indexes[field]
+
+    @instrumented('TaskStore.search')
+    def search(
+            self,
+            params: dict,
+            with_archive: bool | None = None,
+            ) -> list[dict]:
+        '''
+        Поиск задач по параметрам.
+
+        Поиск по полям из INDEXED_FIELDS выполняется по индексам FieldIndex,
+        по ключевым словам (ключ словаря 'keyword') - по TextIndex,
+        а найденные id запоминаются в QueryCache.
+        Остальные параметры передаются в TaskManager.search_params.
+
+        Аргументы:
+            params: параметры поиска.
+            with_archive: искать ли также в архиве (см. archive.py).
+            По умолчанию архив просматривается только при поиске
+            выполненных задач.
+
+        Возвращает:
+            cписок задач, отсортированный по id, или список со строкой,
+            описывающей ошибку, как TaskManager.search_params.
+        '''
+
+        result = self._search(params)
+        if with_archive is None:
+            with_archive = params.get('status') == STATUSES[1]
+        if not with_archive:
+            return result
+        archived = [
+            Task.from_row(row)
+            for row in self.archived.search(params, self.tasks)
+        ]
+        if not archived:
+            return result
+        if isinstance(result[0], str):
+            return archived
+        return sorted(result + archived, key=lambda row: int(row.get('id')))
+
+    def _search(self, params: dict) -> list[dict]:
+        for field in params.keys():
+            if field != 'keyword' and field not in self.indexes:
+                return self.manager.search_params(self.get_data(), params)
+        if len(self.tasks) == 0:
+            return ['Сейчас нет активных задач']
+        key = self.cache.get_key(params)
+        ids = self.cache.get(key)
+        if ids is None:
+            found = set()
+            for field, value in params.items():
+                if field == 'keyword':
+                    found |= self.text_index.search(value)
+                else:
+                    found |= self.indexes[field].get(value)
+            metrics.count_rows(len(found), len(found))
+            ids = self.cache.put(key, sorted(found))
+        if not ids:
+            return ['Такой задачи не существует']
+        return [self.tasks[id] for id in ids]
+
+    @instrumented('TaskStore.search_dates')
+    def search_dates(
+            self,
+            start: int | None = None,
+            end: int | None = None,
+            status: str | None = None,
+            ) -> list[Task] | list[str]:
+        '''
+        Поиск задач по сроку выполнения, см. DateIndex.search.
+
+        Аргументы:
+            start: первый день интервала (порядковый номер дня,
+            см. sorting.parse_date) или None.
+            end: последний день интервала включительно или None.
+            status: если указан, то ищутся только задачи с этим статусом.
+
+        Возвращает:
+            список задач, отсортированный по сроку, или список со
+            строкой, описывающей ошибку, как search.
+        '''
+
+        if len(self.tasks) == 0:
+            return ['Сейчас нет активных задач']
+        ids = self.date_index.search(start, end, status)
+        metrics.count_rows(len(ids), len(ids))
+        if not ids:
+            return ['Такой задачи не существует']
+        return [self.tasks[id] for id in ids]
+
+    def save_indexes(self) -> None:
+        '''
+        Сохраняет TextIndex в файл рядом с файлом данных
+        и обновляет снимок, см. save_snapshot.
+        '''
+
+        self.text_index.save(self.get_text_index_name(), self._signature)
+        self.save_snapshot()
+
+    def save_snapshot(self) -> bool:
+        '''
+        Записывает снимок задач и индексов, если задач не меньше
+        snapshot_min_tasks, а записанный снимок устарел.
+
+        Возвращает:
+            True, если снимок записан.
+        '''
+
+        with self._snapshot_lock:
+            if (self._signature is None
+                    or len(self.tasks) < self.snapshot_min_tasks):
+                return False
+            tag = self.snapshot.get_tag(self._signature)
+            if tag == self._snapshot_tag:
+                return False
+            try:
+                state = {
+                    'columns': Task.get_columns(list(self.tasks.values())),
+                    'ids': list(self.ids),
+                    'indexes': {
+                        field: index.ids
+                        for field, index in self.indexes.items()
+                    },
+                    'text_fields': self.text_index.fields,
+                    'text_ids': self.text_index.ids,
+                    'date_keys': self.date_index.keys,
+                }
+                self.snapshot.save(tag, state)
+            except RuntimeError:
+                # Задачи изменились во время записи в фоновом потоке,
+                # снимок будет записан при выходе.
+                return False
+            self._snapshot_tag = tag
+            return True
+
+    def next_id(self) -> int:
+        '''
+        Возвращает id для новой задачи, см. IdAllocator.
+        '''
+
+        self._wait()
+        self.refresh()
+        return self.allocator.next_id()
+
+    def next_ids(self, count: int) -> range:
+        '''
+        Возвращает диапазон из count id для новых задач.
+        '''
+
+        self._wait()
+        self.refresh()
+        return self.allocator.next_ids(count)
+
+    @instrumented('TaskStore.create')
+    def create(self, new_task_data: list) -> Task:
+        '''
+        Записывает новую задачу в файл и добавляет ее в хранилище.
+
+        Аргументы:
+            new_task_data: данные новой задачи.
+
+        Возвращает:
+            новую задачу.
+        '''
+
+        self.refresh()
+        self.manager.create_new_task(new_task_data, self.filename)
+        row = Task(*new_task_data)
+        self._add(row)
+        self._written()
+        return row
+
+    @instrumented('TaskStore.update')
+    def update(self, task: dict) -> None:
+        '''
+        Записывает обновленные данные задачи в файл и в хранилище.
+        '''
+
+        self.refresh()
+        task = Task.from_row(task)
+        self.manager.update_tasks(self.get_data(), task, self.filename)
+        self._add(task)
+        self._written()
+
+    @instrumented('TaskStore.set_status')
+    def set_status(self, task: dict, status: str) -> None:
+        '''
+        Изменяет статус задачи в файле и в хранилище.
+        '''
+
+        self.refresh()
+        task = Task.from_row(task)
+        self.manager.set_status(self.get_data(), task, status, self.filename)
+        self._add(task)
+        self._written()
+
+    @instrumented('TaskStore.delete')
+    def delete(self, params: dict) -> None:
+        '''
+        Удаляет задачи по id или по категории из файла и из хранилища.
+
+        Аргументы:
+            params: словарь с ключом 'id' или 'category', как в
+            TaskManager.delete_tasks.
+        '''
+
+        self.refresh()
+        self.manager.delete_tasks(self.get_data(), params, self.filename)
+        if 'id' in params.keys():
+            self._remove(params.get('id'))
+        if 'category' in params.keys():
+            index = self.indexes['category']
+            for id in list(index.get(params.get('category'))):
+                self._remove(id)
+        self._written()
+
+    @instrumented('TaskStore.write_batch')
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: set[int],
+            ) -> None:
+        '''
+        Записывает новые, измененные и удаленные задачи в файл одной
+        записью (см. TaskRepository.write_batch) и в хранилище.
+        '''
+
+        self.refresh()
+        created, updated = self.write_batch_file(
+            created, updated, deleted, self.get_data()
+        )
+        self.apply_batch(created, updated, deleted)
+
+    def write_batch_file(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: set[int],
+            tasks: list[Task],
+            ) -> tuple[list[Task], list[Task]]:
+        '''
+        Записывает пакет в файл, не изменяя задачи хранилища.
+
+        Не обращается к задачам и индексам хранилища, поэтому может
+        выполняться в другом потоке, пока основной поток отвечает
+        на запросы на чтение (см. server.py). После записи пакет
+        нужно применить к хранилищу методом apply_batch.
+
+        Аргументы:
+            created: новые задачи.
+            updated: измененные задачи.
+            deleted: id удаленных задач.
+            tasks: все задачи хранилища до записи, см. get_data.
+
+        Возвращает:
+            новые и измененные задачи в виде Task.
+        '''
+
+        created = [Task.from_row(row) for row in created]
+        updated = [Task.from_row(row) for row in updated]
+        self.manager.get_repository(self.filename).write_batch(
+            created, updated, deleted, tasks
+        )
+        return created, updated
+
+    def apply_batch(
+            self,
+            created: list[Task],
+            updated: list[Task],
+            deleted: set[int],
+            ) -> None:
+        '''
+        Применяет к хранилищу пакет, записанный write_batch_file.
+        '''
+
+        for row in created + updated:
+            self._add(row)
+        for id in deleted:
+            self._remove(id)
+        self._written()
+
+    @instrumented('TaskStore.archive')
+    def archive(
+            self,
+            days: int = ARCHIVE_AFTER_DAYS,
+            today: int | None = None,
+            ) -> int:
+        '''
+        Переносит выполненные задачи, срок которых прошел больше days
+        дней назад, из файла с данными в архив.
+
+        Задачи сначала дописываются в архив и только потом удаляются
+        из файла, поэтому при сбое они не теряются. Наибольший id
+        перенесенных задач сохраняется в IdAllocator, чтобы новые
+        задачи не получили id задач из архива.
+
+        Аргументы:
+            days: сколько дней после срока выполненная задача остается
+            в файле с данными.
+            today: порядковый номер текущего дня (см. sorting.parse_date),
+            по умолчанию - сегодня.
+
+        Возвращает:
+            количество перенесенных задач.
+        '''
+
+        self.refresh()
+        today = today or date.today().toordinal()
+        ids = self.date_index.search(None, today - days, STATUSES[1])
+        if ids:
+            self.allocator.reserve(max(ids))
+            self.archived.append(self.tasks[id] for id in ids)
+            self.write_batch([], [], set(ids))
+        return len(ids)
+
+
+def check_file(filename: str, backend: str = STORAGE_BACKEND) -> None:
     '''
     Создает и проверяет файл с данными, указанный в настройках.
 
     Атрибуты:
         filename: путь к файлу
+        backend: тип хранилища, 'csv', 'binary', 'sqlite' или 'sharded'
 
     Вызывает:
-        FileError: если указанный в файл не является
-        .csv файлом
+        FileError: если указанный в файл не является .csv файлом,
+        двоичным хранилищем задач, базой данных sqlite или папкой
+        с задачами по категориям
     '''
 
-    if os.path.splitext(filename)[1] == '.csv':
+    if backend == 'binary':
+        try:
+            BinaryStorage(filename).close()
+        except ValueError as error:
+            raise FileError(str(error))
+    elif backend == 'sharded':
+        try:
+            ShardedRepository(filename).close()
+        except ValueError as error:
+            raise FileError(str(error))
+    elif backend == 'sqlite':
+        try:
+            SqliteRepository(filename).close()
+        except sqlite3.DatabaseError as error:
+            raise FileError(str(error))
+    elif os.path.splitext(filename)[1] == '.csv':
         if not os.path.isfile(filename):
             with open(filename, 'w', encoding='utf-8', newline='') as file:
                 writer = csv.DictWriter(file, FIELD_NAMES)
@@ -620,10 +1530,9 @@ def get_id(data: list[dict]) -> int:
     '''
     Получает id для новой задачи.
 
-    Полученное id на 1 больше id последней записанной задачи.
-    Если задача с таким id уже существует или новое полученное id
-    не является наибольшим, то сортирует файл с данными
-    по возрастанию id, и получает новое id на 1 больше наибольшего.
+    Полученное id на 1 больше наибольшего id из записанных задач,
+    даже если задачи записаны не по порядку. Главное меню использует
+    TaskStore.next_id, который не просматривает все задачи.
 
     Аргументы:
         data: список словарей всех задач
@@ -632,110 +1541,274 @@ def get_id(data: list[dict]) -> int:
         id: число на 1 больше наибольшего id из задач, переданных
         в data
     '''
-    if len(data) == 0:
-        id = 1
-    else:
-        id = int(data[-1].get('id')) + 1
-        existing_ids = []
-        for i in range(0, (len(data))):
-            existing_ids.append(int(data[i].get('id')))
-        if id <= max(existing_ids):
-            data = sort_tasks(data)
-            print(f'отсоритрованные данные {data}')
-        id = int(data[-1].get('id')) + 1
-    return id
+    return max((int(row.get('id')) for row in data), default=0) + 1
 
 
 def main():
-    check_file(FILE_NAME)
+    enable_from_environment()
+    filename = get_data_file(STORAGE_BACKEND)
+    check_file(filename)
+    store = TaskStore(filename)
     print('Добро пожаловать в менеджер задач!')
+    try:
+        run_menu(store)
+    finally:
+        store.save_indexes()
+        store.manager.close()
+
+
+def run_menu(store: TaskStore) -> None:
     while True:
-        data = TaskManager().read_all(FILE_NAME)
+        store.refresh()
         msg = ('Что бы вы хотели сделать? Доступнные варианты:\n',
                '1) Создать\n2) Просмотреть все\n3) Найти по категории\n'
                '4) Найти по статусу\n5) Найти по ключевым словам\n',
                '6) Найти по id\n7) Изменить\n8) Отметить выполнение\n',
-               '9) Удалить по id\n10) Удалить категорию.\n')
+               '9) Удалить по id\n10) Удалить категорию\n',
+               '11) Найти по сроку\n12) Архивировать выполненные.\n')
         print(''.join(i for i in msg))
         print('Введите наименование или номер одной из опций')
         todo = input().lower()
-        if todo == 'создать' or todo == '1':
-            id = get_id(data)
-            print('Для создания новой задачи укажите следующие данные:')
-            title = AskUser().get_title()
-            description = AskUser().get_description()
-            category = AskUser().get_category()
-            date = AskUser().get_date()
-            prio = AskUser().get_prio()
-            new_task_data = [id, title, description, category, date, prio,]
-            print(new_task_data)
-            TaskManager().create_new_task(new_task_data, FILE_NAME)
-        elif todo == 'просмотреть все' or todo == '2':
-            if data == []:
-                print('Сейчас нет активных задач')
-            for row in data:
-                print(row)
-        elif todo == 'найти по категории' or todo == '3':
-            category = input('Введите категорию\n')
-            params = {'category': category}
-            for item in TaskManager().search_params(data, params):
-                print(item)
-        elif todo == 'найти по статусу' or todo == '4':
-            status = input('Введите статус: выполнено или не выполнено\n')
-            params = {'status': status.lower()}
-            for item in TaskManager().search_params(data, params):
-                print(item)
-        elif todo == 'найти по ключевым словам' or todo == '5':
-            keyword = input('Введите ваш запрос\n')
-            params = {'keyword': keyword}
-            for item in TaskManager().search_params(data, params):
-                print(item)
-        elif todo == 'найти по id' or todo == '6':
-            id = AskUser().input_id()
-            print(TaskManager().search_id(data, id))
-        elif todo == 'изменить' or todo == '7':
-            id = AskUser().input_id()
-            task = TaskManager().search_id(data, id)
-            if type(task) is str:
-                print(task)
-            else:
-                print('Доступные для изменения поля: название, '
-                      'описание, категория, срок, приоритет')
-                params = AskUser().input_edited_task()
-                task = TaskManager().get_updated_task(task, params)
-                TaskManager().update_tasks(data, task, FILE_NAME)
-        elif todo == 'отметить выполнение' or todo == '8':
-            id = AskUser().input_id()
-            task = TaskManager().search_id(data, id)
-            if type(task) is str:
-                print(task)
-            else:
-                params = {'status': 'выполнено'}
-                task = TaskManager().get_updated_task(task, params)
-                TaskManager().update_tasks(data, task, FILE_NAME)
-        elif todo == 'удалить по id' or todo == '9':
-            params = {'id': AskUser().input_id()}
-            existing_ids = []
-            for item in data:
-                existing_ids.append(item.get('id'))
-            if params.get('id') in existing_ids:
-                TaskManager().delete_tasks(data, params, FILE_NAME)
-            else:
-                print('Задач с такой категорией нет')
-        elif todo == 'удалить категорию' or todo == '10':
-            print('Введите категорию. Все задачи',
-                  ' из этой категории будут удалены')
-            params = {'category': input()}
-            existing_categories = []
-            for item in data:
-                existing_categories.append(item.get('category'))
-            if params.get('category') in existing_categories:
-                TaskManager().delete_tasks(data, params, FILE_NAME)
-            else:
-                print('Задач с такой категорией нет')
+        if todo.startswith(PROFILE_PREFIX):
+            profile_call(run_command, store, todo[len(PROFILE_PREFIX):])
+        else:
+            run_command(store, todo)
+
+
+def run_command(store: TaskStore, todo: str) -> None:
+    '''
+    Выполняет одну команду главного меню.
+
+    Аргументы:
+        store: хранилище задач.
+        todo: наименование или номер команды в нижнем регистре.
+    '''
+
+    if todo == 'создать' or todo == '1':
+        id = store.next_id()
+        print('Для создания новой задачи укажите следующие данные:')
+        title = AskUser().get_title()
+        description = AskUser().get_description()
+        category = AskUser().get_category()
+        date = AskUser().get_date()
+        prio = AskUser().get_prio()
+        new_task_data = [id, title, description, category, date, prio,]
+        print(new_task_data)
+        store.create(new_task_data)
+    elif todo == 'просмотреть все' or todo == '2':
+        if len(store) == 0:
+            print('Сейчас нет активных задач')
+        else:
+            show_pages(Pager(store.ids, get_row=store.tasks.get))
+    elif todo == 'найти по категории' or todo == '3':
+        category = input('Введите категорию\n')
+        params = {'category': category}
+        show_results(store.search(params))
+    elif todo == 'найти по статусу' or todo == '4':
+        status = input('Введите статус: выполнено или не выполнено\n')
+        params = {'status': status.lower()}
+        show_results(store.search(params))
+    elif todo == 'найти по ключевым словам' or todo == '5':
+        keyword = input('Введите ваш запрос. Чтобы найти задачи с любым '
+                        'из слов, разделите слова словом "или"\n')
+        params = {'keyword': keyword}
+        show_results(store.search(params))
+    elif todo == 'найти по сроку' or todo == '11':
+        query = input('Введите "просроченные", количество дней до срока '
+                      'или две даты в формате DD-MM-YYYY через пробел\n')
+        status = input('Введите статус: выполнено или не выполнено. '
+                       'Чтобы искать задачи с любым статусом, '
+                       'оставьте строку пустой\n')
+        try:
+            start, end = get_deadline_range(query)
+        except ValueError as error:
+            print(error)
+        else:
+            show_results(
+                store.search_dates(start, end, status.lower() or None),
+                DateIndex.get_key,
+            )
+    elif todo == 'найти по id' or todo == '6':
+        id = AskUser().input_id()
+        print(store.get(id))
+    elif todo == 'изменить' or todo == '7':
+        id = AskUser().input_id()
+        task = store.get(id)
+        if type(task) is str:
+            print(task)
+        else:
+            print('Доступные для изменения поля: название, '
+                  'описание, категория, срок, приоритет')
+            params = AskUser().input_edited_task()
+            task = TaskManager().get_updated_task(dict(task), params)
+            store.update(task)
+    elif todo == 'отметить выполнение' or todo == '8':
+        id = AskUser().input_id()
+        task = store.get(id)
+        if type(task) is str:
+            print(task)
+        else:
+            store.set_status(dict(task), 'выполнено')
+    elif todo == 'удалить по id' or todo == '9':
+        params = {'id': AskUser().input_id()}
+        if params.get('id') in store:
+            store.delete(params)
+        else:
+            print('Задачи с таким id не существует')
+    elif todo == 'удалить категорию' or todo == '10':
+        print('Введите категорию. Все задачи',
+              ' из этой категории будут удалены')
+        params = {'category': input()}
+        if store.has_value('category', params.get('category')):
+            store.delete(params)
+        else:
+            print('Задач с такой категорией нет')
+    elif todo == 'архивировать выполненные' or todo == '12':
+        count = store.archive()
+        print(f'Перенесено в архив задач: {count}. Они будут найдены '
+              'при поиске выполненных задач')
+    else:
+        print('К сожалению, менеджер не может понять эту комманду')
+
+
+def show_pages(pager: Pager, can_jump: bool = True) -> None:
+    '''
+    Выводит задачи по страницам, пока пользователь не вернется в меню.
+
+    Аргументы:
+        pager: Pager с задачами.
+        can_jump: можно ли перейти к задаче по id.
+    '''
+
+    prompt = ('Enter или "далее" - следующая страница, "назад" - '
+              'предыдущая, ')
+    if can_jump:
+        prompt += 'id задачи - перейти к ней, '
+    prompt += '"выход" - вернуться в меню\n'
+    while True:
+        pager.write_page()
+        if len(pager.items) <= pager.page_size:
+            return
+        command = input(prompt).strip().lower()
+        if command in ('', 'далее'):
+            if not pager.next():
+                return
+        elif command == 'назад':
+            if not pager.prev():
+                print('Это первая страница')
+        elif can_jump and command.isdigit():
+            pager.jump(int(command))
+        elif command == 'выход':
+            return
         else:
             print('К сожалению, менеджер не может понять эту комманду')
 
 
+def show_results(result: list, key=None) -> None:
+    '''
+    Выводит результаты поиска по страницам или сообщение об ошибке.
+
+    Аргументы:
+        result: список задач, отсортированный по id, или список со
+        строкой, описывающей ошибку, как TaskStore.search.
+        key: ключ сортировки списка, если он отсортирован не по id.
+    '''
+
+    if result and type(result[0]) is str:
+        print(result[0])
+        return
+    if key is None:
+        show_pages(Pager(result, key=lambda row: int(row.get('id'))))
+    else:
+        show_pages(Pager(result, key=key), can_jump=False)
+
+
+def batch_main(args: list[str]) -> None:
+    '''
+    Пакетный режим: python -m main batch <файл с операциями>.
+
+    Вместо пути к файлу можно указать "-", тогда операции читаются
+    из стандартного ввода. См. batch.py.
+    '''
+
+    if len(args) != 1:
+        print('Использование: python -m main batch <файл с операциями>')
+        sys.exit(1)
+    enable_from_environment()
+    filename = get_data_file(STORAGE_BACKEND)
+    check_file(filename)
+    store = TaskStore(filename)
+    try:
+        if args[0] == '-':
+            result = run_batch(store, sys.stdin)
+        else:
+            with open(args[0], 'r', encoding='utf-8') as file:
+                result = run_batch(store, file)
+    finally:
+        store.save_indexes()
+        store.manager.close()
+    for error in result.errors:
+        print(error)
+    print(f'Выполнено операций: {result.applied}')
+    print(f'Отклонено операций: {len(result.errors)}')
+    if result.errors:
+        sys.exit(1)
+
+
+def archive_main(args: list[str]) -> None:
+    '''
+    Перенос старых выполненных задач в архив:
+    python -m main archive [количество дней].
+
+    См. TaskStore.archive и archive.py.
+    '''
+
+    if len(args) > 1 or args and not args[0].isdigit():
+        print('Использование: python -m main archive [количество дней]')
+        sys.exit(1)
+    enable_from_environment()
+    filename = get_data_file(STORAGE_BACKEND)
+    check_file(filename)
+    store = TaskStore(filename)
+    try:
+        count = store.archive(*(int(arg) for arg in args))
+    finally:
+        store.save_indexes()
+        store.manager.close()
+    print(f'Перенесено в архив задач: {count}')
+
+
+def reorganize_main(args: list[str]) -> None:
+    '''
+    Сортировка csv файла с данными: python -m main reorganize [поле ...].
+
+    По умолчанию задачи сортируются по id. Если название поля начинается
+    с '-', то по этому полю задачи сортируются по убыванию.
+    См. CsvRepository.reorganize.
+    '''
+
+    keys = args or ['id']
+    if any(key.lstrip('-') not in FIELD_NAMES for key in keys):
+        print('Использование: python -m main reorganize [поле ...], '
+              f'поля: {", ".join(FIELD_NAMES)}')
+        sys.exit(1)
+    if STORAGE_BACKEND != 'csv':
+        print('Сортировка файла поддерживается только для csv хранилища')
+        sys.exit(1)
+    enable_from_environment()
+    filename = get_data_file(STORAGE_BACKEND)
+    check_file(filename)
+    with CsvRepository(filename) as repository:
+        count = repository.reorganize(keys)
+    print(f'Отсортировано задач: {count}')
+
+
 if __name__ == "__main__":
-    main()
+    if sys.argv[1:2] == ['batch']:
+        batch_main(sys.argv[2:])
+    elif sys.argv[1:2] == ['archive']:
+        archive_main(sys.argv[2:])
+    elif sys.argv[1:2] == ['reorganize']:
+        reorganize_main(sys.argv[2:])
+    else:
+        main()
@@ -0,0 +1,146 @@
+import json
+
+from atomic import atomic_open
+from locking import FileLock
+from settings import FSYNC_POLICY, META_SUFFIX
+
+
+def get_meta_name(filename: str) -> str:
+    '''
+    Возвращает путь к служебному файлу для указанного файла данных.
+    '''
+
+    return filename + META_SUFFIX
+
+
+def read_meta(filename: str) -> dict:
+    '''
+    Считывает служебные данные для файла данных.
+
+    Возвращает:
+        словарь служебных данных или пустой словарь, если
+        служебного файла нет или он поврежден.
+    '''
+
+    try:
+        with open(get_meta_name(filename), 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def write_meta(
+        filename: str,
+        meta: dict,
+        fsync: bool = FSYNC_POLICY == 'always',
+        ) -> None:
+    '''
+    Атомарно перезаписывает служебные данные для файла данных, чтобы
+    сбой во время записи не сбросил наибольший выданный id.
+    '''
+
+    with atomic_open(get_meta_name(filename), fsync) as file:
+        json.dump(meta, file)
+
+
+def get_generation(filename: str) -> int:
+    '''
+    Возвращает номер поколения файла данных.
+
+    Номер увеличивается при каждой записи в файл, поэтому процесс может
+    проверить, не изменил ли файл кто-то другой после его чтения.
+    Читать и менять номер нужно под блокировкой FileLock.
+    '''
+
+    return read_meta(filename).get('generation', 0)
+
+
+def bump_generation(
+        filename: str,
+        fsync: bool = FSYNC_POLICY == 'always',
+        ) -> int:
+    '''
+    Увеличивает номер поколения файла данных на 1.
+
+    Возвращает:
+        новый номер поколения.
+    '''
+
+    meta = read_meta(filename)
+    meta['generation'] = meta.get('generation', 0) + 1
+    write_meta(filename, meta, fsync)
+    return meta['generation']
+
+
+class IdAllocator():
+    '''
+    Выдает id для новых задач за O(1).
+
+    Хранит наибольший выданный id (high_water) в служебном файле рядом с
+    файлом данных. Новый id на 1 больше наибольшего из high_water и id,
+    которые встречались в файле данных, поэтому id не повторяются, даже
+    если задачи записаны не по порядку или последняя задача была удалена.
+
+    Методы:
+        observe
+        reserve
+        next_id
+        next_ids.
+    '''
+
+    def __init__(self, filename: str):
+        '''
+        Атрибуты:
+            filename: путь к файлу с данными.
+        '''
+
+        self.filename = filename
+        self.high_water = 0
+
+    def observe(self, id: int) -> None:
+        '''Учитывает id задачи, найденной в файле данных.'''
+
+        if id > self.high_water:
+            self.high_water = id
+
+    def reserve(self, id: int) -> None:
+        '''
+        Сохраняет в служебный файл high_water не меньше id, чтобы id
+        не был выдан снова после удаления задачи из файла данных,
+        даже если служебного файла еще не было.
+        '''
+
+        with FileLock(self.filename).exclusive():
+            meta = read_meta(self.filename)
+            high_water = max(self.high_water, meta.get('high_water', 0), id)
+            if meta.get('high_water') != high_water:
+                meta['high_water'] = high_water
+                write_meta(self.filename, meta)
+            self.high_water = high_water
+
+    def next_id(self) -> int:
+        '''
+        Возвращает новый id и сохраняет его в служебный файл.
+
+        Служебный файл читается и записывается под исключительной
+        блокировкой, поэтому разные процессы не получат одинаковый id.
+        '''
+
+        return self.next_ids(1)[0]
+
+    def next_ids(self, count: int) -> range:
+        '''
+        Выдает сразу count новых id с одной записью в служебный файл.
+
+        Возвращает:
+            диапазон выданных id.
+        '''
+
+        with FileLock(self.filename).exclusive():
+            meta = read_meta(self.filename)
+            start = max(self.high_water, meta.get('high_water', 0)) + 1
+            self.high_water = start + count - 1
+            meta['high_water'] = self.high_water
+            write_meta(self.filename, meta)
+        return range(start, self.high_water + 1)
@@ -0,0 +1,127 @@
+'''
+Постраничный вывод задач в главном меню.
+'''
+
+import sys
+from bisect import bisect_left
+from typing import Callable, Sequence, TextIO
+
+from settings import PAGE_SIZE
+
+
+class Pager():
+    '''
+    Постраничный просмотр отсортированной последовательности.
+
+    Текущая страница запоминается не номером, а ключом первого
+    элемента (курсором), а начало страницы находится бисекцией.
+    Поэтому страницы не сдвигаются, если между ними добавили или
+    удалили задачи, а форматируются и выводятся только элементы
+    текущей страницы.
+
+    Атрибуты:
+        items: последовательность, отсортированная по key, например,
+        отсортированный список id задач.
+        page_size: количество элементов на странице.
+        get_row: функция, которая возвращает задачу по элементу items.
+        key: функция, которая возвращает ключ сортировки элемента.
+        cursor: ключ первого элемента текущей страницы или None
+        для первой страницы.
+
+    Методы:
+        get_page
+        next
+        prev
+        jump
+        render
+        write_page.
+    '''
+
+    def __init__(
+            self,
+            items: Sequence,
+            page_size: int = PAGE_SIZE,
+            get_row: Callable | None = None,
+            key: Callable | None = None,
+            ):
+        self.items = items
+        self.page_size = max(page_size, 1)
+        self.get_row = get_row
+        self.key = key
+        self.cursor = None
+
+    def _get_start(self) -> int:
+        if self.cursor is None:
+            return 0
+        return bisect_left(self.items, self.cursor, key=self.key)
+
+    def _get_key(self, item):
+        return item if self.key is None else self.key(item)
+
+    def get_page(self) -> list:
+        '''Возвращает задачи текущей страницы.'''
+
+        start = self._get_start()
+        page = self.items[start:start + self.page_size]
+        if self.get_row is None:
+            return list(page)
+        return [self.get_row(item) for item in page]
+
+    def next(self) -> bool:
+        '''
+        Переходит на следующую страницу.
+
+        Возвращает:
+            False, если текущая страница последняя.
+        '''
+
+        start = self._get_start() + self.page_size
+        if start >= len(self.items):
+            return False
+        self.cursor = self._get_key(self.items[start])
+        return True
+
+    def prev(self) -> bool:
+        '''
+        Переходит на предыдущую страницу.
+
+        Возвращает:
+            False, если текущая страница первая.
+        '''
+
+        start = self._get_start()
+        if start == 0:
+            return False
+        self.cursor = self._get_key(
+            self.items[max(start - self.page_size, 0)]
+        )
+        return True
+
+    def jump(self, key) -> None:
+        '''
+        Переходит на страницу, которая начинается с элемента с ключом
+        key или со следующего за ним, например, с задачи с указанным id.
+        '''
+
+        self.cursor = key
+
+    def render(self) -> str:
+        '''Возвращает текст текущей страницы с номерами задач.'''
+
+        start = self._get_start()
+        page = self.get_page()
+        lines = [repr(row) for row in page]
+        if page:
+            lines.append(f'Задачи {start + 1}-{start + len(page)} '
+                         f'из {len(self.items)}')
+        else:
+            lines.append(f'На этой странице нет задач, '
+                         f'всего задач: {len(self.items)}')
+        return '\n'.join(lines) + '\n'
+
+    def write_page(self, out: TextIO | None = None) -> None:
+        '''Выводит текущую страницу одной записью.'''
+
+        out = out or sys.stdout
+        out.write(self.render())
+        out.flush()
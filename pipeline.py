@@ -0,0 +1,143 @@
+'''
+Потоковое чтение и фильтрация задач.
+
+Функции этого модуля не загружают файл с данными в память целиком:
+iter_tasks читает задачи по одной, а остальные функции принимают и
+возвращают итераторы, поэтому их можно объединять в цепочки:
+
+    tasks = iter_tasks('data.csv')
+    tasks = where(tasks, category='работа')
+    tasks = limit(match_keyword(tasks, 'отчет'), 10)
+    export_csv(tasks, 'report.csv')
+
+Запуск из корневой папки проекта:
+    python -m pipeline [--file data.csv] [--category ...] [--status ...]
+        [--prio ...] [--keyword ...] [--limit N] [--export out.csv]
+'''
+
+import argparse
+import csv
+from itertools import islice
+from typing import Iterable, Iterator
+
+import journal
+from settings import FIELD_NAMES, FILE_NAME
+
+
+def iter_tasks(filename: str) -> Iterator[dict]:
+    '''
+    Читает задачи из файла по одной с учетом журнала изменений.
+
+    Аргументы:
+        filename: путь к файлу с данными.
+
+    Возвращает:
+        генератор словарей задач в порядке их записи.
+    '''
+
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        yield from journal.iter_replay(csv.DictReader(file), filename)
+
+
+def where(tasks: Iterable[dict], **params) -> Iterator[dict]:
+    '''
+    Оставляет задачи, у которых значения полей равны указанным.
+
+    Пример:
+        where(tasks, category='работа', status='не выполнено')
+    '''
+
+    params = list(params.items())
+    for task in tasks:
+        if all(task.get(field) == value for field, value in params):
+            yield task
+
+
+def match_keyword(tasks: Iterable[dict], keyword: str) -> Iterator[dict]:
+    '''
+    Оставляет задачи, в которых встречается keyword.
+
+    Как и TaskManager.search_params, ищет подстроку во всех полях,
+    кроме id, без учета регистра.
+    '''
+
+    keyword = keyword.lower()
+    for task in tasks:
+        for field in FIELD_NAMES[1:]:
+            if keyword in (task.get(field) or '').lower():
+                yield task
+                break
+
+
+def limit(tasks: Iterable[dict], count: int | None) -> Iterator[dict]:
+    '''
+    Возвращает не больше count первых задач.
+
+    Если count = None, то возвращает все задачи.
+    '''
+
+    return islice(tasks, count)
+
+
+def export_csv(tasks: Iterable[dict], filename: str) -> int:
+    '''
+    Записывает задачи в csv файл по одной.
+
+    Возвращает:
+        количество записанных задач.
+    '''
+
+    count = 0
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+        writer.writeheader()
+        for task in tasks:
+            writer.writerow(task)
+            count += 1
+    return count
+
+
+def print_tasks(tasks: Iterable[dict]) -> int:
+    '''
+    Выводит задачи по мере их чтения.
+
+    Возвращает:
+        количество выведенных задач.
+    '''
+
+    count = 0
+    for task in tasks:
+        print(task)
+        count += 1
+    return count
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='Потоковый поиск и выгрузка задач.'
+    )
+    parser.add_argument('--file', default=FILE_NAME)
+    parser.add_argument('--category')
+    parser.add_argument('--status')
+    parser.add_argument('--prio')
+    parser.add_argument('--keyword')
+    parser.add_argument('--limit', type=int)
+    parser.add_argument('--export')
+    args = parser.parse_args(args)
+    params = {
+        field: getattr(args, field) for field in ('category', 'status', 'prio')
+        if getattr(args, field) is not None
+    }
+    tasks = where(iter_tasks(args.file), **params)
+    if args.keyword is not None:
+        tasks = match_keyword(tasks, args.keyword)
+    tasks = limit(tasks, args.limit)
+    if args.export is not None:
+        count = export_csv(tasks, args.export)
+        print(f'Выгружено задач: {count}')
+    elif print_tasks(tasks) == 0:
+        print('Такой задачи не существует')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+'''
+Кэш результатов поиска для TaskStore.search.
+'''
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Iterable
+
+from indexes import parse_query, tokenize
+from settings import QUERY_CACHE_SIZE, TEXT_FIELDS, TEXT_PREFIX_SEARCH
+
+
+def normalize_params(params: dict) -> tuple:
+    '''
+    Приводит параметры поиска к общему виду.
+
+    Поля сортируются, а запрос по ключевым словам приводится к словам
+    в нижнем регистре (см. indexes.parse_query), поэтому, например,
+    {'keyword': 'Отчет  ИЛИ план'} и {'keyword': 'отчет или план'}
+    дают один и тот же ключ.
+
+    Возвращает:
+        кортеж пар (поле, значение).
+    '''
+
+    result = []
+    for field, value in sorted(params.items()):
+        if field == 'keyword':
+            words, mode = parse_query(value)
+            value = (' или ' if mode == 'or' else ' ').join(words)
+        result.append((field, value))
+    return tuple(result)
+
+
+class QueryCache():
+    '''
+    LRU кэш id задач, найденных по параметрам поиска.
+
+    Ключ - номер поколения и параметры поиска после normalize_params.
+    Хранилище увеличивает номер поколения, когда перечитывает файл,
+    поэтому результаты, найденные до этого, больше не используются.
+    При собственных изменениях хранилища удаляются только результаты,
+    которые могли измениться: например, при изменении категории задачи -
+    результаты поиска по старой и новой категории и по словам,
+    которые есть в задаче.
+
+    Атрибуты:
+        max_size: наибольшее количество результатов в кэше.
+        generation: номер поколения.
+        hits: количество найденных в кэше результатов.
+        misses: количество запросов, которых не было в кэше.
+
+    Методы:
+        get_key
+        get
+        put
+        invalidate
+        clear
+        get_stats.
+    '''
+
+    def __init__(self, max_size: int = QUERY_CACHE_SIZE):
+        self.max_size = max_size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get_key(self, params: dict) -> tuple:
+        return self.generation, normalize_params(params)
+
+    def get(self, key: tuple) -> tuple[int, ...] | None:
+        '''
+        Возвращает id найденных задач или None, если их нет в кэше.
+        '''
+
+        ids = self.entries.get(key)
+        if ids is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return ids
+
+    def put(self, key: tuple, ids: Iterable[int]) -> tuple[int, ...]:
+        '''
+        Сохраняет id найденных задач, удаляя самый давно
+        использованный результат, если кэш заполнен.
+
+        Возвращает:
+            сохраненный кортеж id.
+        '''
+
+        ids = tuple(ids)
+        if key[0] != self.generation or self.max_size <= 0:
+            return ids
+        self.entries[key] = ids
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return ids
+
+    def _is_affected(self, params: tuple, rows: list[Mapping]) -> bool:
+        for field, value in params:
+            if field != 'keyword':
+                if any(row.get(field) == value for row in rows):
+                    return True
+                continue
+            query = parse_query(value)[0]
+            for row in rows:
+                for text_field in TEXT_FIELDS:
+                    for word in tokenize(row.get(text_field) or ''):
+                        if any(
+                            word.startswith(item) if TEXT_PREFIX_SEARCH
+                            else word == item for item in query
+                        ):
+                            return True
+        return False
+
+    def invalidate(self, *rows: Mapping) -> None:
+        '''
+        Удаляет результаты, в которые могут входить указанные задачи.
+
+        Аргументы:
+            rows: задачи до и после изменения.
+        '''
+
+        if not self.entries:
+            return
+        rows = [row for row in rows if row is not None]
+        for key in [
+            key for key in self.entries if self._is_affected(key[1], rows)
+        ]:
+            del self.entries[key]
+
+    def clear(self) -> None:
+        '''Удаляет все результаты и начинает новое поколение.'''
+
+        self.generation += 1
+        self.entries.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,748 @@
+'''
+Хранилища задач с общим интерфейсом TaskRepository.
+
+Реализации:
+    CsvRepository - csv файл и журнал изменений (journal.py).
+    SqliteRepository - база данных sqlite3.
+    binstore.BinaryStorage - двоичный файл с доступом через mmap.
+    shards.ShardedRepository - папка с csv файлом на каждую категорию.
+
+TaskManager выбирает реализацию по настройке STORAGE_BACKEND.
+'''
+
+import csv
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import chain
+from typing import Iterable, Iterator
+
+import journal
+from atomic import atomic_open, check_policy, sync_files
+from idindex import IdIndex
+from locking import FileLock
+from meta import bump_generation, get_generation, get_meta_name
+from pipeline import iter_tasks, match_keyword, where
+from settings import (BINARY_FILE_NAME, FIELD_NAMES, FILE_NAME,
+                      FSYNC_POLICY, SHARDED_DIR_NAME, SORT_RUN_MEMORY,
+                      SORT_RUN_SIZE, SQLITE_FILE_NAME, USE_LOG)
+from sorting import external_sort, parse_date
+
+
+DATA_FILES = {
+    'csv': FILE_NAME,
+    'binary': BINARY_FILE_NAME,
+    'sqlite': SQLITE_FILE_NAME,
+    'sharded': SHARDED_DIR_NAME,
+}
+
+
+def get_data_file(backend: str) -> str:
+    '''
+    Возвращает путь к файлу с данными для указанного хранилища.
+    '''
+
+    if backend not in DATA_FILES:
+        raise ValueError(f'Неизвестное хранилище: {backend}')
+    return DATA_FILES[backend]
+
+
+def get_file_signature(*filenames: str) -> tuple:
+    '''
+    Возвращает время изменения и размер указанных файлов.
+
+    Для отсутствующих файлов вместо них записывается None.
+    '''
+
+    signature = []
+    for name in filenames:
+        try:
+            stat = os.stat(name)
+            signature.append((stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class TaskRepository(ABC):
+    '''
+    Общий интерфейс хранилищ задач.
+
+    Задачи передаются и возвращаются в виде словарей (или Task),
+    в которых все значения - строки, как в csv.DictReader.
+
+    Необязательный аргумент data в изменяющих методах - список всех
+    задач, который уже есть у вызывающего кода. Хранилища, которые
+    перезаписывают файл целиком, используют его вместо повторного
+    чтения файла, остальные его игнорируют.
+
+    Атрибуты:
+        stale: True, если перед последней записью оказалось, что данные
+        изменил другой процесс. Тогда копия данных в памяти вызывающего
+        кода тоже устарела, и ее нужно перечитать.
+
+    Методы:
+        get_signature
+        read_all
+        get
+        search
+        insert
+        insert_many
+        update
+        update_many
+        set_status
+        delete
+        delete_many
+        delete_category
+        write_batch
+        close.
+    '''
+
+    stale = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @abstractmethod
+    def get_signature(self) -> tuple:
+        '''
+        Возвращает значение, которое меняется при каждом изменении
+        данных, например, время изменения и размер файлов.
+        '''
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[dict]:
+        '''Возвращает задачи по одной в порядке их записи.'''
+
+    def read_all(self) -> list[dict]:
+        '''Возвращает список всех задач.'''
+
+        return list(self)
+
+    def get(self, id: int) -> dict | None:
+        '''Возвращает задачу с указанным id или None.'''
+
+        for row in self:
+            if int(row.get('id')) == id:
+                return row
+        return None
+
+    def search(self, params: dict) -> list[dict]:
+        '''
+        Поиск задач.
+
+        Аргументы:
+            params: словарь, в котором ключи 'category', 'status', 'prio' -
+            точное совпадение поля, 'keyword' - подстрока в любом поле,
+            кроме id, без учета регистра.
+
+        Возвращает:
+            список найденных задач.
+        '''
+
+        fields = {
+            field: value for field, value in params.items()
+            if field != 'keyword'
+        }
+        tasks = where(self, **fields)
+        if params.get('keyword') is not None:
+            tasks = match_keyword(tasks, params.get('keyword'))
+        return list(tasks)
+
+    @abstractmethod
+    def insert(self, row: dict) -> None:
+        '''Добавляет новую задачу.'''
+
+    def insert_many(self, rows: Iterable[dict]) -> None:
+        '''Добавляет несколько новых задач.'''
+
+        for row in rows:
+            self.insert(row)
+
+    @abstractmethod
+    def update(self, row: dict, data: list[dict] | None = None) -> None:
+        '''Заменяет задачу с тем же id.'''
+
+    def update_many(
+            self,
+            rows: Iterable[dict],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Заменяет несколько задач.'''
+
+        for row in rows:
+            self.update(row, data)
+
+    @abstractmethod
+    def set_status(
+            self,
+            id: int,
+            status: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Изменяет статус задачи.'''
+
+    @abstractmethod
+    def delete(self, id: int, data: list[dict] | None = None) -> None:
+        '''Удаляет задачу с указанным id.'''
+
+    def delete_many(
+            self,
+            ids: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Удаляет задачи с указанными id.'''
+
+        for id in ids:
+            self.delete(id, data)
+
+    @abstractmethod
+    def delete_category(
+            self,
+            category: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Удаляет все задачи категории.'''
+
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''
+        Добавляет, заменяет и удаляет задачи за один вызов.
+
+        Хранилища, которые это поддерживают, делают одну запись
+        вместо отдельных записей для каждой задачи.
+
+        Аргументы:
+            created: новые задачи.
+            updated: измененные задачи.
+            deleted: id удаляемых задач.
+            data: задачи до изменений, см. описание класса.
+        '''
+
+        self.insert_many(created)
+        self.update_many(updated)
+        self.delete_many(deleted)
+
+    def close(self) -> None:
+        '''Освобождает ресурсы хранилища.'''
+
+
+class CsvRepository(TaskRepository):
+    '''
+    Хранилище задач в csv файле.
+
+    Если use_log = True, то изменения и удаления не перезаписывают файл,
+    а дописываются в журнал (см. journal.py). Иначе каждое изменение
+    перезаписывает файл целиком.
+
+    Чтение выполняется под разделяемой блокировкой FileLock, запись -
+    под исключительной. При каждом чтении запоминается номер поколения
+    файла (см. meta.get_generation), а каждая запись его увеличивает.
+    Если перед записью номер в файле отличается от запомненного, то
+    переданные в data задачи устарели: файл перечитывается, и к нему
+    применяется только изменение этой записи, поэтому изменения других
+    процессов не теряются.
+
+    Файл перезаписывается атомарно через временный файл
+    (см. atomic.py), а на диск сбрасывается согласно fsync_policy.
+
+    Задача по id читается через индекс IdIndex (см. idindex.py) без
+    чтения всего файла. Индекс создается при первом поиске по id
+    и после этого обновляется при каждой записи.
+    '''
+
+    def __init__(
+            self,
+            filename: str,
+            use_log: bool = USE_LOG,
+            fsync_policy: str = FSYNC_POLICY,
+            ):
+        '''
+        Атрибуты:
+            filename: путь к csv файлу с данными.
+            use_log: записывать ли изменения в журнал.
+            fsync_policy: 'always', 'on_close' или 'never',
+            см. FSYNC_POLICY.
+        '''
+
+        self.filename = filename
+        self.use_log = use_log
+        self.fsync_policy = check_policy(fsync_policy)
+        self.fsync = fsync_policy == 'always'
+        self.lock = FileLock(filename)
+        self.index = IdIndex(filename)
+        self.generation = None
+        self._unsynced = False
+
+    @contextmanager
+    def _write(self, data: list[dict] | None = None):
+        '''
+        Захватывает исключительную блокировку на время записи.
+
+        Возвращает:
+            data или None, если data устарели и файл нужно перечитать.
+        '''
+
+        with self.lock.exclusive():
+            self.stale = get_generation(self.filename) != self.generation
+            yield None if self.stale else data
+            self.generation = bump_generation(self.filename, self.fsync)
+            self._unsynced = True
+
+    def _write_to_log(self) -> bool:
+        '''
+        Проверяет, нужно ли записывать изменения в журнал.
+
+        Если журналирование выключено, а журнал остался с прошлых запусков,
+        то сначала сворачивает его в основной файл.
+        '''
+
+        if self.use_log:
+            return True
+        journal.compact(self.filename, fsync=self.fsync)
+        return False
+
+    def _compact_log(self) -> None:
+        journal.compact_if_needed(self.filename, fsync=self.fsync)
+
+    def _append_log(self, op: str, row: dict) -> None:
+        journal.append_record(self.filename, op, row)
+        self._compact_log()
+
+    def get_signature(self) -> tuple:
+        return get_file_signature(
+            self.filename, journal.get_log_name(self.filename)
+        )
+
+    def __iter__(self) -> Iterator[dict]:
+        with self.lock.shared():
+            self.generation = get_generation(self.filename)
+            yield from iter_tasks(self.filename)
+
+    def read_all(self) -> list[dict]:
+        with self.lock.shared():
+            self.generation = get_generation(self.filename)
+            with open(
+                self.filename, 'r', encoding='utf-8', newline=''
+            ) as file:
+                reader = csv.DictReader(file)
+                return journal.replay(list(reader), self.filename)
+
+    def get(self, id: int) -> dict | None:
+        '''
+        Находит задачу по индексу id и применяет к ней журнал изменений.
+        '''
+
+        with self.lock.shared():
+            row = self.index.get(id)
+            if not os.path.isfile(journal.get_log_name(self.filename)):
+                return row
+            for row in journal.replay([row] if row else [], self.filename):
+                if int(row.get('id')) == id:
+                    return row
+        return None
+
+    def rewrite(self, data: Iterable[dict]) -> None:
+        '''
+        Атомарно перезаписывает файл указанными задачами.
+
+        Если запись прервется, то файл останется прежним.
+        '''
+
+        with atomic_open(self.filename, self.fsync) as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writeheader()
+            writer.writerows(data)
+        if self.index.exists():
+            self.index.build()
+
+    def reorganize(
+            self,
+            keys: Iterable[str] = ('id',),
+            run_size: int = SORT_RUN_SIZE,
+            run_memory: int = SORT_RUN_MEMORY,
+            ) -> int:
+        '''
+        Перезаписывает файл с задачами, отсортированными по keys,
+        внешней сортировкой (см. sorting.external_sort), поэтому файл
+        не загружается в память целиком. Журнал при этом сворачивается
+        в файл.
+
+        Возвращает:
+            количество задач в файле.
+        '''
+
+        with self._write():
+            count = external_sort(
+                iter_tasks(self.filename), self.filename, keys,
+                run_size, run_memory, self.fsync
+            )
+            log_name = journal.get_log_name(self.filename)
+            if os.path.isfile(log_name):
+                os.remove(log_name)
+            if self.index.exists():
+                self.index.build()
+        return count
+
+    def insert(self, row: dict) -> None:
+        self.insert_many([row])
+
+    def _append(self, rows: Iterable[dict]) -> None:
+        was_valid = self.index.is_valid()
+        offset = os.path.getsize(self.filename)
+        with open(self.filename, 'a', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writerows(rows)
+        if self.index.exists():
+            self.index.update_after_append(offset, was_valid)
+
+    def insert_many(self, rows: Iterable[dict]) -> None:
+        with self._write():
+            if self._write_to_log():
+                journal.append_records(
+                    self.filename, (('create', row) for row in rows)
+                )
+                self._compact_log()
+                return
+            self._append(rows)
+
+    def update(self, row: dict, data: list[dict] | None = None) -> None:
+        self.update_many([row], data)
+
+    def update_many(
+            self,
+            rows: Iterable[dict],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write(data) as data:
+            if self._write_to_log():
+                journal.append_records(
+                    self.filename, (('update', row) for row in rows)
+                )
+                self._compact_log()
+                return
+            new_rows = {int(row.get('id')): row for row in rows}
+            if data is None:
+                data = self.read_all()
+            self.rewrite(
+                new_rows.get(int(row.get('id')), row) for row in data
+            )
+
+    def set_status(
+            self,
+            id: int,
+            status: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write(data) as data:
+            if self._write_to_log():
+                self._append_log('status', {'id': id, 'status': status})
+                return
+            if data is None:
+                data = self.read_all()
+            self.rewrite(
+                dict(row, status=status) if int(row.get('id')) == id else row
+                for row in data
+            )
+
+    def delete(self, id: int, data: list[dict] | None = None) -> None:
+        self.delete_many([id], data)
+
+    def delete_many(
+            self,
+            ids: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write(data) as data:
+            if self._write_to_log():
+                journal.append_records(
+                    self.filename, (('delete', {'id': id}) for id in ids)
+                )
+                self._compact_log()
+                return
+            ids = set(ids)
+            if data is None:
+                data = self.read_all()
+            self.rewrite(
+                row for row in data if int(row.get('id')) not in ids
+            )
+
+    def delete_category(
+            self,
+            category: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write(data) as data:
+            if self._write_to_log():
+                self._append_log('delete_category', {'category': category})
+                return
+            if data is None:
+                data = self.read_all()
+            self.rewrite(
+                row for row in data if row.get('category') != category
+            )
+
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''
+        Записывает все изменения одной записью в журнал или одной
+        перезаписью файла. Если задачи только добавляются, то они
+        дописываются в конец файла.
+        '''
+
+        with self._write(data) as data:
+            if self._write_to_log():
+                journal.append_records(self.filename, chain(
+                    (('create', row) for row in created),
+                    (('update', row) for row in updated),
+                    (('delete', {'id': id}) for id in deleted),
+                ))
+                self._compact_log()
+                return
+            updated = {int(row.get('id')): row for row in updated}
+            deleted = set(deleted)
+            if not updated and not deleted:
+                self._append(created)
+                return
+            if data is None:
+                data = self.read_all()
+            self.rewrite(chain(
+                (
+                    updated.get(int(row.get('id')), row) for row in data
+                    if int(row.get('id')) not in deleted
+                ),
+                created,
+            ))
+
+    def close(self) -> None:
+        '''
+        При fsync_policy = 'on_close' сбрасывает на диск файл с данными,
+        журнал и служебный файл, если в них что-то записывалось.
+        '''
+
+        if self._unsynced and self.fsync_policy == 'on_close':
+            sync_files(
+                self.filename, journal.get_log_name(self.filename),
+                get_meta_name(self.filename)
+            )
+        self._unsynced = False
+
+
+class SqliteRepository(TaskRepository):
+    '''
+    Хранилище задач в базе данных sqlite3.
+
+    База работает в режиме WAL, поэтому чтение не блокируется записью.
+    Таблица tasks проиндексирована по id (первичный ключ), category,
+    status и сроку выполнения (deadline - порядковый номер дня).
+    Все запросы - постоянные строки с параметрами, поэтому sqlite3
+    подготавливает каждый из них один раз и берет из своего кэша.
+
+    Как номер поколения в CsvRepository, при каждом чтении всех задач
+    запоминается PRAGMA data_version, который меняется, когда базу
+    изменяет другое соединение. Запись начинается с BEGIN IMMEDIATE,
+    и если data_version к этому моменту изменился, то stale = True.
+    '''
+
+    COLUMNS = ', '.join(FIELD_NAMES)
+
+    SCHEMA = (
+        'CREATE TABLE IF NOT EXISTS tasks ('
+        'id INTEGER PRIMARY KEY, title TEXT NOT NULL, '
+        'description TEXT NOT NULL, category TEXT NOT NULL, '
+        'date TEXT NOT NULL, prio TEXT NOT NULL, status TEXT NOT NULL, '
+        'deadline INTEGER NOT NULL)',
+        'CREATE INDEX IF NOT EXISTS tasks_category ON tasks (category)',
+        'CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status)',
+        'CREATE INDEX IF NOT EXISTS tasks_deadline ON tasks (deadline)',
+    )
+
+    SELECT = f'SELECT {COLUMNS} FROM tasks'
+
+    INSERT = (f'INSERT INTO tasks ({COLUMNS}, deadline) '
+              'VALUES (?, ?, ?, ?, ?, ?, ?, ?)')
+
+    UPDATE = ('UPDATE tasks SET title = ?, description = ?, category = ?, '
+              'date = ?, prio = ?, status = ?, deadline = ? WHERE id = ?')
+
+    def __init__(self, filename: str):
+        '''
+        Открывает базу, создавая таблицу и индексы, если их нет.
+
+        Атрибуты:
+            filename: путь к файлу базы данных.
+        '''
+
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, check_same_thread=False)
+        self.connection.execute('PRAGMA journal_mode = WAL')
+        self.connection.execute('PRAGMA synchronous = NORMAL')
+        self.connection.create_function(
+            'py_lower', 1, lambda value: value and value.lower(),
+            deterministic=True
+        )
+        with self.connection:
+            for statement in self.SCHEMA:
+                self.connection.execute(statement)
+        self.generation = None
+
+    def _get_data_version(self) -> int:
+        return self.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    @contextmanager
+    def _write(self):
+        '''
+        Выполняет запись в одной транзакции, которая сразу захватывает
+        блокировку записи базы, и проверяет, не изменило ли базу другое
+        соединение после последнего чтения.
+        '''
+
+        with self.connection:
+            self.connection.execute('BEGIN IMMEDIATE')
+            self.stale = self._get_data_version() != self.generation
+            yield
+
+    def _to_dict(self, values: tuple) -> dict:
+        row = dict(zip(FIELD_NAMES, values))
+        row['id'] = str(row['id'])
+        return row
+
+    def _to_values(self, row: dict) -> tuple:
+        return (
+            int(row.get('id')), row.get('title'), row.get('description'),
+            row.get('category'), row.get('date'), row.get('prio'),
+            row.get('status'), parse_date(row.get('date')),
+        )
+
+    def _to_update_values(self, row: dict) -> tuple:
+        values = self._to_values(row)
+        return values[1:] + values[:1]
+
+    def get_signature(self) -> tuple:
+        return get_file_signature(self.filename, self.filename + '-wal')
+
+    def __iter__(self) -> Iterator[dict]:
+        self.generation = self._get_data_version()
+        for values in self.connection.execute(self.SELECT + ' ORDER BY id'):
+            yield self._to_dict(values)
+
+    def get(self, id: int) -> dict | None:
+        values = self.connection.execute(
+            self.SELECT + ' WHERE id = ?', (id,)
+        ).fetchone()
+        return None if values is None else self._to_dict(values)
+
+    def search(self, params: dict) -> list[dict]:
+        conditions = []
+        values = []
+        for field in ('category', 'status', 'prio'):
+            if params.get(field) is not None:
+                conditions.append(f'{field} = ?')
+                values.append(params.get(field))
+        if params.get('keyword') is not None:
+            keyword = params.get('keyword').lower()
+            for char in ('\\', '%', '_'):
+                keyword = keyword.replace(char, '\\' + char)
+            conditions.append('(' + ' OR '.join(
+                f"py_lower({field}) LIKE ? ESCAPE '\\'"
+                for field in FIELD_NAMES[1:]
+            ) + ')')
+            values.extend([f'%{keyword}%'] * len(FIELD_NAMES[1:]))
+        query = self.SELECT
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        rows = self.connection.execute(query + ' ORDER BY id', values)
+        return [self._to_dict(row) for row in rows]
+
+    def insert(self, row: dict) -> None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Iterable[dict]) -> None:
+        with self._write():
+            self.connection.executemany(
+                self.INSERT, (self._to_values(row) for row in rows)
+            )
+
+    def update(self, row: dict, data: list[dict] | None = None) -> None:
+        self.update_many([row])
+
+    def update_many(
+            self,
+            rows: Iterable[dict],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            self.connection.executemany(
+                self.UPDATE, (self._to_update_values(row) for row in rows)
+            )
+
+    def set_status(
+            self,
+            id: int,
+            status: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            self.connection.execute(
+                'UPDATE tasks SET status = ? WHERE id = ?', (status, id)
+            )
+
+    def delete(self, id: int, data: list[dict] | None = None) -> None:
+        self.delete_many([id])
+
+    def delete_many(
+            self,
+            ids: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            self.connection.executemany(
+                'DELETE FROM tasks WHERE id = ?', ((id,) for id in ids)
+            )
+
+    def delete_category(
+            self,
+            category: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        with self._write():
+            self.connection.execute(
+                'DELETE FROM tasks WHERE category = ?', (category,)
+            )
+
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Записывает все изменения в одной транзакции.'''
+
+        with self._write():
+            self.connection.executemany(
+                self.INSERT, (self._to_values(row) for row in created)
+            )
+            self.connection.executemany(
+                self.UPDATE, (self._to_update_values(row) for row in updated)
+            )
+            self.connection.executemany(
+                'DELETE FROM tasks WHERE id = ?', ((id,) for id in deleted)
+            )
+
+    def close(self) -> None:
+        self.connection.close()
@@ -0,0 +1,539 @@
+'''
+HTTP сервер с JSON API для задач.
+
+Сервер работает на asyncio и держит в памяти один TaskStore, поэтому
+запросы на чтение не перечитывают файл с данными: проверка, не изменил
+ли файл другой процесс, выполняется не чаще раза в
+SERVER_REFRESH_INTERVAL секунд (см. TaskStore.refresh).
+
+Изменения выполняет одна задача-писатель. Запросы на изменение
+ставятся в очередь, а писатель забирает все накопившиеся операции,
+применяет их как один пакет (см. batch.Batch) и записывает в файл
+одной записью. Поэтому одновременные изменения не мешают друг другу,
+а при большом количестве изменений файл перезаписывается реже.
+Запись в файл выполняется в отдельном потоке, поэтому запросы на
+чтение обрабатываются во время записи и видят задачи до пакета,
+а задачи хранилища изменяются только после записи.
+
+Запросы:
+    GET /tasks?offset=0&limit=50 - список задач в порядке записи;
+    GET /tasks?after=<id>&limit=50 - список задач по порядку id после
+        указанного (курсор), ответ содержит id для следующей страницы
+        в поле next;
+    GET /tasks?category=...&status=...&prio=...&keyword=... - поиск,
+        как в TaskStore.search, с теми же offset и limit; archive=1
+        или archive=0 включает или выключает поиск в архиве;
+    GET /tasks?due=overdue|<N дней>|<дата>+<дата>[&status=...] - поиск
+        по сроку выполнения, как в TaskStore.search_dates;
+    GET /tasks/<id> - задача по id;
+    POST /tasks - создать задачу, тело - JSON с полями title,
+        description, category, date и prio;
+    PATCH /tasks/<id> - изменить поля задачи, тело - JSON;
+    POST /tasks/<id>/complete - отметить выполнение;
+    DELETE /tasks/<id> - удалить задачу;
+    DELETE /tasks?category=... - удалить все задачи категории.
+
+Ответы - JSON, ошибки - {"error": "..."} с кодом 400, 404 или 405,
+а если изменения не удалось записать - с кодом 500.
+
+Запуск из корневой папки проекта:
+    python -m server [--host 127.0.0.1] [--port 8080] [--file data.csv]
+'''
+
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from bisect import bisect_right
+from urllib.parse import parse_qsl, urlsplit
+
+from batch import Batch, check_operation
+from exceptions import RequestError
+from instrumentation import enable_from_environment
+from main import TaskStore, check_file
+from repository import get_data_file
+from settings import (SERVER_HOST, SERVER_MAX_PAGE_SIZE, SERVER_PAGE_SIZE,
+                      SERVER_PORT, SERVER_REFRESH_INTERVAL, STORAGE_BACKEND)
+from sorting import get_deadline_range
+
+
+REASONS = {
+    200: 'OK',
+    201: 'Created',
+    204: 'No Content',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+# Поля, по которым можно искать в GET /tasks.
+SEARCH_FIELDS = ('category', 'status', 'prio', 'keyword')
+
+MAX_BODY_SIZE = 1024 * 1024
+
+
+async def read_request(
+        reader: asyncio.StreamReader,
+        ) -> tuple[str, str, dict, bytes] | None:
+    '''
+    Читает один HTTP запрос из соединения.
+
+    Возвращает:
+        метод, адрес, заголовки и тело запроса или None,
+        если клиент закрыл соединение.
+
+    Вызывает:
+        RequestError: если запрос не удалось разобрать.
+    '''
+
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise RequestError(400, 'Неверная строка запроса')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise RequestError(400, 'Неверный заголовок Content-Length')
+    if length > MAX_BODY_SIZE:
+        raise RequestError(413, 'Слишком большое тело запроса')
+    body = await reader.readexactly(length) if length > 0 else b''
+    return method, target, headers, body
+
+
+def make_response(status: int, result, keep_alive: bool = True) -> bytes:
+    '''Возвращает HTTP ответ с результатом в формате JSON.'''
+
+    body = b''
+    if result is not None:
+        body = json.dumps(result, ensure_ascii=False).encode('utf-8')
+    head = (f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+            'Content-Type: application/json; charset=utf-8\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+            '\r\n')
+    return head.encode('latin-1') + body
+
+
+def read_json(body: bytes) -> dict:
+    try:
+        result = json.loads(body)
+    except ValueError:
+        raise RequestError(400, 'Тело запроса не является объектом JSON')
+    if not isinstance(result, dict):
+        raise RequestError(400, 'Тело запроса не является объектом JSON')
+    return result
+
+
+def parse_int(value: str, name: str) -> int:
+    try:
+        result = int(value)
+    except ValueError:
+        raise RequestError(400, f'{name} должно быть целым числом!')
+    if result < 0:
+        raise RequestError(400, f'{name} не может быть отрицательным!')
+    return result
+
+
+class TaskServer():
+    '''
+    Обработчик запросов к задачам одного TaskStore.
+
+    Атрибуты:
+        store: хранилище задач в памяти.
+        refresh_interval: как часто проверять файл с данными в секундах.
+        queue: очередь операций для задачи-писателя.
+
+    Методы:
+        start
+        close
+        handle
+        submit
+        write
+        list_tasks
+        get_task.
+    '''
+
+    def __init__(
+            self,
+            store: TaskStore,
+            refresh_interval: float = SERVER_REFRESH_INTERVAL,
+            ):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self.queue = None
+        self._writer = None
+        self._writing = False
+        self._refreshed = time.monotonic()
+
+    async def start(self, host: str, port: int) -> asyncio.Server:
+        '''
+        Запускает задачу-писатель и сервер.
+
+        Возвращает:
+            asyncio.Server, port=0 выбирает свободный порт.
+        '''
+
+        self.queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._write_loop())
+        return await asyncio.start_server(self._serve, host, port)
+
+    async def close(self) -> None:
+        '''Останавливает задачу-писатель.'''
+
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+
+    async def _serve(
+            self,
+            reader: asyncio.StreamReader,
+            writer: asyncio.StreamWriter,
+            ) -> None:
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except RequestError as error:
+                    writer.write(make_response(
+                        error.status, {'error': str(error)}, False
+                    ))
+                    await writer.drain()
+                    break
+                if request is None:
+                    break
+                method, target, headers, body = request
+                status, result = await self.handle(method, target, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(make_response(status, result, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def handle(
+            self,
+            method: str,
+            target: str,
+            body: bytes = b'',
+            ) -> tuple[int, dict | None]:
+        '''
+        Выполняет запрос.
+
+        Аргументы:
+            method: метод HTTP.
+            target: адрес с параметрами, например, "/tasks?limit=10".
+            body: тело запроса.
+
+        Возвращает:
+            код ответа и результат для преобразования в JSON.
+        '''
+
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = dict(parse_qsl(url.query))
+        try:
+            if not parts or parts[0] != 'tasks' or len(parts) > 3:
+                raise RequestError(404, 'Такого адреса не существует')
+            if len(parts) == 1:
+                if method == 'GET':
+                    return 200, self.list_tasks(query)
+                if method == 'POST':
+                    operation = dict(read_json(body), op='create')
+                    return 201, await self.submit(operation)
+                if method == 'DELETE':
+                    await self.submit({
+                        'op': 'delete', 'category': query.get('category'),
+                    })
+                    return 204, None
+            else:
+                id = parse_int(parts[1], 'id')
+                if len(parts) == 3:
+                    if parts[2] != 'complete':
+                        raise RequestError(404, 'Такого адреса не существует')
+                    if method == 'POST':
+                        return 200, await self.submit(
+                            {'op': 'complete', 'id': id}
+                        )
+                elif method == 'GET':
+                    return 200, self.get_task(id)
+                elif method == 'PATCH':
+                    operation = dict(read_json(body), op='update', id=id)
+                    return 200, await self.submit(operation)
+                elif method == 'DELETE':
+                    await self.submit({'op': 'delete', 'id': id})
+                    return 204, None
+            raise RequestError(405, 'Метод не поддерживается')
+        except RequestError as error:
+            return error.status, {'error': str(error)}
+
+    def _refresh(self) -> None:
+        '''
+        Перечитывает файл, если его изменил другой процесс, но не чаще
+        раза в refresh_interval секунд.
+        '''
+
+        now = time.monotonic()
+        if self._writing:
+            return
+        if now - self._refreshed >= self.refresh_interval:
+            self.store.refresh()
+            self._refreshed = now
+
+    def list_tasks(self, query: dict) -> dict:
+        '''
+        Возвращает страницу списка задач или результатов поиска.
+
+        Аргументы:
+            query: параметры запроса: offset или after, limit, поля из
+            SEARCH_FIELDS и archive=1 или archive=0, чтобы искать или
+            не искать в архиве выполненных задач (см. TaskStore.search).
+        '''
+
+        for name in query:
+            if name not in SEARCH_FIELDS + ('due', 'after', 'offset',
+                                            'limit', 'archive'):
+                raise RequestError(400, f'Неизвестный параметр "{name}"')
+        offset = parse_int(query.get('offset', '0'), 'offset')
+        limit = parse_int(query.get('limit', str(SERVER_PAGE_SIZE)), 'limit')
+        limit = min(limit, SERVER_MAX_PAGE_SIZE)
+        self._refresh()
+        params = {
+            field: query.get(field) for field in SEARCH_FIELDS
+            if field in query
+        }
+        if 'archive' in query and (not params or 'due' in query):
+            raise RequestError(
+                400, 'Параметр archive можно указать только при поиске'
+            )
+        if 'after' in query:
+            return self._list_after(query, limit)
+        if 'due' in query:
+            tasks = self._search_dates(query)
+            total = len(tasks)
+            page = tasks[offset:offset + limit]
+        elif params:
+            tasks = self.store.search(params, self._parse_archive(query))
+            if tasks and isinstance(tasks[0], str):
+                tasks = []
+            total = len(tasks)
+            page = tasks[offset:offset + limit]
+        else:
+            total = len(self.store)
+            page = itertools.islice(
+                self.store.tasks.values(), offset, offset + limit
+            )
+        return {
+            'total': total,
+            'offset': offset,
+            'limit': limit,
+            'tasks': [dict(row) for row in page],
+        }
+
+    def _parse_archive(self, query: dict) -> bool | None:
+        if 'archive' not in query:
+            return None
+        if query.get('archive') not in ('0', '1'):
+            raise RequestError(400, 'Параметр archive должен быть 0 или 1')
+        return query.get('archive') == '1'
+
+    def _list_after(self, query: dict, limit: int) -> dict:
+        '''
+        Возвращает страницу задач по порядку id после курсора after
+        за O(log n + limit), см. TaskStore.ids.
+        '''
+
+        if set(query) - {'after', 'limit'}:
+            raise RequestError(
+                400, 'Параметр after нельзя сочетать с поиском и offset'
+            )
+        after = parse_int(query.get('after'), 'after')
+        ids = self.store.ids
+        start = bisect_right(ids, after)
+        page = ids[start:start + limit]
+        return {
+            'total': len(ids),
+            'limit': limit,
+            'next': page[-1] if page and start + limit < len(ids) else None,
+            'tasks': [dict(self.store.tasks[id]) for id in page],
+        }
+
+    def _search_dates(self, query: dict) -> list:
+        if set(query) - {'due', 'status', 'offset', 'limit'}:
+            raise RequestError(
+                400, 'Поиск по сроку можно сочетать только со статусом'
+            )
+        try:
+            start, end = get_deadline_range(query.get('due'))
+        except ValueError as error:
+            raise RequestError(400, str(error))
+        tasks = self.store.search_dates(start, end, query.get('status'))
+        if tasks and isinstance(tasks[0], str):
+            return []
+        return tasks
+
+    def get_task(self, id: int) -> dict:
+        self._refresh()
+        row = self.store.get(id)
+        if isinstance(row, str):
+            raise RequestError(404, row)
+        return dict(row)
+
+    async def submit(self, operation: dict) -> dict | None:
+        '''
+        Ставит операцию в очередь задачи-писателя и ждет ее записи.
+
+        Аргументы:
+            operation: словарь операции, как в batch.py.
+
+        Возвращает:
+            задачу после изменения или None для удаления.
+
+        Вызывает:
+            RequestError: если операция неверная, ссылается на
+            несуществующую задачу или запись не удалась.
+        '''
+
+        try:
+            operation = check_operation(operation)
+        except ValueError as error:
+            raise RequestError(400, str(error))
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((operation, future))
+        try:
+            return await future
+        except ValueError as error:
+            raise RequestError(404, str(error))
+
+    async def _write_loop(self) -> None:
+        while True:
+            pending = [await self.queue.get()]
+            while not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+            await self.write(pending)
+
+    async def write(
+            self,
+            pending: list[tuple[dict, asyncio.Future]],
+            ) -> None:
+        '''
+        Применяет накопившиеся операции и записывает их одной записью.
+
+        Операции применяются к пакету без переключения на другие
+        запросы. Файл записывается в отдельном потоке, а пакет
+        применяется к хранилищу после записи, поэтому запросы на
+        чтение не ждут записи и не видят частично примененный пакет.
+
+        Если пакет не удалось записать, то его операции завершаются
+        ошибкой с кодом 500, а писатель продолжает обрабатывать
+        следующие пакеты.
+
+        Аргументы:
+            pending: пары (проверенная операция, future для результата).
+        '''
+
+        try:
+            await self._write(pending)
+        except Exception as error:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(RequestError(500, str(error)))
+
+    async def _write(
+            self,
+            pending: list[tuple[dict, asyncio.Future]],
+            ) -> None:
+        self.store.refresh()
+        self._refreshed = time.monotonic()
+        batch = Batch(self.store)
+        count = sum(
+            operation.get('op') == 'create' for operation, _ in pending
+        )
+        ids = iter(self.store.next_ids(count) if count else ())
+        results = []
+        for operation, future in pending:
+            try:
+                batch.apply(operation, ids)
+            except ValueError as error:
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if operation.get('op') == 'create':
+                row = batch.get(next(reversed(batch.created)))
+            elif operation.get('op') == 'delete':
+                row = None
+            else:
+                row = batch.get(operation.get('id'))
+            results.append((future, None if row is None else dict(row)))
+        created, updated, deleted = batch.get_changes()
+        if created or updated or deleted:
+            # Пока файл записывается, хранилище не перечитывает его.
+            self._writing = True
+            try:
+                created, updated = await asyncio.to_thread(
+                    self.store.write_batch_file,
+                    created, updated, deleted, self.store.get_data(),
+                )
+            finally:
+                self._writing = False
+            self.store.apply_batch(created, updated, deleted)
+        for future, result in results:
+            if not future.done():
+                future.set_result(result)
+
+
+async def serve(store: TaskStore, host: str, port: int) -> None:
+    '''Обрабатывает запросы, пока процесс не остановят.'''
+
+    task_server = TaskServer(store)
+    server = await task_server.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f'Сервер запущен: http://{address[0]}:{address[1]}/tasks')
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await task_server.close()
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description='HTTP сервер с JSON API для задач.'
+    )
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--file', default=get_data_file(STORAGE_BACKEND))
+    args = parser.parse_args(args)
+    enable_from_environment()
+    check_file(args.file)
+    store = TaskStore(args.file)
+    try:
+        asyncio.run(serve(store, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        store.save_indexes()
+        store.manager.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -31,3 +31,121 @@ ENG_TO_RU = {
     'prio': 'приоритет',
     'status': 'статус'
 }
+
+# Журнал изменений: обновления и удаления дописываются в отдельный файл
+# вместо перезаписи всего FILE_NAME.
+USE_LOG = False
+
+LOG_SUFFIX = '.log'
+
+# Размер журнала в байтах, после которого он сворачивается в FILE_NAME.
+LOG_MAX_SIZE = 1024 * 1024
+
+LOG_FIELD_NAMES = ['op'] + FIELD_NAMES
+
+# Поля, по которым TaskStore поддерживает индексы для поиска.
+INDEXED_FIELDS = ['category', 'status', 'prio']
+
+# Поля, по которым строится полнотекстовый индекс для поиска
+# по ключевым словам.
+TEXT_FIELDS = ['title', 'description', 'category']
+
+TEXT_INDEX_SUFFIX = '.words.json'
+
+# Файл индекса id рядом с FILE_NAME, см. idindex.py.
+ID_INDEX_SUFFIX = '.idx'
+
+# Снимок загруженных задач и индексов рядом с FILE_NAME для быстрого
+# запуска (см. snapshot.py). Снимок записывается, только если задач
+# не меньше SNAPSHOT_MIN_TASKS, SNAPSHOT_HEADER_SIZE - сколько байт
+# начала файла с данными входит в метку снимка.
+SNAPSHOT_SUFFIX = '.snapshot'
+
+SNAPSHOT_MIN_TASKS = 10000
+
+SNAPSHOT_HEADER_SIZE = 4096
+
+# Если True, то слово запроса совпадает со всеми словами,
+# которые с него начинаются.
+TEXT_PREFIX_SEARCH = True
+
+# Возможные значения приоритета и статуса в порядке возрастания.
+PRIORITIES = ['низкий', 'средний', 'высокий']
+
+STATUSES = ['не выполнено', 'выполнено']
+
+# Служебный файл рядом с FILE_NAME: наибольший выданный id и т.п.
+META_SUFFIX = '.meta.json'
+
+# Файл блокировки рядом с файлом данных, см. locking.py.
+LOCK_SUFFIX = '.lock'
+
+# Когда перезаписанный файл сбрасывается на диск (см. atomic.py):
+# 'always' - после каждой перезаписи, 'on_close' - при выходе из
+# программы, 'never' - на усмотрение операционной системы.
+FSYNC_POLICY = 'always'
+
+# Размер буфера записи при перезаписи файла в байтах.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# Хранилище задач: 'csv' - файл FILE_NAME,
+# 'binary' - двоичный файл BINARY_FILE_NAME (см. binstore.py),
+# 'sqlite' - база данных SQLITE_FILE_NAME (см. repository.py),
+# 'sharded' - папка SHARDED_DIR_NAME с файлом на категорию (см. shards.py).
+STORAGE_BACKEND = 'csv'
+
+BINARY_FILE_NAME = 'data.tasks'
+
+BINARY_HEAP_SUFFIX = '.heap'
+
+SQLITE_FILE_NAME = 'data.sqlite3'
+
+SHARDED_DIR_NAME = 'data.shards'
+
+# Количество потоков, которые читают файлы категорий, когда операция
+# затрагивает все категории, 1 - читать по очереди.
+SHARD_WORKERS = 1
+
+# Внешняя сортировка файла с данными (см. sorting.external_sort):
+# наибольшее количество задач и наибольшая длина строк задач в одной
+# части, которая сортируется в памяти.
+SORT_RUN_SIZE = 100000
+
+SORT_RUN_MEMORY = 64 * 1024 * 1024
+
+# Количество задач в одной части при массовом импорте (см. importer.py).
+IMPORT_CHUNK_SIZE = 5000
+
+# Замеры операций (см. instrumentation.py). Переменная окружения
+# TASKS_INSTRUMENT имеет приоритет над этой настройкой.
+INSTRUMENT = False
+
+# Куда выводить замеры при выходе: 'table', 'json' или путь к JSON файлу.
+INSTRUMENT_OUTPUT = 'table'
+
+# Адрес HTTP сервера (см. server.py).
+SERVER_HOST = '127.0.0.1'
+
+SERVER_PORT = 8080
+
+# Количество задач на странице списка по умолчанию и наибольшее.
+SERVER_PAGE_SIZE = 50
+
+SERVER_MAX_PAGE_SIZE = 1000
+
+# Как часто сервер проверяет, не изменил ли файл другой процесс, в секундах.
+SERVER_REFRESH_INTERVAL = 1.0
+
+# Наибольшее количество результатов поиска в кэше TaskStore
+# (см. querycache.py), 0 - не кэшировать.
+QUERY_CACHE_SIZE = 256
+
+# Количество задач на одной странице при выводе в главном меню.
+PAGE_SIZE = 20
+
+# Через сколько дней после срока выполненные задачи переносятся
+# в архив (см. archive.py).
+ARCHIVE_AFTER_DAYS = 30
+
+# Сжатие архива: 'gzip' или 'lzma'.
+ARCHIVE_COMPRESSION = 'gzip'
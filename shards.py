@@ -0,0 +1,456 @@
+'''
+Хранилище задач, разделенное по категориям.
+
+Хранилище - папка, в которой задачи каждой категории лежат в отдельном
+csv файле (шарде), и файл manifest.json со списком шардов:
+    {"version": 1, "next_shard": 3, "shards": {
+        "работа": {"file": "1.csv", "count": 10, "min_id": 1,
+                   "max_id": 42},
+        ...
+    }}
+
+Поиск по категории читает только ее шард, удаление категории удаляет
+файл шарда и его запись в manifest.json, а задача по id ищется только
+в шардах, в диапазон id которых она попадает. Изменения перезаписывают
+только затронутые шарды. Операции над всеми задачами читают все шарды,
+при SHARD_WORKERS > 1 - в нескольких потоках.
+
+Перенос данных между форматами:
+    python -m shards import data.csv data.shards
+    python -m shards export data.shards data.csv
+'''
+
+import csv
+import json
+import os
+import sys
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+
+from atomic import atomic_open, check_policy, sync_files
+from locking import FileLock
+from meta import bump_generation, get_generation, get_meta_name
+from pipeline import match_keyword, where
+from repository import TaskRepository, get_file_signature
+from settings import FIELD_NAMES, FSYNC_POLICY, SHARD_WORKERS
+
+
+MANIFEST_NAME = 'manifest.json'
+
+VERSION = 1
+
+
+def get_id(row: dict) -> int:
+    return int(row.get('id'))
+
+
+class ShardedRepository(TaskRepository):
+    '''
+    Хранилище задач в папке с csv файлом на каждую категорию,
+    реализация TaskRepository.
+
+    Блокировки, номер поколения и сброс на диск работают так же, как
+    в CsvRepository: чтение выполняется под разделяемой блокировкой,
+    запись - под исключительной. Шарды и manifest.json перезаписываются
+    атомарно, а файлы пустых шардов удаляются после записи
+    manifest.json. Аргумент data изменяющих методов не используется.
+
+    Задачи возвращаются по возрастанию id.
+
+    Методы:
+        read_all
+        get
+        search
+        get_categories
+        export_csv
+        import_csv.
+    '''
+
+    def __init__(
+            self,
+            filename: str,
+            workers: int = SHARD_WORKERS,
+            fsync_policy: str = FSYNC_POLICY,
+            ):
+        '''
+        Атрибуты:
+            filename: путь к папке хранилища, если ее нет, то она
+            создается.
+            workers: количество потоков для чтения всех шардов.
+            fsync_policy: 'always', 'on_close' или 'never',
+            см. FSYNC_POLICY.
+
+        Вызывает:
+            ValueError: если filename не является хранилищем задач.
+        '''
+
+        self.filename = filename
+        self.manifest_name = os.path.join(filename, MANIFEST_NAME)
+        self.workers = max(workers, 1)
+        self.fsync_policy = check_policy(fsync_policy)
+        self.fsync = fsync_policy == 'always'
+        self.lock = FileLock(filename)
+        self.generation = None
+        self._unsynced = set()
+        if os.path.exists(filename) and not os.path.isdir(filename):
+            raise ValueError(f'{filename} не является папкой хранилища')
+        os.makedirs(filename, exist_ok=True)
+        with self.lock.exclusive():
+            if not os.path.isfile(self.manifest_name):
+                self._write_manifest({
+                    'version': VERSION, 'next_shard': 1, 'shards': {},
+                })
+        self._read_manifest()
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(self.manifest_name, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except json.JSONDecodeError:
+            manifest = None
+        if (not isinstance(manifest, dict)
+                or manifest.get('version') != VERSION):
+            raise ValueError(
+                f'{self.manifest_name} не является списком шардов'
+            )
+        return manifest
+
+    def _write_manifest(self, manifest: dict) -> None:
+        with atomic_open(self.manifest_name, self.fsync) as file:
+            json.dump(manifest, file, ensure_ascii=False, indent=1)
+        self._unsynced.add(self.manifest_name)
+
+    def _get_path(self, info: dict) -> str:
+        return os.path.join(self.filename, info['file'])
+
+    def _read_shard(self, info: dict) -> list[dict]:
+        with open(
+            self._get_path(info), 'r', encoding='utf-8', newline=''
+        ) as file:
+            return list(csv.DictReader(file))
+
+    def _read_shards(self, infos: list[dict]) -> list[dict]:
+        '''
+        Читает указанные шарды, при workers > 1 - в нескольких потоках.
+
+        Возвращает:
+            задачи всех шардов, отсортированные по id.
+        '''
+
+        if self.workers > 1 and len(infos) > 1:
+            with ThreadPoolExecutor(self.workers) as executor:
+                shards = list(executor.map(self._read_shard, infos))
+        else:
+            shards = [self._read_shard(info) for info in infos]
+        rows = [row for shard in shards for row in shard]
+        rows.sort(key=get_id)
+        return rows
+
+    @contextmanager
+    def _read(self):
+        '''
+        Захватывает разделяемую блокировку на время чтения.
+
+        Возвращает:
+            словарь шардов из manifest.json.
+        '''
+
+        with self.lock.shared():
+            self.generation = get_generation(self.filename)
+            yield self._read_manifest()['shards']
+
+    @contextmanager
+    def _write(self):
+        '''
+        Захватывает исключительную блокировку на время записи.
+
+        Возвращает:
+            содержимое manifest.json, которое записывается после выхода
+            из блока.
+        '''
+
+        with self.lock.exclusive():
+            self.stale = get_generation(self.filename) != self.generation
+            manifest = self._read_manifest()
+            removed = {info['file'] for info in manifest['shards'].values()}
+            yield manifest
+            removed -= {
+                info['file'] for info in manifest['shards'].values()
+            }
+            self._write_manifest(manifest)
+            for name in removed:
+                path = os.path.join(self.filename, name)
+                os.remove(path)
+                self._unsynced.discard(path)
+            self.generation = bump_generation(self.filename, self.fsync)
+
+    def _save_shard(
+            self,
+            manifest: dict,
+            category: str,
+            rows: list[dict],
+            ) -> None:
+        '''
+        Перезаписывает шард категории указанными задачами.
+
+        Для новой категории создается новый шард, а категория без задач
+        удаляется из manifest.json.
+        '''
+
+        shards = manifest['shards']
+        if not rows:
+            shards.pop(category, None)
+            return
+        if category not in shards:
+            shards[category] = {'file': f'{manifest["next_shard"]}.csv'}
+            manifest['next_shard'] += 1
+        info = shards[category]
+        path = self._get_path(info)
+        with atomic_open(path, self.fsync) as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        self._unsynced.add(path)
+        ids = [get_id(row) for row in rows]
+        info.update(count=len(rows), min_id=min(ids), max_id=max(ids))
+
+    def _append_shard(self, info: dict, rows: list[dict]) -> None:
+        path = self._get_path(info)
+        with open(path, 'a', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writerows(rows)
+        self._unsynced.add(path)
+        ids = [get_id(row) for row in rows]
+        info.update(
+            count=info['count'] + len(rows),
+            min_id=min(info['min_id'], *ids),
+            max_id=max(info['max_id'], *ids),
+        )
+
+    def _apply(
+            self,
+            created: Iterable[dict] = (),
+            updated: Iterable[dict] = (),
+            deleted: Iterable[int] = (),
+            statuses: dict[int, str] | None = None,
+            ) -> None:
+        '''
+        Применяет изменения, перезаписывая только шарды, в диапазон id
+        которых попадают измененные задачи. Новые задачи дописываются
+        в конец шардов.
+
+        Аргументы:
+            created: новые задачи.
+            updated: измененные задачи, в том числе перенесенные
+            в другую категорию.
+            deleted: id удаляемых задач.
+            statuses: новые статусы задач по id.
+        '''
+
+        updated = {get_id(row): row for row in updated}
+        deleted = set(deleted)
+        statuses = statuses or {}
+        changed = sorted(deleted.union(updated, statuses))
+        added = {}
+        for row in created:
+            added.setdefault(row.get('category'), []).append(row)
+        with self._write() as manifest:
+            shards = manifest['shards']
+            kept = {}
+            for category, info in list(shards.items()):
+                start = bisect_left(changed, info['min_id'])
+                if (start == len(changed)
+                        or changed[start] > info['max_id']):
+                    continue
+                rows = kept[category] = []
+                for row in self._read_shard(info):
+                    id = get_id(row)
+                    if id in deleted:
+                        continue
+                    if id in statuses:
+                        row = dict(row, status=statuses[id])
+                    if id in updated:
+                        row = updated[id]
+                        if row.get('category') != category:
+                            added.setdefault(
+                                row.get('category'), []
+                            ).append(row)
+                            continue
+                    rows.append(row)
+            for category, rows in kept.items():
+                self._save_shard(
+                    manifest, category, rows + added.pop(category, [])
+                )
+            for category, rows in added.items():
+                if category in shards:
+                    self._append_shard(shards[category], rows)
+                else:
+                    self._save_shard(manifest, category, rows)
+
+    def get_signature(self) -> tuple:
+        return get_file_signature(
+            self.manifest_name, get_meta_name(self.filename)
+        )
+
+    def get_categories(self) -> list[str]:
+        '''Возвращает список категорий, у которых есть шард.'''
+
+        with self._read() as shards:
+            return list(shards)
+
+    def __iter__(self) -> Iterator[dict]:
+        yield from self.read_all()
+
+    def read_all(self) -> list[dict]:
+        with self._read() as shards:
+            return self._read_shards(list(shards.values()))
+
+    def get(self, id: int) -> dict | None:
+        '''Ищет задачу только в шардах, в диапазон id которых она попадает.'''
+
+        with self._read() as shards:
+            for info in shards.values():
+                if not info['min_id'] <= id <= info['max_id']:
+                    continue
+                for row in self._read_shard(info):
+                    if get_id(row) == id:
+                        return row
+        return None
+
+    def search(self, params: dict) -> list[dict]:
+        '''
+        Поиск задач, см. TaskRepository.search.
+
+        Если в params указана категория, то читается только ее шард.
+        '''
+
+        fields = {
+            field: value for field, value in params.items()
+            if field not in ('keyword', 'category')
+        }
+        with self._read() as shards:
+            if params.get('category') is None:
+                infos = list(shards.values())
+            elif params['category'] in shards:
+                infos = [shards[params['category']]]
+            else:
+                infos = []
+            tasks = where(self._read_shards(infos), **fields)
+        if params.get('keyword') is not None:
+            tasks = match_keyword(tasks, params.get('keyword'))
+        return list(tasks)
+
+    def insert(self, row: dict) -> None:
+        self.insert_many([row])
+
+    def insert_many(self, rows: Iterable[dict]) -> None:
+        self._apply(created=rows)
+
+    def update(self, row: dict, data: list[dict] | None = None) -> None:
+        self.update_many([row], data)
+
+    def update_many(
+            self,
+            rows: Iterable[dict],
+            data: list[dict] | None = None,
+            ) -> None:
+        self._apply(updated=rows)
+
+    def set_status(
+            self,
+            id: int,
+            status: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        self._apply(statuses={id: status})
+
+    def delete(self, id: int, data: list[dict] | None = None) -> None:
+        self.delete_many([id], data)
+
+    def delete_many(
+            self,
+            ids: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        self._apply(deleted=ids)
+
+    def delete_category(
+            self,
+            category: str,
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Удаляет файл шарда категории без чтения задач.'''
+
+        with self._write() as manifest:
+            manifest['shards'].pop(category, None)
+
+    def write_batch(
+            self,
+            created: list[dict],
+            updated: list[dict],
+            deleted: Iterable[int],
+            data: list[dict] | None = None,
+            ) -> None:
+        '''Применяет все изменения под одной блокировкой.'''
+
+        self._apply(created, updated, deleted)
+
+    def close(self) -> None:
+        '''
+        При fsync_policy = 'on_close' сбрасывает на диск записанные
+        шарды, manifest.json и служебный файл.
+        '''
+
+        if self._unsynced and self.fsync_policy == 'on_close':
+            sync_files(*self._unsynced, get_meta_name(self.filename))
+        self._unsynced = set()
+
+    def export_csv(self, csv_filename: str) -> int:
+        '''
+        Записывает все задачи в csv файл.
+
+        Возвращает:
+            количество записанных задач.
+        '''
+
+        rows = self.read_all()
+        with open(csv_filename, 'w', encoding='utf-8', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=FIELD_NAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        return len(rows)
+
+    @classmethod
+    def import_csv(cls, csv_filename: str, filename: str):
+        '''
+        Создает хранилище из csv файла.
+
+        Задачи из существующего хранилища filename удаляются.
+
+        Возвращает:
+            открытое ShardedRepository.
+        '''
+
+        storage = cls(filename)
+        with storage._write() as manifest:
+            manifest['shards'] = {}
+        with open(csv_filename, 'r', encoding='utf-8', newline='') as file:
+            storage.insert_many(csv.DictReader(file))
+        return storage
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in ('import', 'export'):
+        print('Использование: python -m shards import|export '
+              '<откуда> <куда>')
+        sys.exit(1)
+    if sys.argv[1] == 'import':
+        with ShardedRepository.import_csv(
+            sys.argv[2], sys.argv[3]
+        ) as storage:
+            print(f'Импортировано задач: {len(storage.read_all())}')
+    else:
+        with ShardedRepository(sys.argv[2]) as storage:
+            print(f'Выгружено задач: {storage.export_csv(sys.argv[3])}')
@@ -0,0 +1,121 @@
+'''
+Снимок загруженных задач и индексов TaskStore для быстрого запуска.
+
+Снимок хранится в файле <filename>.snapshot рядом с файлом данных
+и состоит из двух частей в формате pickle:
+    метка - версия формата, подпись хранилища (время изменения
+    и размер файлов, см. TaskRepository.get_signature) и хэш начала
+    файла с данными;
+    состояние - задачи в виде списков значений атрибутов Task и
+    содержимое индексов.
+
+Сначала читается только метка, поэтому проверка снимка не зависит
+от его размера. Если метка не совпадает с текущей, то снимок
+не используется.
+
+Снимок - это кэш, который программа записывает сама: не копируйте
+в папку с данными файлы .snapshot из непроверенных источников.
+'''
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+from settings import SNAPSHOT_HEADER_SIZE, SNAPSHOT_SUFFIX
+
+
+VERSION = 1
+
+
+def get_header_hash(filename: str, size: int = SNAPSHOT_HEADER_SIZE) -> str:
+    '''
+    Возвращает хэш первых size байт файла с данными.
+
+    Для папки (см. shards.py) и отсутствующего файла возвращает хэш
+    пустой строки.
+    '''
+
+    digest = hashlib.sha1()
+    if os.path.isfile(filename):
+        with open(filename, 'rb') as file:
+            digest.update(file.read(size))
+    return digest.hexdigest()
+
+
+class Snapshot():
+    '''
+    Файл снимка для указанного файла с данными.
+
+    Атрибуты:
+        filename: путь к файлу с данными.
+        name: путь к файлу снимка.
+
+    Методы:
+        get_tag
+        read_tag
+        load
+        save.
+    '''
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.name = filename + SNAPSHOT_SUFFIX
+
+    def get_tag(self, signature) -> tuple:
+        '''
+        Возвращает метку снимка для текущей версии файла с данными.
+
+        Аргументы:
+            signature: подпись хранилища.
+        '''
+
+        return VERSION, signature, get_header_hash(self.filename)
+
+    def read_tag(self) -> tuple | None:
+        '''
+        Возвращает метку записанного снимка или None, если снимка нет
+        или он поврежден.
+        '''
+
+        try:
+            with open(self.name, 'rb') as file:
+                return pickle.load(file)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def load(self, tag: tuple) -> dict | None:
+        '''
+        Загружает состояние из снимка.
+
+        Возвращает:
+            словарь состояния или None, если снимка нет, он поврежден
+            или его метка не совпадает с tag.
+        '''
+
+        try:
+            with open(self.name, 'rb') as file:
+                if pickle.load(file) != tag:
+                    return None
+                return pickle.load(file)
+        except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+            return None
+
+    def save(self, tag: tuple, state: dict) -> None:
+        '''
+        Записывает снимок через временный файл, поэтому прерванная
+        запись не портит предыдущий снимок.
+        '''
+
+        descriptor, temp_name = tempfile.mkstemp(
+            prefix=os.path.basename(self.name) + '.', suffix='.tmp',
+            dir=os.path.dirname(self.name) or None
+        )
+        try:
+            with open(descriptor, 'wb') as file:
+                pickle.dump(tag, file, pickle.HIGHEST_PROTOCOL)
+                pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self.name)
+        except BaseException:
+            os.remove(temp_name)
+            raise
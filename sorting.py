@@ -1,67 +1,141 @@
-def merge(left: list[dict], right: list[dict]):
+import csv
+import heapq
+import os
+import tempfile
+from datetime import date
+from itertools import islice
+from typing import Iterable, Iterator
+
+from atomic import atomic_open
+from settings import (FIELD_NAMES, FSYNC_POLICY, PRIORITIES, SORT_RUN_MEMORY,
+                      SORT_RUN_SIZE, STATUSES)
+
+
+PRIO_RANK = {prio: rank for rank, prio in enumerate(PRIORITIES)}
+
+STATUS_RANK = {status: rank for rank, status in enumerate(STATUSES)}
+
+MAX_ORDINAL = date.max.toordinal()
+
+OVERDUE_WORDS = ('просроченные', 'overdue')
+
+
+def parse_date(value: str) -> int:
+    '''
+    Переводит дату в формате DD-MM-YYYY в порядковый номер дня.
+
+    Если дата записана неверно, то возвращает число больше
+    любой допустимой даты, чтобы такие задачи оказывались в конце.
+    '''
+
+    try:
+        day, month, year = value.split('-')
+        return date(int(year), int(month), int(day)).toordinal()
+    except (AttributeError, ValueError):
+        return MAX_ORDINAL + 1
+
+
+def format_date(ordinal: int) -> str:
+    '''
+    Переводит порядковый номер дня в дату в формате DD-MM-YYYY.
+    '''
+
+    return date.fromordinal(ordinal).strftime('%d-%m-%Y')
+
+
+def get_deadline_range(
+        query: str,
+        today: int | None = None,
+        ) -> tuple[int | None, int | None]:
     '''
-    Функция для слияния двух сортированных списков задач и
-    формирования общего сортированного списка словарей задач.
+    Разбирает запрос поиска по сроку выполнения.
 
     Аргументы:
-        left(list[dict]), right(list[dict]): подсписки задач
+        query: "просроченные" - срок прошел, число N - срок от сегодня
+        до сегодня + N дней или две даты DD-MM-YYYY через пробел.
+        today: порядковый номер сегодняшнего дня, по умолчанию - сегодня.
 
     Возвращает:
-        list[dict]: сортированный объединенный список словарей задач
-    '''
-
-    if len(left) == 0:
-        return right
-    if len(right) == 0:
-        return left
-    result = []
-    index_left = index_right = 0
-    while len(result) < (len(left) + len(right)):
-        if int(left[index_left].get('id')) <= int(right[index_right].get(
-            'id'
-        )):
-            result.append(left[index_left])
-            index_left += 1
-        else:
-            result.append(right[index_right])
-            index_right += 1
-        if index_right == len(right):
-            result += left[index_left:]
-            break
-        if index_left == len(left):
-            result += right[index_right:]
-            break
-    return result
-
-
-def insertion_sort(data: list[dict], left: int, right: int) -> list[dict]:
-    '''
-    Функция для сортировки заданной части списка вставкой.
+        первый и последний день интервала (порядковые номера или None)
+        для TaskStore.search_dates.
+
+    Вызывает:
+        ValueError: если запрос не удалось разобрать.
+    '''
+
+    today = today or date.today().toordinal()
+    words = query.lower().split()
+    if len(words) == 1 and words[0] in OVERDUE_WORDS:
+        return None, today - 1
+    if len(words) == 1 and words[0].isdigit():
+        return today, today + int(words[0])
+    if len(words) == 2:
+        start, end = (parse_date(word) for word in words)
+        if max(start, end) <= MAX_ORDINAL:
+            return start, end
+    raise ValueError('Введите "просроченные", количество дней '
+                     'или две даты в формате DD-MM-YYYY через пробел')
+
+
+def get_value_key(field: str):
+    '''
+    Возвращает функцию, вычисляющую ключ сортировки по значению поля.
+
+    id сравниваются как числа, date - как даты, prio и status -
+    по порядку значений в PRIORITIES и STATUSES, остальные поля -
+    как строки.
+    '''
+
+    if field == 'id':
+        return int
+    if field == 'date':
+        return parse_date
+    if field == 'prio':
+        return lambda value: PRIO_RANK.get(value, len(PRIO_RANK))
+    if field == 'status':
+        return lambda value: STATUS_RANK.get(value, len(STATUS_RANK))
+    return lambda value: value or ''
+
+
+def get_sort_key(field: str):
+    '''
+    Возвращает функцию, вычисляющую ключ сортировки для поля задачи,
+    см. get_value_key.
+    '''
+
+    get_key = get_value_key(field)
+    return lambda row: get_key(row.get(field))
+
+
+def sort_rows(data: list[dict], keys: list[str] = ('id',)) -> list[dict]:
+    '''
+    Функция для сортировки списка задач по нескольким полям.
+
+    Ключ каждого поля вычисляется один раз для каждой задачи.
+    Сортировка устойчивая: задачи с одинаковыми ключами сохраняют
+    исходный порядок. Словари задач не копируются.
 
     Аргументы:
-        data(list[dict]): cписок словарей задач
-        left, right(int): индексы, в рамках которых необходимо
-        сортировать список
+        data(list[dict]): список словарей задач.
+        keys(list[str]): названия полей в порядке важности. Если название
+        начинается с '-', то сортировка по этому полю идет по убыванию.
 
     Возвращает:
-        list[dict]: отсортированный по id в указанных
-        рамках список словарей задач
+        list[dict]: новый список отсортированных словарей задач.
     '''
 
-    for i in range(left + 1, right + 1):
-        key = data[i]
-        j = i - 1
-        while j >= left and int(data[j].get('id')) > int(key.get('id')):
-            data[j + 1] = data[j]
-            j -= 1
-        data[j + 1] = key
-    return data
+    order = list(range(len(data)))
+    for field in reversed(keys):
+        reverse = field.startswith('-')
+        get_key = get_sort_key(field.lstrip('-'))
+        values = [get_key(row) for row in data]
+        order.sort(key=values.__getitem__, reverse=reverse)
+    return [data[i] for i in order]
 
 
 def sort_tasks(data: list[dict]):
     '''
     Функция, для сортировки списка задач по id в порядке возрастания.
-    Основана на алгоритме TimSort.
 
     Аргументы:
         data(list[dict]): список словарей с данными о всех задачах.
@@ -70,19 +144,134 @@ def sort_tasks(data: list[dict]):
         list[dict]: список отсортированных по id словарей задач
     '''
 
-    min_run = 32
-    n = len(data)
-    for i in range(0, n, min_run):
-        insertion_sort(data, i, min((i + min_run - 1), n - 1))
-    size = min_run
-    while size < n:
-        for start in range(0, n, size * 2):
-            mid = start + size - 1
-            end = min((start + size*2 - 1), (n - 1))
-            merged_data = merge(
-                data[start:mid + 1],
-                data[mid + 1:end + 1]
-            )
-            data[start:start + len(merged_data)] = merged_data
-        size *= 2
+    data.sort(key=get_sort_key('id'))
     return data
+
+
+class Descending():
+    '''
+    Обертка над значением, которая сравнивается в обратном порядке.
+
+    Нужна, чтобы heapq.merge сливал задачи по ключу, в котором
+    одни поля сортируются по возрастанию, а другие - по убыванию.
+    '''
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other) -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other) -> bool:
+        return self.value == other.value
+
+
+def get_merge_key(keys: Iterable[str] = ('id',)):
+    '''
+    Возвращает функцию, вычисляющую составной ключ сортировки задачи,
+    записанной списком значений полей FIELD_NAMES, по полям keys
+    в том же порядке, что и sort_rows.
+    '''
+
+    getters = [
+        (
+            FIELD_NAMES.index(field.lstrip('-')),
+            get_value_key(field.lstrip('-')),
+            field.startswith('-'),
+        )
+        for field in keys
+    ]
+    return lambda values: tuple(
+        Descending(get_key(values[i])) if reverse else get_key(values[i])
+        for i, get_key, reverse in getters
+    )
+
+
+def iter_runs(
+        rows: Iterable[dict],
+        run_size: int = SORT_RUN_SIZE,
+        run_memory: int = SORT_RUN_MEMORY,
+        ) -> Iterator[list[dict]]:
+    '''
+    Делит поток задач на части, каждая из которых помещается в память.
+
+    Часть заканчивается, когда в ней run_size задач или когда длина
+    строк ее задач превысила run_memory символов.
+    '''
+
+    rows = iter(rows)
+    while True:
+        run = []
+        size = 0
+        for row in islice(rows, run_size):
+            run.append(row)
+            size += sum(map(len, filter(None, row.values())))
+            if size >= run_memory:
+                break
+        if not run:
+            return
+        yield run
+
+
+def external_sort(
+        rows: Iterable[dict],
+        target: str,
+        keys: Iterable[str] = ('id',),
+        run_size: int = SORT_RUN_SIZE,
+        run_memory: int = SORT_RUN_MEMORY,
+        fsync: bool = FSYNC_POLICY == 'always',
+        ) -> int:
+    '''
+    Внешняя сортировка задач, которые не помещаются в память.
+
+    Поток задач делится на части (iter_runs), каждая часть сортируется
+    в памяти (sort_rows) и записывается во временный csv файл рядом
+    с target. Затем части сливаются heapq.merge, который держит
+    в памяти по одной задаче из каждой части, и записываются в target
+    атомарно. Все задачи читаются до записи target, поэтому target
+    может быть файлом, из которого они читаются. Сортировка устойчивая.
+
+    Аргументы:
+        rows: задачи, например, pipeline.iter_tasks(filename).
+        target: путь к csv файлу для результата.
+        keys: поля сортировки, как в sort_rows.
+        run_size: наибольшее количество задач в одной части.
+        run_memory: наибольшая длина строк задач одной части.
+        fsync: сбросить ли target на диск перед заменой файла.
+
+    Возвращает:
+        количество записанных задач.
+    '''
+
+    keys = list(keys)
+    count = 0
+    with tempfile.TemporaryDirectory(
+        prefix=os.path.basename(target) + '.',
+        dir=os.path.dirname(target) or None,
+    ) as directory:
+        names = []
+        for run in iter_runs(rows, run_size, run_memory):
+            names.append(os.path.join(directory, f'{len(names)}.csv'))
+            with open(names[-1], 'w', encoding='utf-8', newline='') as file:
+                csv.writer(file).writerows(
+                    [row.get(field) for field in FIELD_NAMES]
+                    for row in sort_rows(run, keys)
+                )
+            count += len(run)
+        files = [
+            open(name, 'r', encoding='utf-8', newline='') for name in names
+        ]
+        try:
+            readers = [csv.reader(file) for file in files]
+            with atomic_open(target, fsync) as file:
+                writer = csv.writer(file)
+                writer.writerow(FIELD_NAMES)
+                writer.writerows(
+                    heapq.merge(*readers, key=get_merge_key(keys))
+                )
+        finally:
+            for file in files:
+                file.close()
+    return count
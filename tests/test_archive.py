@@ -0,0 +1,74 @@
+import pytest
+
+from .. import archive, main
+from ..sorting import parse_date
+from .test_store import OLD_DATA, read_file, write_base
+
+
+DONE = 'выполнено'
+
+TODAY = parse_date('01-03-2025')
+
+
+def make_store(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, [
+        dict(OLD_DATA[0], status=DONE),
+        OLD_DATA[1],
+        dict(OLD_DATA[1], id='3', date='25-02-2025', status=DONE),
+    ])
+    return main.TaskStore(filename), filename
+
+
+def test_archive_moves_old_completed_tasks(tmp_path):
+    store, filename = make_store(tmp_path)
+    error_msg = 'Проверьте, что в архив переносятся старые выполненные задачи'
+    assert store.archive(days=30, today=TODAY) == 1, error_msg
+    assert [row['id'] for row in read_file(filename)] == ['2', '3'], (
+        error_msg
+    )
+    assert 1 not in store, error_msg
+    assert store.archive(days=30, today=TODAY) == 0, error_msg
+    error_msg = 'Проверьте, что новый запуск не загружает архив'
+    reopened = main.TaskStore(filename)
+    assert sorted(reopened.tasks) == [2, 3], error_msg
+    assert reopened.archived._signature is None, error_msg
+
+
+def test_archive_keeps_ids(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, [OLD_DATA[0], dict(OLD_DATA[1], status=DONE)])
+    main.TaskStore(filename).archive(days=30, today=TODAY)
+    reopened = main.TaskStore(filename)
+    error_msg = 'Проверьте, что id задач из архива не выдаются снова'
+    assert reopened.next_id() == 3, error_msg
+
+
+def test_search_includes_archive(tmp_path):
+    store, _ = make_store(tmp_path)
+    store.archive(days=30, today=TODAY)
+    error_msg = 'Проверьте, что поиск выполненных задач включает архив'
+    assert [row['id'] for row in store.search({'status': DONE})] == [
+        '1', '3'
+    ], error_msg
+    error_msg = 'Проверьте, что остальной поиск включает архив по запросу'
+    assert [row['id'] for row in store.search({'keyword': 'test'})] == [
+        '2', '3'
+    ], error_msg
+    assert [
+        row['id'] for row in store.search({'category': 'test_cat1'}, True)
+    ] == ['1'], error_msg
+    assert store.search({'status': DONE}, False)[0]['id'] == '3', error_msg
+
+
+@pytest.mark.parametrize('compression', ['gzip', 'lzma'])
+def test_archive_appends_streams(tmp_path, compression):
+    storage = archive.Archive(str(tmp_path / 'data.csv'), compression)
+    storage.append(OLD_DATA[:1])
+    storage.append([OLD_DATA[1], dict(OLD_DATA[0], title='new')])
+    error_msg = 'Проверьте, что архив читает все дописанные части'
+    assert storage.read() == [dict(OLD_DATA[0], title='new'), OLD_DATA[1]], (
+        error_msg
+    )
+    with pytest.raises(ValueError):
+        archive.Archive(str(tmp_path / 'data.csv'), 'zip')
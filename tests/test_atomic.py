@@ -0,0 +1,61 @@
+import os
+
+import pytest
+
+from .. import atomic, repository
+from .test_store import OLD_DATA, read_file, write_base
+
+
+def test_atomic_open_replaces_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    os.chmod(filename, 0o640)
+    with atomic.atomic_open(filename) as file:
+        file.write('new')
+    error_msg = 'Проверьте, что файл заменяется новым содержимым'
+    with open(filename, encoding='utf-8') as file:
+        assert file.read() == 'new', error_msg
+    error_msg = 'Проверьте, что права доступа к файлу сохраняются'
+    assert os.stat(filename).st_mode & 0o777 == 0o640, error_msg
+    assert os.listdir(tmp_path) == ['data.csv']
+
+
+def test_interrupted_rewrite_keeps_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+
+    def rows():
+        yield OLD_DATA[0]
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        repository.CsvRepository(filename, use_log=False).rewrite(rows())
+    error_msg = 'Проверьте, что прерванная запись не портит файл с данными'
+    assert read_file(filename) == OLD_DATA, error_msg
+    error_msg = 'Проверьте, что временный файл удаляется'
+    assert os.listdir(tmp_path) == ['data.csv'], error_msg
+
+
+@pytest.mark.parametrize('policy, during, after', [
+    ('always', True, True),
+    ('on_close', False, True),
+    ('never', False, False),
+])
+def test_fsync_policy(tmp_path, monkeypatch, policy, during, after):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    calls = []
+    monkeypatch.setattr(os, 'fsync', calls.append)
+    repo = repository.CsvRepository(filename, False, policy)
+    repo.delete(1)
+    error_msg = f'Проверьте, когда выполняется fsync при политике {policy}'
+    assert bool(calls) == during, error_msg
+    repo.close()
+    assert bool(calls) == after, error_msg
+    assert read_file(filename) == OLD_DATA[1:]
+
+
+def test_unknown_fsync_policy(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    with pytest.raises(ValueError):
+        repository.CsvRepository(filename, False, 'sometimes')
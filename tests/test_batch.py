@@ -0,0 +1,104 @@
+import json
+from unittest import mock
+
+import pytest
+
+from .. import batch, main
+from .test_store import OLD_DATA, read_file, write_base
+
+
+def to_lines(*operations):
+    return [json.dumps(operation, ensure_ascii=False) + '\n'
+            for operation in operations]
+
+
+NEW_TASK = {
+    'op': 'create',
+    'title': 'new',
+    'description': 'new_desc',
+    'category': 'test_cat3',
+    'date': '03-12-2024',
+    'prio': 'высокий',
+}
+
+
+@pytest.mark.parametrize('operation, message', [
+    (dict(NEW_TASK, title=''), 'У задания должно быть название!'),
+    (dict(NEW_TASK, date='31-02-2024'), 'Срок выполнения указан неверно!'),
+    (
+        dict(NEW_TASK, prio='срочный'),
+        'Приоритет может быть низким средним или высоким!',
+    ),
+    ({'op': 'update', 'id': 1}, 'не указаны поля для изменения'),
+    (
+        {'op': 'update', 'id': 1, 'status': 'выполнено'},
+        'поле "status" нельзя изменить',
+    ),
+    ({'op': 'complete', 'id': 'один'}, 'id должно быть целым числом!'),
+    ({'op': 'rename', 'id': 1}, 'неизвестная операция "rename"'),
+])
+def test_invalid_operations(operation, message):
+    error_msg = 'Проверьте, что операции проверяются как в главном меню'
+    with pytest.raises(ValueError) as error:
+        batch.parse_operation(json.dumps(operation))
+    assert str(error.value) == message, error_msg
+
+
+@pytest.mark.parametrize('use_log', [False, True])
+def test_run_batch(tmp_path, use_log):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename, main.TaskManager(use_log=use_log))
+    lines = to_lines(
+        NEW_TASK,
+        {'op': 'update', 'id': 1, 'title': 'new_title', 'prio': 'средний'},
+        {'op': 'complete', 'id': 3},
+        {'op': 'delete', 'id': 2},
+        {'op': 'complete', 'id': 2},
+        dict(NEW_TASK, title='temp'),
+        {'op': 'delete', 'id': 4},
+    ) + ['не json\n', '\n']
+    with mock.patch.object(
+        main.CsvRepository, 'write_batch', autospec=True,
+        side_effect=main.CsvRepository.write_batch
+    ) as write_batch:
+        result = batch.run_batch(store, lines)
+    error_msg = 'Проверьте, что все операции записываются одной записью'
+    assert write_batch.call_count == 1, error_msg
+    error_msg = 'Проверьте, что неверные операции попадают в отчет'
+    assert result.applied == 6, error_msg
+    assert result.errors == [
+        'Строка 5: Задачи с таким id не существует',
+        'Строка 8: строка не является объектом JSON',
+    ], error_msg
+    expected = [
+        dict(OLD_DATA[0], title='new_title', prio='средний'),
+        {
+            'id': '3', 'title': 'new', 'description': 'new_desc',
+            'category': 'test_cat3', 'date': '03-12-2024',
+            'prio': 'высокий', 'status': 'выполнено',
+        },
+    ]
+    error_msg = 'Проверьте, что изменения записываются в файл и в хранилище'
+    assert main.TaskManager(use_log=use_log).read_all(filename) == expected, (
+        error_msg
+    )
+    assert store.get_data() == expected, error_msg
+    if not use_log:
+        assert read_file(filename) == expected, error_msg
+
+
+def test_batch_delete_category(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    result = batch.run_batch(store, to_lines(
+        dict(NEW_TASK, category='test_cat1'),
+        {'op': 'delete', 'category': 'test_cat1'},
+        {'op': 'delete', 'category': 'test_cat1'},
+    ))
+    error_msg = 'Проверьте удаление категории в пакетном режиме'
+    assert result.errors == ['Строка 3: Задач с такой категорией нет'], (
+        error_msg
+    )
+    assert read_file(filename) == OLD_DATA[1:], error_msg
@@ -0,0 +1,99 @@
+import csv
+
+import pytest
+
+from .. import binstore, main
+from .test_store import OLD_DATA, write_base
+
+
+def test_binary_storage(tmp_path):
+    filename = str(tmp_path / 'data.tasks')
+    with binstore.BinaryStorage(filename) as storage:
+        for row in OLD_DATA:
+            storage.insert(row)
+        error_msg = 'Проверьте, что задача находится по id'
+        assert storage.get(2) == OLD_DATA[1], error_msg
+        assert storage.get(5) is None, error_msg
+        with pytest.raises(ValueError):
+            storage.insert(OLD_DATA[0])
+        storage.set_status(1, 'выполнено')
+        storage.update(dict(OLD_DATA[1], title='Новое название', date='bad'))
+    with binstore.BinaryStorage(filename) as storage:
+        error_msg = 'Проверьте, что изменения сохраняются в файл'
+        assert storage.get(1)['status'] == 'выполнено', error_msg
+        assert storage.get(2)['title'] == 'Новое название', error_msg
+        assert storage.get(2)['date'] == 'bad', error_msg
+        storage.delete(1)
+        assert [row['id'] for row in storage] == ['2'], error_msg
+        assert storage.delete_category('test_cat2') == 1, error_msg
+        assert storage.read_all() == [], error_msg
+
+
+def test_binary_storage_sees_other_writers(tmp_path):
+    filename = str(tmp_path / 'data.tasks')
+    first = binstore.BinaryStorage(filename)
+    second = binstore.BinaryStorage(filename)
+    first.insert(OLD_DATA[0])
+    error_msg = 'Проверьте, что добавленные другим процессом задачи видны'
+    assert second.get(1) == OLD_DATA[0], error_msg
+    second.delete(1)
+    assert first.get(1) is None, error_msg
+    first.close()
+    second.close()
+
+
+def test_changes_are_locked(tmp_path):
+    filename = str(tmp_path / 'data.tasks')
+    with binstore.BinaryStorage(filename) as storage:
+        storage.insert_many(OLD_DATA)
+        depths = []
+        write_string = storage._write_string
+
+        def locked_write(value):
+            depths.append(storage.lock._depth)
+            return write_string(value)
+        storage._write_string = locked_write
+        storage.update(dict(OLD_DATA[0], title='new_title'))
+        error_msg = 'Проверьте, что строки дописываются под блокировкой'
+        assert depths and 0 not in depths, error_msg
+        error_msg = 'Проверьте, что изменения снимают блокировку'
+        storage.set_status(1, 'выполнено')
+        storage.delete(1)
+        storage.delete_category('test_cat2')
+        assert storage.lock._depth == 0, error_msg
+
+
+def test_import_export(tmp_path):
+    csv_filename = str(tmp_path / 'data.csv')
+    write_base(csv_filename)
+    filename = str(tmp_path / 'data.tasks')
+    with binstore.BinaryStorage.import_csv(csv_filename, filename) as storage:
+        error_msg = 'Проверьте, что импорт из csv переносит все задачи'
+        assert storage.read_all() == OLD_DATA, error_msg
+        export = str(tmp_path / 'export.csv')
+        storage.export_csv(export)
+    with open(export, 'r', encoding='utf-8', newline='') as f:
+        reader = list(csv.DictReader(f))
+    error_msg = 'Проверьте, что экспорт в csv сохраняет все задачи'
+    assert reader == OLD_DATA, error_msg
+
+
+def test_store_with_binary_backend(tmp_path):
+    filename = str(tmp_path / 'data.tasks')
+    main.check_file(filename, 'binary')
+    store = main.TaskStore(filename, main.TaskManager(backend='binary'))
+    for row in OLD_DATA:
+        store.create(list(row.values())[:-1])
+    store.set_status(store.get(1), 'выполнено')
+    store.update(dict(store.get(2), title='new_title'))
+    store.delete({'category': 'test_cat1'})
+    error_msg = 'Проверьте, что TaskStore работает с двоичным хранилищем'
+    reopened = main.TaskStore(filename, main.TaskManager(backend='binary'))
+    assert reopened.get_data() == store.get_data(), error_msg
+    assert [row['title'] for row in store.get_data()] == [
+        'new_title'
+    ], error_msg
+    wrong_file = str(tmp_path / 'wrong.tasks')
+    write_base(wrong_file)
+    with pytest.raises(main.FileError):
+        main.check_file(wrong_file, 'binary')
@@ -0,0 +1,94 @@
+import os
+import threading
+
+from .. import idindex, main
+from .test_snapshot import make_store
+from .test_store import OLD_DATA, write_base
+
+
+NEW_TASK = dict(OLD_DATA[1], id='3', description='строка 1\nстрока "2"')
+
+
+def test_index_lookup(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, [NEW_TASK] + OLD_DATA)
+    index = idindex.IdIndex(filename)
+    error_msg = 'Проверьте, что задача находится по индексу id'
+    assert index.get(3) == NEW_TASK, error_msg
+    assert index.get(1) == OLD_DATA[0], error_msg
+    assert index.get(4) is None, error_msg
+    error_msg = 'Проверьте, что индекс отсортирован по id'
+    assert os.path.getsize(index.name) == (
+        idindex.HEADER.size + 3 * idindex.RECORD.size
+    ), error_msg
+    write_base(filename, OLD_DATA[:1])
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    error_msg = 'Проверьте, что устаревший индекс строится заново'
+    assert index.is_valid() is False, error_msg
+    assert index.get(3) is None, error_msg
+    assert index.get(1) == OLD_DATA[0], error_msg
+
+
+def test_repository_keeps_index(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    manager = main.TaskManager(use_log=False)
+    repository = manager.get_repository(filename)
+    error_msg = 'Проверьте, что TaskManager находит задачу без чтения файла'
+    assert manager.get_task(filename, 1) == OLD_DATA[0], error_msg
+    builds = []
+    build = repository.index.build
+    repository.index.build = lambda: builds.append(1) or build()
+    manager.create_new_task(
+        [3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'],
+        filename,
+    )
+    error_msg = 'Проверьте, что новые задачи дописываются в индекс'
+    assert builds == [], error_msg
+    assert repository.index.is_valid(), error_msg
+    assert manager.get_task(filename, 3)['title'] == 'new', error_msg
+    repository.update(dict(OLD_DATA[0], title='new_title'))
+    repository.delete(2)
+    error_msg = 'Проверьте, что индекс обновляется при перезаписи файла'
+    assert repository.index.is_valid(), error_msg
+    assert manager.get_task(filename, 1)['title'] == 'new_title', error_msg
+    assert type(manager.get_task(filename, 2)) is str, error_msg
+
+
+def test_index_with_journal(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    manager = main.TaskManager(use_log=True)
+    repository = manager.get_repository(filename)
+    repository.set_status(1, 'выполнено')
+    repository.insert(NEW_TASK)
+    repository.delete(2)
+    error_msg = 'Проверьте, что поиск по id учитывает журнал'
+    assert manager.get_task(filename, 1)['status'] == 'выполнено', error_msg
+    assert manager.get_task(filename, 3) == NEW_TASK, error_msg
+    assert type(manager.get_task(filename, 2)) is str, error_msg
+
+
+def test_store_uses_index_while_loading(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    make_store(filename).save_indexes()
+    release = threading.Event()
+    load = main.Snapshot.load
+
+    def blocked(self, tag):
+        release.wait(5)
+        return load(self, tag)
+    monkeypatch.setattr(main.Snapshot, 'load', blocked)
+    reads = []
+    store = make_store(filename, reads)
+    error_msg = 'Проверьте, что до загрузки снимка id ищется по индексу'
+    assert store.get(2) == OLD_DATA[1], error_msg
+    assert type(store.get(3)) is str, error_msg
+    assert store._loader.is_alive(), error_msg
+    assert os.path.isfile(idindex.IdIndex(filename).name), error_msg
+    release.set()
+    error_msg = 'Проверьте, что после загрузки снимка задачи берутся из памяти'
+    assert store.tasks[2] is store.get(2), error_msg
+    assert reads == [], error_msg
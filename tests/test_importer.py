@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from .. import importer, main
+from .test_store import OLD_DATA, read_file, write_base
+
+
+ROW = {
+    'title': ' new ',
+    'description': 'new_desc',
+    'category': 'test_cat3',
+    'date': '3-12-2024',
+    'prio': 'Высокий',
+}
+
+
+def test_normalize_row():
+    error_msg = 'Проверьте, что импортируемые задачи приводятся к общему виду'
+    assert importer.normalize_row(json.dumps(ROW)) == {
+        'title': 'new',
+        'description': 'new_desc',
+        'category': 'test_cat3',
+        'date': '03-12-2024',
+        'prio': 'высокий',
+        'status': 'не выполнено',
+    }, error_msg
+    for row in (dict(ROW, title='  '), dict(ROW, date='31-02-2024'),
+                dict(ROW, prio='срочный'), dict(ROW, status='готово'),
+                '[1, 2]', '{'):
+        with pytest.raises(ValueError):
+            importer.normalize_row(row)
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+def test_import_jsonl(tmp_path, workers):
+    filename = str(tmp_path / 'data.csv')
+    source = str(tmp_path / 'tasks.jsonl')
+    write_base(filename)
+    rows = [dict(ROW, title=f'title {i}') for i in range(7)]
+    rows[3]['date'] = 'завтра'
+    with open(source, 'w', encoding='utf-8') as file:
+        for row in rows:
+            file.write(json.dumps(row, ensure_ascii=False) + '\n')
+        file.write('\nне json\n')
+        file.write(json.dumps(dict(ROW, prio=1)) + '\n')
+        file.write(json.dumps(dict(ROW, status=True)) + '\n')
+    result = importer.import_file(
+        source, filename, workers=workers, chunk_size=2
+    )
+    error_msg = 'Проверьте, что отклоненные строки выводятся с причинами'
+    assert result.rejected == [
+        (4, 'Срок выполнения указан неверно!'),
+        (9, 'строка не является объектом JSON'),
+        (10, 'Приоритет может быть низким средним или высоким!'),
+        (11, 'Статус может быть "выполнено" или "не выполнено"!'),
+    ], error_msg
+    error_msg = ('Проверьте, что задачи записываются по порядку ',
+                 'с id после наибольшего')
+    data = read_file(filename)
+    assert [row['id'] for row in data] == [str(i) for i in range(1, 9)], (
+        error_msg
+    )
+    assert [row['title'] for row in data[2:]] == [
+        f'title {i}' for i in (0, 1, 2, 4, 5, 6)
+    ], error_msg
+    assert result.read == 10 and result.accepted == 6, error_msg
+    error_msg = 'Проверьте, что новые id не выдаются повторно'
+    assert main.TaskStore(filename).next_id() == 9, error_msg
+
+
+def test_import_csv(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    source = str(tmp_path / 'tasks.csv')
+    write_base(filename, [])
+    write_base(source, [dict(OLD_DATA[0], id='40'), dict(OLD_DATA[1], id='')])
+    result = importer.import_file(source, filename, workers=0)
+    error_msg = 'Проверьте импорт из csv файла'
+    assert result.rejected == [], error_msg
+    assert read_file(filename) == OLD_DATA, error_msg
@@ -0,0 +1,164 @@
+import pytest
+
+from .. import indexes, main, sorting
+from .test_store import OLD_DATA, write_base
+
+
+def test_field_index():
+    index = indexes.FieldIndex('category')
+    for row in OLD_DATA:
+        index.add(row)
+    error_msg = 'Проверьте, что индекс возвращает id задач с нужным значением'
+    assert index.get('test_cat1') == {1}, error_msg
+    assert index.get('empty') == set(), error_msg
+    index.remove(OLD_DATA[0])
+    error_msg = 'Проверьте, что пустые значения удаляются из индекса'
+    assert 'test_cat1' not in index, error_msg
+
+
+def test_store_search(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    error_msg = 'Проверьте, что поиск по категории использует индекс'
+    assert store.search({'category': 'test_cat2'}) == [OLD_DATA[1]], error_msg
+    assert store.search({'category': 'empty'}) == [
+        'Такой задачи не существует'
+    ], error_msg
+    store.set_status(store.get(2), 'выполнено')
+    error_msg = 'Проверьте, что индекс статуса обновляется при изменении'
+    found = store.search({'status': 'выполнено'})
+    assert [row['id'] for row in found] == ['2'], error_msg
+    found = store.search({'status': 'не выполнено'})
+    assert [row['id'] for row in found] == ['1'], error_msg
+    error_msg = 'Проверьте, что поиск по приоритету работает'
+    assert len(store.search({'prio': 'низкий'})) == 2, error_msg
+
+
+def test_store_delete_category_updates_indexes(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    store.delete({'category': 'test_cat1'})
+    error_msg = 'Проверьте, что удаление категории обновляет индексы'
+    assert not store.has_value('category', 'test_cat1'), error_msg
+    assert store.search({'prio': 'низкий'}) == [OLD_DATA[1]], error_msg
+    error_msg = 'Проверьте, что поиск по ключевым словам работает в хранилище'
+    assert store.search({'keyword': 'test'}) == [OLD_DATA[1]], error_msg
+
+
+def test_text_index():
+    index = indexes.TextIndex()
+    index.add({'id': '1', 'title': 'Купить молоко', 'description': 'Утром',
+               'category': 'дом'})
+    index.add({'id': '2', 'title': 'Купить билеты', 'description': 'В кино',
+               'category': 'отдых'})
+    error_msg = 'Проверьте, что поиск по словам не зависит от регистра'
+    assert index.search('купить') == {1, 2}, error_msg
+    error_msg = 'Проверьте, что поиск по нескольким словам работает как "и"'
+    assert index.search('купить молоко') == {1}, error_msg
+    error_msg = 'Проверьте, что слово "или" включает поиск любого из слов'
+    assert index.search('молоко или кино') == {1, 2}, error_msg
+    error_msg = 'Проверьте, что поиск по началу слова работает'
+    assert index.search('бил') == {2}, error_msg
+    assert index.search('бил', prefix=False) == set(), error_msg
+    index.remove({'id': '2', 'title': 'Купить билеты',
+                  'description': 'В кино', 'category': 'отдых'})
+    error_msg = 'Проверьте, что удаленная задача не находится'
+    assert index.search('бил') == set(), error_msg
+
+
+def test_text_index_is_saved(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    store.create([3, 'Новая', 'задача', 'test_cat1', '03-12-2024', 'высокий'])
+    store.save_indexes()
+    loaded = indexes.TextIndex.load(
+        store.get_text_index_name(), store._get_signature()
+    )
+    error_msg = 'Проверьте, что индекс загружается из файла'
+    assert loaded is not None, error_msg
+    assert loaded.search('новая') == {3}, error_msg
+    error_msg = 'Проверьте, что поиск по ключевым словам находит новую задачу'
+    found = main.TaskStore(filename).search({'keyword': 'нов'})
+    assert [row['id'] for row in found] == ['3'], error_msg
+    error_msg = 'Проверьте, что устаревший индекс не загружается'
+    assert indexes.TextIndex.load(
+        store.get_text_index_name(), 'other'
+    ) is None, error_msg
+
+
+def make_dated_rows():
+    return [
+        dict(OLD_DATA[0], id=str(id), date=date, status=status)
+        for id, date, status in (
+            (1, '10-01-2024', 'не выполнено'),
+            (2, '01-01-2024', 'выполнено'),
+            (3, '05-01-2024', 'не выполнено'),
+            (4, '05-01-2024', 'выполнено'),
+            (5, 'завтра', 'не выполнено'),
+        )
+    ]
+
+
+def test_date_index():
+    rows = make_dated_rows()
+    index = indexes.DateIndex.from_rows(rows)
+    start = sorting.parse_date('02-01-2024')
+    end = sorting.parse_date('10-01-2024')
+    error_msg = 'Проверьте, что индекс сроков находит задачи в интервале'
+    assert index.search(start, end) == [3, 4, 1], error_msg
+    assert index.search(end=start) == [2], error_msg
+    assert index.search(start, status='выполнено') == [4], error_msg
+    error_msg = 'Проверьте, что задачи с неверной датой не попадают в индекс'
+    assert 5 not in index.search(), error_msg
+    index.remove(rows[2])
+    index.add(dict(rows[2], date='03-01-2024'))
+    error_msg = 'Проверьте, что индекс сроков обновляется'
+    assert index.search(start, end) == [3, 4, 1], error_msg
+    assert index.search(start, start + 1) == [3], error_msg
+
+
+def test_get_deadline_range():
+    today = sorting.parse_date('10-01-2024')
+    error_msg = 'Проверьте, что запрос поиска по сроку разбирается'
+    assert sorting.get_deadline_range('просроченные', today) == (
+        None, today - 1
+    ), error_msg
+    assert sorting.get_deadline_range('7', today) == (
+        today, today + 7
+    ), error_msg
+    assert sorting.get_deadline_range('01-01-2024 10-01-2024', today) == (
+        today - 9, today
+    ), error_msg
+    for query in ('', 'скоро', '01-01-2024', '31-02-2024 01-03-2024'):
+        error_msg = f'Проверьте, что запрос "{query}" отклоняется с подсказкой'
+        with pytest.raises(ValueError) as error:
+            sorting.get_deadline_range(query, today)
+        assert str(error.value) == (
+            'Введите "просроченные", количество дней или две даты '
+            'в формате DD-MM-YYYY через пробел'
+        ), error_msg
+
+
+def test_store_search_dates(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, make_dated_rows())
+    store = main.TaskStore(filename)
+    today = sorting.parse_date('06-01-2024')
+    start, end = sorting.get_deadline_range('просроченные', today)
+    error_msg = 'Проверьте, что хранилище находит просроченные задачи'
+    found = store.search_dates(start, end, 'не выполнено')
+    assert [row['id'] for row in found] == ['3'], error_msg
+    store.set_status(store.get(3), 'выполнено')
+    store.update(dict(store.get(1), date='02-01-2024'))
+    error_msg = 'Проверьте, что индекс сроков обновляется при изменении'
+    found = store.search_dates(start, end, 'не выполнено')
+    assert [row['id'] for row in found] == ['1'], error_msg
+    found = store.search_dates(start, end)
+    assert [row['id'] for row in found] == ['2', '1', '3', '4'], error_msg
+    store.delete({'id': 1})
+    assert store.search_dates(start, end, 'не выполнено') == [
+        'Такой задачи не существует'
+    ], error_msg
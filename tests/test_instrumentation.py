@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from .. import main
+from .test_store import OLD_DATA, write_base
+
+
+@pytest.fixture
+def metrics():
+    metrics = main.metrics
+    metrics.enable('table')
+    yield metrics
+    metrics.enabled = False
+    metrics.operations = {}
+
+
+def test_operations_are_measured(tmp_path, metrics):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    store.search({'category': 'test_cat1'})
+    store.create([3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'])
+    stats = metrics.operations
+    error_msg = 'Проверьте, что вызовы операций подсчитываются'
+    assert stats['TaskStore.search'].calls == 1, error_msg
+    assert stats['TaskStore.create'].calls == 1, error_msg
+    assert stats['TaskManager.create_new_task'].calls == 1, error_msg
+    error_msg = 'Проверьте, что подсчитываются просмотренные задачи'
+    assert stats['TaskStore.search'].scanned == 1, error_msg
+    assert stats['TaskStore.search'].returned == 1, error_msg
+    error_msg = 'Проверьте, что подсчитываются открытые файлы'
+    assert stats['TaskStore.create'].opens > 0, error_msg
+    assert stats['TaskStore.search'].opens == 0, error_msg
+    error_msg = 'Проверьте, что время попадает в гистограмму'
+    assert sum(stats['TaskStore.create'].histogram) == 1, error_msg
+
+
+def test_search_params_counts_rows(metrics):
+    main.TaskManager().search_params(OLD_DATA, {'category': 'test_cat2'})
+    stats = metrics.operations['TaskManager.search_params']
+    error_msg = 'Проверьте, что поиск подсчитывает просмотренные задачи'
+    assert (stats.scanned, stats.returned) == (2, 1), error_msg
+
+
+def test_disabled_metrics(tmp_path, metrics):
+    metrics.enabled = False
+    main.TaskManager().search_params(OLD_DATA, {'category': 'test_cat2'})
+    error_msg = 'Проверьте, что выключенные замеры ничего не собирают'
+    assert metrics.operations == {}, error_msg
+
+
+def test_dump_to_json(tmp_path, metrics):
+    main.TaskManager().search_params(OLD_DATA, {'category': 'test_cat2'})
+    output = str(tmp_path / 'metrics.json')
+    metrics.dump(output)
+    with open(output, 'r', encoding='utf-8') as file:
+        result = json.load(file)
+    error_msg = 'Проверьте, что замеры записываются в JSON файл'
+    assert result['TaskManager.search_params']['calls'] == 1, error_msg
+    assert result['TaskManager.search_params']['scanned'] == 2, error_msg
+
+
+def test_profile_call(capsys):
+    result = main.profile_call(sorted, [3, 1, 2])
+    error_msg = 'Проверьте, что profile_call возвращает результат функции'
+    assert result == [1, 2, 3], error_msg
+    error_msg = 'Проверьте, что profile_call выводит статистику cProfile'
+    assert 'function calls' in capsys.readouterr().out, error_msg
@@ -0,0 +1,119 @@
+import csv
+import os
+
+from .. import journal, main
+from ..settings import FIELD_NAMES
+
+
+OLD_DATA = [
+    {
+        'id': '1',
+        'title': 'test_title',
+        'description': 'test_desc',
+        'category': 'test_cat1',
+        'date': '02-12-2024',
+        'prio': 'низкий',
+        'status': 'не выполнено'
+    },
+    {
+        'id': '2',
+        'title': 'test_title',
+        'description': 'test_desc',
+        'category': 'test_cat2',
+        'date': '02-12-2024',
+        'prio': 'низкий',
+        'status': 'не выполнено'
+    }
+]
+
+
+def write_base(filename):
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, FIELD_NAMES)
+        writer.writeheader()
+        for row in OLD_DATA:
+            writer.writerow(row)
+    return os.path.getsize(filename)
+
+
+def test_log_mode_does_not_rewrite_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    size = write_base(filename)
+    manager = main.TaskManager(use_log=True)
+    data = manager.read_all(filename)
+    manager.create_new_task(
+        [3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'], filename
+    )
+    task = dict(data[0], title='new_title')
+    manager.update_tasks(data, task, filename)
+    manager.set_status(data, data[1], 'выполнено', filename)
+    error_msg = 'Проверьте, что в режиме журнала основной файл не изменяется'
+    assert os.path.getsize(filename) == size, error_msg
+    data = manager.read_all(filename)
+    error_msg = 'Проверьте, что при чтении применяются записи журнала'
+    assert [row['id'] for row in data] == ['1', '2', '3'], error_msg
+    assert data[0]['title'] == 'new_title', error_msg
+    assert data[1]['status'] == 'выполнено', error_msg
+
+
+def test_log_delete(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    manager = main.TaskManager(use_log=True)
+    data = manager.read_all(filename)
+    manager.delete_tasks(data, {'id': 1}, filename)
+    assert [row['id'] for row in manager.read_all(filename)] == ['2']
+    manager.delete_tasks(data, {'category': 'test_cat2'}, filename)
+    error_msg = 'Проверьте, что удаление категории записывается в журнал'
+    assert manager.read_all(filename) == [], error_msg
+
+
+def test_compact(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    manager = main.TaskManager(use_log=True)
+    manager.delete_tasks(manager.read_all(filename), {'id': 2}, filename)
+    journal.compact(filename)
+    error_msg = 'Проверьте, что после сворачивания журнал удаляется'
+    assert not os.path.isfile(journal.get_log_name(filename)), error_msg
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        reader = list(csv.DictReader(f))
+    error_msg = 'Проверьте, что журнал сворачивается в основной файл'
+    assert reader == OLD_DATA[:1], error_msg
+
+
+def test_compact_if_needed(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    journal.append_record(filename, 'delete', {'id': 1})
+    assert not journal.compact_if_needed(filename)
+    assert journal.compact_if_needed(filename, max_size=0)
+    assert not os.path.isfile(journal.get_log_name(filename))
+
+
+def test_write_without_log_folds_old_log(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    journal.append_record(filename, 'delete', {'id': 2})
+    manager = main.TaskManager(use_log=False)
+    manager.create_new_task(
+        [2, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'], filename
+    )
+    data = manager.read_all(filename)
+    error_msg = ('Проверьте, что старый журнал сворачивается перед ',
+                 'записью без журнала')
+    assert [row['title'] for row in data] == ['test_title', 'new'], error_msg
+
+
+def test_replay_after_interrupted_compact(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    journal.append_record(filename, 'create', dict(OLD_DATA[1], id='2'))
+    journal.append_record(filename, 'status', {'id': 2, 'status': 'выполнено'})
+    error_msg = ('Проверьте, что повторное применение журнала ',
+                 'не создает копий задач')
+    expected = [OLD_DATA[0], dict(OLD_DATA[1], status='выполнено')]
+    assert main.TaskManager().read_all(filename) == expected, error_msg
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        rows = list(journal.iter_replay(csv.DictReader(f), filename))
+    assert rows == expected, error_msg
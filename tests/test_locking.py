@@ -0,0 +1,172 @@
+import multiprocessing
+
+import pytest
+
+from .. import binstore, locking, main, repository
+from .test_store import OLD_DATA, read_file, write_base
+
+
+def test_lock_is_reentrant(tmp_path):
+    lock = locking.FileLock(str(tmp_path / 'data.csv'))
+    with lock.exclusive():
+        with lock.shared():
+            pass
+        error_msg = 'Проверьте, что вложенный захват не снимает блокировку'
+        assert lock._depth == 1, error_msg
+    with lock.shared():
+        with pytest.raises(RuntimeError):
+            with lock.exclusive():
+                pass
+
+
+def test_stale_writer_keeps_other_changes(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    first = repository.CsvRepository(filename, use_log=False)
+    second = repository.CsvRepository(filename, use_log=False)
+    data = first.read_all()
+    second.set_status(2, 'выполнено', second.read_all())
+    first.update(dict(OLD_DATA[0], title='new_title'), data)
+    error_msg = ('Проверьте, что запись по устаревшим данным не теряет ',
+                 'изменения другого процесса')
+    assert first.stale, error_msg
+    assert read_file(filename) == [
+        dict(OLD_DATA[0], title='new_title'),
+        dict(OLD_DATA[1], status='выполнено'),
+    ], error_msg
+    first.delete(1, first.read_all())
+    error_msg = 'Проверьте, что свежие данные не перечитываются'
+    assert not first.stale, error_msg
+
+
+def test_stale_store_is_reloaded(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    first = main.TaskStore(filename)
+    second = main.TaskStore(filename)
+    # Первое хранилище пишет между refresh и записью второго.
+    second.refresh = lambda: False
+    first.create([3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'низкий'])
+    second.set_status(second.get(1), 'выполнено')
+    del second.refresh
+    error_msg = 'Проверьте, что хранилище подхватывает изменения других'
+    assert second.refresh(), error_msg
+    assert [row['id'] for row in second.get_data()] == ['1', '2', '3'], (
+        error_msg
+    )
+    assert second.get(1)['status'] == 'выполнено', error_msg
+
+
+@pytest.mark.parametrize('backend, name', [
+    ('binary', 'data.tasks'),
+    ('sqlite', 'data.db'),
+])
+def test_stale_store_is_reloaded_backends(tmp_path, backend, name):
+    filename = str(tmp_path / name)
+    main.check_file(filename, backend)
+    first = main.TaskStore(filename, main.TaskManager(backend=backend))
+    first.create([1, 'title', 'desc', 'test_cat1', '03-12-2024', 'низкий'])
+    second = main.TaskStore(filename, main.TaskManager(backend=backend))
+    # Первое хранилище пишет между refresh и записью второго.
+    second.refresh = lambda: False
+    first.create([2, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'низкий'])
+    second.set_status(second.get(1), 'выполнено')
+    del second.refresh
+    error_msg = 'Проверьте, что хранилище подхватывает изменения других'
+    assert second.refresh(), error_msg
+    assert [row['id'] for row in second.get_data()] == ['1', '2'], error_msg
+    assert second.get(1)['status'] == 'выполнено', error_msg
+    second.update(dict(second.get(2), title='new_title'))
+    error_msg = 'Проверьте, что свежие данные не перечитываются'
+    assert not second.refresh(), error_msg
+    for store in (first, second):
+        store.manager.close()
+
+
+def complete_tasks(filename: str, ids: list[int]) -> None:
+    repo = repository.CsvRepository(filename, use_log=False)
+    data = repo.read_all()
+    for id in ids:
+        repo.set_status(id, 'выполнено', data)
+        if repo.stale:
+            data = repo.read_all()
+        else:
+            data = [
+                dict(row, status='выполнено') if int(row['id']) == id
+                else row for row in data
+            ]
+
+
+@pytest.mark.skipif(
+    locking.fcntl is None
+    or 'fork' not in multiprocessing.get_all_start_methods(),
+    reason='нужны fcntl и fork'
+)
+def test_concurrent_processes(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    rows = [
+        dict(OLD_DATA[0], id=str(id), title=f'title {id}')
+        for id in range(1, 41)
+    ]
+    write_base(filename, rows)
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(
+            target=complete_tasks, args=(filename, list(range(i, 41, 4)))
+        )
+        for i in range(1, 5)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    error_msg = 'Проверьте, что одновременная запись не теряет изменения'
+    assert [row['status'] for row in read_file(filename)] == (
+        ['выполнено'] * 40
+    ), error_msg
+
+
+def update_binary_tasks(filename: str, ids: list[int], barrier) -> None:
+    with binstore.BinaryStorage(filename) as storage:
+        barrier.wait()
+        for id in ids:
+            for number in range(20):
+                storage.update(dict(
+                    OLD_DATA[0], id=str(id), title=f'title {id} {number}'
+                ))
+            storage.set_status(id, 'выполнено')
+
+
+@pytest.mark.skipif(
+    locking.fcntl is None
+    or 'fork' not in multiprocessing.get_all_start_methods(),
+    reason='нужны fcntl и fork'
+)
+def test_concurrent_binary_updates(tmp_path):
+    filename = str(tmp_path / 'data.tasks')
+    with binstore.BinaryStorage(filename) as storage:
+        storage.insert_many(
+            dict(OLD_DATA[0], id=str(id)) for id in range(1, 41)
+        )
+    context = multiprocessing.get_context('fork')
+    barrier = context.Barrier(4)
+    processes = [
+        context.Process(
+            target=update_binary_tasks,
+            args=(filename, list(range(i, 41, 4)), barrier),
+        )
+        for i in range(1, 5)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    error_msg = 'Проверьте, что одновременные изменения не портят строки'
+    with binstore.BinaryStorage(filename) as storage:
+        assert storage.read_all() == [
+            dict(
+                OLD_DATA[0], id=str(id), title=f'title {id} 19',
+                status='выполнено',
+            )
+            for id in range(1, 41)
+        ], error_msg
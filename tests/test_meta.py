@@ -0,0 +1,38 @@
+import os
+
+from .. import main, meta
+from .test_store import OLD_DATA, write_base
+
+
+def test_next_id_is_persisted(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    allocator = meta.IdAllocator(filename)
+    error_msg = 'Проверьте, что id выдаются по порядку, начиная с 1'
+    assert [allocator.next_id() for _ in range(3)] == [1, 2, 3], error_msg
+    error_msg = 'Проверьте, что наибольший выданный id сохраняется в файл'
+    assert meta.read_meta(filename) == {'high_water': 3}, error_msg
+    assert meta.IdAllocator(filename).next_id() == 4, error_msg
+
+
+def test_next_id_after_delete_and_out_of_order(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, [OLD_DATA[1], OLD_DATA[0]])
+    store = main.TaskStore(filename)
+    error_msg = ('Проверьте, что новый id больше наибольшего, ',
+                 'даже если задачи записаны не по порядку')
+    id = store.next_id()
+    assert id == 3, error_msg
+    store.create([id, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'низкий'])
+    store.delete({'id': 3})
+    error_msg = 'Проверьте, что id удаленной задачи не выдается повторно'
+    assert main.TaskStore(filename).next_id() == 4, error_msg
+
+
+def test_broken_meta_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    with open(meta.get_meta_name(filename), 'w') as file:
+        file.write('{')
+    error_msg = ('Проверьте, что поврежденный служебный файл '
+                 'не ломает выдачу id')
+    assert meta.IdAllocator(filename).next_id() == 1, error_msg
+    assert os.path.isfile(meta.get_meta_name(filename))
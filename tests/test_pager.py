@@ -0,0 +1,73 @@
+import builtins
+import io
+
+from .. import main, pager
+from .test_store import OLD_DATA, write_base
+
+
+def test_pages():
+    items = list(range(1, 11))
+    view = pager.Pager(items, page_size=4)
+    error_msg = 'Проверьте, что Pager делит элементы на страницы'
+    assert view.get_page() == [1, 2, 3, 4], error_msg
+    assert view.next() is True, error_msg
+    assert view.next() is True, error_msg
+    assert view.get_page() == [9, 10], error_msg
+    assert view.next() is False, error_msg
+    assert view.prev() is True, error_msg
+    assert view.get_page() == [5, 6, 7, 8], error_msg
+    error_msg = 'Проверьте, что страница запоминается по курсору'
+    items.insert(0, 0)
+    assert view.get_page() == [5, 6, 7, 8], error_msg
+    items.remove(5)
+    assert view.get_page() == [6, 7, 8, 9], error_msg
+    error_msg = 'Проверьте, что можно перейти к элементу по ключу'
+    view.jump(3)
+    assert view.get_page() == [3, 4, 6, 7], error_msg
+    assert view.prev() is True, error_msg
+    assert view.get_page() == [0, 1, 2, 3], error_msg
+
+
+def test_page_is_written_once():
+    view = pager.Pager(
+        [{'id': str(id)} for id in range(1, 100)], page_size=5,
+        key=lambda row: int(row.get('id')),
+    )
+    view.jump(50)
+    writes = []
+    out = io.StringIO()
+    out.write = writes.append
+    view.write_page(out)
+    error_msg = 'Проверьте, что страница выводится одной записью'
+    assert len(writes) == 1, error_msg
+    assert writes[0].count('\n') == 6, error_msg
+    assert writes[0].endswith('Задачи 50-54 из 99\n'), error_msg
+
+
+def test_store_ids(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, OLD_DATA[::-1])
+    store = main.TaskStore(filename)
+    error_msg = 'Проверьте, что хранилище хранит отсортированный список id'
+    assert store.ids == [1, 2], error_msg
+    store.create([3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'])
+    store.update(dict(store.get(1), title='new_title'))
+    store.delete({'id': 2})
+    assert store.ids == [1, 3], error_msg
+
+
+def test_show_all_by_pages(tmp_path, monkeypatch, capsys):
+    filename = str(tmp_path / 'data.csv')
+    rows = [dict(OLD_DATA[0], id=str(id)) for id in range(1, 46)]
+    write_base(filename, rows)
+    store = main.TaskStore(filename)
+    commands = iter(['', '40', 'назад', 'выход'])
+    monkeypatch.setattr(builtins, 'input', lambda _: next(commands))
+    main.run_command(store, '2')
+    output = capsys.readouterr().out
+    error_msg = 'Проверьте, что задачи выводятся по страницам'
+    assert output.count("'title'") == 20 + 20 + 6 + 20, error_msg
+    assert 'Задачи 1-20 из 45' in output, error_msg
+    assert 'Задачи 21-40 из 45' in output, error_msg
+    assert 'Задачи 40-45 из 45' in output, error_msg
+    assert 'Задачи 20-39 из 45' in output, error_msg
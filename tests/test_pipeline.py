@@ -0,0 +1,66 @@
+import csv
+import types
+
+from .. import journal, main, pipeline
+from .test_store import OLD_DATA, write_base
+
+
+def test_iter_tasks_is_lazy(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    tasks = pipeline.iter_tasks(filename)
+    error_msg = 'Проверьте, что iter_tasks возвращает генератор'
+    assert isinstance(tasks, types.GeneratorType), error_msg
+    assert next(tasks) == OLD_DATA[0], error_msg
+    tasks.close()
+
+
+def test_iter_tasks_replays_log(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    manager = main.TaskManager(use_log=True)
+    data = manager.read_all(filename)
+    manager.set_status(data, data[0], 'выполнено', filename)
+    manager.create_new_task(
+        [3, 'new', 'new_desc', 'test_cat2', '03-12-2024', 'высокий'], filename
+    )
+    manager.delete_tasks(data, {'category': 'test_cat2'}, filename)
+    manager.create_new_task(
+        [4, 'last', 'new_desc', 'test_cat2', '03-12-2024', 'высокий'], filename
+    )
+    manager.update_tasks(
+        data, dict(OLD_DATA[0], description='upd'), filename
+    )
+    error_msg = ('Проверьте, что потоковое чтение применяет журнал ',
+                 'так же, как read_all')
+    expected = manager.read_all(filename)
+    assert list(pipeline.iter_tasks(filename)) == expected, error_msg
+    assert [row['id'] for row in expected] == ['1', '4'], error_msg
+    journal.compact(filename)
+    assert list(pipeline.iter_tasks(filename)) == expected, error_msg
+
+
+def test_filters_and_export(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    tasks = pipeline.where(pipeline.iter_tasks(filename), category='test_cat2')
+    error_msg = 'Проверьте, что фильтр по полям работает'
+    assert list(tasks) == [OLD_DATA[1]], error_msg
+    tasks = pipeline.match_keyword(pipeline.iter_tasks(filename), 'TEST')
+    error_msg = 'Проверьте, что фильтр по ключевым словам работает'
+    assert list(pipeline.limit(tasks, 1)) == [OLD_DATA[0]], error_msg
+    export = str(tmp_path / 'export.csv')
+    count = pipeline.export_csv(pipeline.iter_tasks(filename), export)
+    with open(export, 'r', encoding='utf-8', newline='') as f:
+        reader = list(csv.DictReader(f))
+    error_msg = 'Проверьте, что выгрузка записывает все задачи'
+    assert count == 2 and reader == OLD_DATA, error_msg
+
+
+def test_cli(tmp_path, capsys):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    pipeline.main(['--file', filename, '--category', 'test_cat1'])
+    output = capsys.readouterr().out
+    error_msg = 'Проверьте, что командная строка выводит найденные задачи'
+    assert "'id': '1'" in output and "'id': '2'" not in output, error_msg
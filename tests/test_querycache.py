@@ -0,0 +1,89 @@
+import os
+
+from .. import main, querycache
+from .test_store import OLD_DATA, write_base
+
+
+def make_store(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    return main.TaskStore(filename), filename
+
+
+def test_normalize_params():
+    error_msg = 'Проверьте, что одинаковые запросы дают один ключ'
+    assert querycache.normalize_params(
+        {'keyword': 'Test  ИЛИ desc', 'category': 'a'}
+    ) == querycache.normalize_params(
+        {'category': 'a', 'keyword': 'test или desc'}
+    ), error_msg
+    assert querycache.normalize_params(
+        {'keyword': 'test desc'}
+    ) != querycache.normalize_params({'keyword': 'test или desc'}), error_msg
+
+
+def test_repeated_search_hits_cache(tmp_path):
+    store, _ = make_store(tmp_path)
+    first = store.search({'category': 'test_cat1'})
+    second = store.search({'category': 'test_cat1'})
+    error_msg = 'Проверьте, что повторный поиск берется из кэша'
+    assert first == second == [OLD_DATA[0]], error_msg
+    assert store.cache.get_stats() == {
+        'size': 1, 'hits': 1, 'misses': 1,
+    }, error_msg
+
+
+def test_targeted_invalidation(tmp_path):
+    store, _ = make_store(tmp_path)
+    store.create([3, 'new', 'new_desc', 'test_cat3', '03-12-2024', 'высокий'])
+    for params in ({'category': 'test_cat1'}, {'category': 'test_cat2'},
+                   {'category': 'test_cat3'}, {'keyword': 'new'}):
+        store.search(params)
+    store.update(dict(store.get(1), category='test_cat3'))
+    keys = [key[1] for key in store.cache.entries]
+    error_msg = ('Проверьте, что изменение категории удаляет из кэша ',
+                 'только результаты по старой и новой категории')
+    assert keys == [(('category', 'test_cat2'),), (('keyword', 'new'),)], (
+        error_msg
+    )
+    error_msg = 'Проверьте, что после изменения поиск возвращает новые данные'
+    result = store.search({'category': 'test_cat3'})
+    assert [row['id'] for row in result] == ['1', '3'], error_msg
+    assert store.search({'category': 'test_cat1'}) == [
+        'Такой задачи не существует'
+    ], error_msg
+    store.update(dict(store.get(2), title='renamed'))
+    error_msg = ('Проверьте, что изменение задачи не удаляет результаты ',
+                 'по словам, которых в ней нет')
+    assert (('keyword', 'new'),) in [key[1] for key in store.cache.entries], (
+        error_msg
+    )
+    store.delete({'id': 3})
+    error_msg = 'Проверьте, что удаление задачи удаляет результаты с ней'
+    assert store.search({'keyword': 'new'}) == [
+        'Такой задачи не существует'
+    ], error_msg
+
+
+def test_cache_size_limit():
+    cache = querycache.QueryCache(max_size=2)
+    for value in ('a', 'b', 'c'):
+        cache.put(cache.get_key({'category': value}), [1])
+    cache.get(cache.get_key({'category': 'b'}))
+    cache.put(cache.get_key({'category': 'd'}), [1])
+    error_msg = 'Проверьте, что кэш удаляет давно использованные результаты'
+    assert [key[1][0][1] for key in cache.entries] == ['b', 'd'], error_msg
+
+
+def test_reload_starts_new_generation(tmp_path):
+    store, filename = make_store(tmp_path)
+    store.search({'category': 'test_cat1'})
+    key = store.cache.get_key({'category': 'test_cat1'})
+    write_base(filename, OLD_DATA[1:])
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    store.refresh()
+    error_msg = 'Проверьте, что после перечитывания файла кэш очищается'
+    assert len(store.cache) == 0, error_msg
+    assert store.cache.put(key, [1]) == (1,), error_msg
+    assert len(store.cache) == 0, error_msg
@@ -0,0 +1,118 @@
+import os
+
+import pytest
+
+from .. import main
+from .test_store import OLD_DATA, read_file, write_base
+
+
+NEW_TASK = {
+    'id': '3',
+    'title': 'Купить Молоко',
+    'description': 'test_desc',
+    'category': 'test_cat2',
+    'date': '03-12-2024',
+    'prio': 'высокий',
+    'status': 'не выполнено'
+}
+
+
+@pytest.fixture(params=['csv', 'csv_log', 'binary', 'sqlite', 'sharded'])
+def repository(request, tmp_path):
+    if request.param.startswith('csv'):
+        filename = str(tmp_path / 'data.csv')
+        write_base(filename, [])
+        manager = main.TaskManager(
+            use_log=request.param == 'csv_log', backend='csv'
+        )
+    else:
+        filename = str(tmp_path / f'data.{request.param}')
+        manager = main.TaskManager(backend=request.param)
+    repository = manager.get_repository(filename)
+    yield repository
+    repository.close()
+
+
+def test_repository_reads(repository):
+    repository.insert_many(OLD_DATA)
+    repository.insert(NEW_TASK)
+    error_msg = 'Проверьте, что хранилище возвращает все задачи'
+    assert repository.read_all() == OLD_DATA + [NEW_TASK], error_msg
+    error_msg = 'Проверьте, что хранилище находит задачу по id'
+    assert repository.get(2) == OLD_DATA[1], error_msg
+    assert repository.get(5) is None, error_msg
+    error_msg = 'Проверьте, что поиск в хранилище работает'
+    assert repository.search({'category': 'test_cat2'}) == [
+        OLD_DATA[1], NEW_TASK
+    ], error_msg
+    assert repository.search(
+        {'category': 'test_cat2', 'prio': 'высокий'}
+    ) == [NEW_TASK], error_msg
+    assert repository.search({'keyword': 'молоко'}) == [NEW_TASK], error_msg
+    assert repository.search({'keyword': '%'}) == [], error_msg
+
+
+def test_repository_writes(repository):
+    repository.insert_many(OLD_DATA + [NEW_TASK])
+    signature = repository.get_signature()
+    repository.update(dict(OLD_DATA[0], title='new_title'))
+    repository.set_status(2, 'выполнено')
+    repository.delete(3)
+    error_msg = 'Проверьте, что изменения сохраняются в хранилище'
+    assert repository.read_all() == [
+        dict(OLD_DATA[0], title='new_title'),
+        dict(OLD_DATA[1], status='выполнено'),
+    ], error_msg
+    error_msg = 'Проверьте, что подпись хранилища меняется при записи'
+    assert repository.get_signature() != signature, error_msg
+    repository.delete_category('test_cat1')
+    assert [row['id'] for row in repository.read_all()] == ['2'], error_msg
+    repository.delete_many([2])
+    assert repository.read_all() == [], error_msg
+
+
+def test_store_with_sqlite(tmp_path):
+    filename = str(tmp_path / 'data.sqlite3')
+    main.check_file(filename, 'sqlite')
+    store = main.TaskStore(filename, main.TaskManager(backend='sqlite'))
+    store.create([store.next_id(), 'title', 'desc', 'cat', '02-12-2024',
+                  'низкий'])
+    store.set_status(store.get(1), 'выполнено')
+    error_msg = 'Проверьте, что TaskStore работает с базой данных sqlite'
+    reopened = main.TaskStore(filename, main.TaskManager(backend='sqlite'))
+    assert reopened.get(1)['status'] == 'выполнено', error_msg
+    wrong_file = str(tmp_path / 'wrong.sqlite3')
+    write_base(wrong_file)
+    with pytest.raises(main.FileError):
+        main.check_file(wrong_file, 'sqlite')
+
+
+def test_repository_write_batch(repository):
+    repository.insert_many(OLD_DATA)
+    repository.write_batch(
+        [NEW_TASK], [dict(OLD_DATA[0], title='new_title')], {2}
+    )
+    error_msg = 'Проверьте, что write_batch применяет все изменения'
+    assert repository.read_all() == [
+        dict(OLD_DATA[0], title='new_title'), NEW_TASK
+    ], error_msg
+
+
+def test_reorganize_csv(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename, [NEW_TASK] + OLD_DATA[::-1])
+    repository = main.TaskManager(use_log=True).get_repository(filename)
+    repository.set_status(3, 'выполнено')
+    error_msg = 'Проверьте, что файл сортируется по id и журнал сворачивается'
+    assert repository.get(1) == OLD_DATA[0], error_msg
+    assert repository.reorganize(run_size=1) == 3, error_msg
+    assert read_file(filename) == OLD_DATA + [
+        dict(NEW_TASK, status='выполнено')
+    ], error_msg
+    assert not os.path.exists(filename + '.log'), error_msg
+    assert repository.index.is_valid(), error_msg
+    repository.reorganize(['-prio'])
+    error_msg = 'Проверьте, что файл можно отсортировать по другому полю'
+    assert [row['id'] for row in read_file(filename)] == ['3', '1', '2'], (
+        error_msg
+    )
@@ -93,3 +93,8 @@ def test_search_params():
     assert len(found) == 1, error_msg
     error_msg = 'Проверьте, что поиск по ключевым словам работает правильно'
     assert found[0] == test_data[0], error_msg
+    found = main.TaskManager().search_params(
+        test_data, {'category': 'test_cat2', 'keyword': 'test_cat2'}
+    )
+    error_msg = 'Проверьте, что задача из нескольких поисков не повторяется'
+    assert [row['id'] for row in found] == ['2', '10'], error_msg
@@ -0,0 +1,270 @@
+import asyncio
+import json
+import threading
+
+from .. import main, server
+from .test_store import read_file, write_base
+
+
+NEW_TASK = {
+    'title': 'new',
+    'description': 'new_desc',
+    'category': 'test_cat3',
+    'date': '03-12-2024',
+    'prio': 'высокий',
+}
+
+
+def make_server(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    return server.TaskServer(main.TaskStore(filename)), filename
+
+
+def run(task_server, coroutine):
+    async def runner():
+        await task_server.start('127.0.0.1', 0)
+        try:
+            return await coroutine
+        finally:
+            await task_server.close()
+    return asyncio.run(runner())
+
+
+def test_read_requests(tmp_path):
+    task_server, _ = make_server(tmp_path)
+
+    async def requests():
+        return [
+            await task_server.handle('GET', '/tasks/2'),
+            await task_server.handle('GET', '/tasks/5'),
+            await task_server.handle('GET', '/tasks?offset=1&limit=1'),
+            await task_server.handle('GET', '/tasks?category=test_cat1'),
+            await task_server.handle('GET', '/tasks?category=missing'),
+            await task_server.handle('GET', '/tasks?limit=-1'),
+            await task_server.handle('GET', '/users'),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что сервер находит задачу по id'
+    assert results[0][0] == 200, error_msg
+    assert results[0][1]['id'] == '2', error_msg
+    assert results[1][0] == 404, error_msg
+    error_msg = 'Проверьте, что список задач делится на страницы'
+    assert results[2][1]['total'] == 2, error_msg
+    assert [row['id'] for row in results[2][1]['tasks']] == ['2'], error_msg
+    error_msg = 'Проверьте, что сервер ищет задачи по категории'
+    assert [row['id'] for row in results[3][1]['tasks']] == ['1'], error_msg
+    assert results[4][1]['tasks'] == [], error_msg
+    error_msg = 'Проверьте, что неверные запросы отклоняются'
+    assert results[5][0] == 400, error_msg
+    assert results[6][0] == 404, error_msg
+
+
+def test_write_requests(tmp_path):
+    task_server, filename = make_server(tmp_path)
+
+    async def requests():
+        body = json.dumps(NEW_TASK).encode('utf-8')
+        return [
+            await task_server.handle('POST', '/tasks', body),
+            await task_server.handle('PATCH', '/tasks/1', b'{"title": "t"}'),
+            await task_server.handle('POST', '/tasks/3/complete'),
+            await task_server.handle('DELETE', '/tasks/2'),
+            await task_server.handle('DELETE', '/tasks/2'),
+            await task_server.handle('POST', '/tasks', b'{"title": ""}'),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что сервер выполняет изменения'
+    assert results[0][0] == 201, error_msg
+    assert results[0][1]['id'] == '3', error_msg
+    assert results[1][1]['title'] == 't', error_msg
+    assert results[2][1]['status'] == 'выполнено', error_msg
+    assert results[3][0] == 204, error_msg
+    error_msg = 'Проверьте, что неверные изменения отклоняются'
+    assert results[4][0] == 404, error_msg
+    assert results[5][0] == 400, error_msg
+    error_msg = 'Проверьте, что изменения записываются в файл'
+    assert read_file(filename) == task_server.store.get_data(), error_msg
+    assert [row['id'] for row in read_file(filename)] == ['1', '3'], error_msg
+
+
+def test_concurrent_writes_are_batched(tmp_path):
+    task_server, filename = make_server(tmp_path)
+    repository = task_server.store.manager.get_repository(filename)
+    calls = []
+    write_batch = repository.write_batch
+
+    def counted(*args):
+        calls.append(args)
+        return write_batch(*args)
+    repository.write_batch = counted
+
+    async def requests():
+        body = json.dumps(NEW_TASK).encode('utf-8')
+        return await asyncio.gather(*(
+            task_server.handle('POST', '/tasks', body) for _ in range(50)
+        ))
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что одновременные изменения не теряются'
+    ids = sorted(int(result[1]['id']) for result in results)
+    assert ids == list(range(3, 53)), error_msg
+    assert len(read_file(filename)) == 52, error_msg
+    error_msg = 'Проверьте, что писатель записывает изменения пакетом'
+    assert len(calls) < 50, error_msg
+
+
+def test_failed_write_keeps_writer(tmp_path):
+    task_server, filename = make_server(tmp_path)
+    repository = task_server.store.manager.get_repository(filename)
+    write_batch = repository.write_batch
+
+    def failing(*args):
+        repository.write_batch = write_batch
+        raise RuntimeError('сбой записи')
+    repository.write_batch = failing
+
+    async def requests():
+        body = json.dumps(NEW_TASK).encode('utf-8')
+        return [
+            await asyncio.wait_for(
+                task_server.handle('POST', '/tasks', body), 5
+            ),
+            await asyncio.wait_for(
+                task_server.handle('POST', '/tasks', body), 5
+            ),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что ошибка записи возвращается с кодом 500'
+    assert results[0][0] == 500, error_msg
+    error_msg = 'Проверьте, что писатель работает после ошибки записи'
+    assert results[1][0] == 201, error_msg
+    assert [row['id'] for row in read_file(filename)] == ['1', '2', '4'], (
+        error_msg
+    )
+
+
+def test_reads_during_write(tmp_path):
+    task_server, filename = make_server(tmp_path)
+    repository = task_server.store.manager.get_repository(filename)
+    write_batch = repository.write_batch
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(*args):
+        started.set()
+        release.wait(5)
+        return write_batch(*args)
+    repository.write_batch = slow
+
+    async def requests():
+        body = json.dumps(NEW_TASK).encode('utf-8')
+        post = asyncio.create_task(task_server.handle('POST', '/tasks', body))
+        await asyncio.to_thread(started.wait, 5)
+        read = await task_server.handle('GET', '/tasks?offset=0&limit=10')
+        written = post.done()
+        release.set()
+        return read, written, await post
+    read, written, created = run(task_server, requests())
+    error_msg = 'Проверьте, что чтение не ждет записи в файл'
+    assert written is False, error_msg
+    assert read[0] == 200, error_msg
+    assert read[1]['total'] == 2, error_msg
+    error_msg = 'Проверьте, что задача добавляется после записи'
+    assert created[0] == 201, error_msg
+    assert len(task_server.store) == 3, error_msg
+    assert [row['id'] for row in read_file(filename)] == ['1', '2', '3'], (
+        error_msg
+    )
+
+
+def test_http_connection(tmp_path):
+    task_server, _ = make_server(tmp_path)
+
+    async def request():
+        http = await task_server.start('127.0.0.1', 0)
+        port = http.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        responses = []
+        for path in ('/tasks/1', '/tasks?limit=1'):
+            writer.write(f'GET {path} HTTP/1.1\r\nHost: test\r\n\r\n'.encode())
+            await writer.drain()
+            status = await reader.readline()
+            headers = {}
+            while (line := await reader.readline()) != b'\r\n':
+                name, _, value = line.decode().partition(':')
+                headers[name.lower()] = value.strip()
+            body = await reader.readexactly(int(headers['content-length']))
+            responses.append((status, json.loads(body)))
+        writer.close()
+        http.close()
+        await http.wait_closed()
+        await task_server.close()
+        return responses
+    responses = asyncio.run(request())
+    error_msg = 'Проверьте, что сервер отвечает на запросы по HTTP'
+    assert responses[0][0].startswith(b'HTTP/1.1 200'), error_msg
+    assert responses[0][1]['id'] == '1', error_msg
+    error_msg = 'Проверьте, что соединение используется повторно'
+    assert responses[1][1]['total'] == 2, error_msg
+
+
+def test_search_by_deadline(tmp_path):
+    task_server, _ = make_server(tmp_path)
+
+    async def requests():
+        return [
+            await task_server.handle(
+                'GET', '/tasks?due=01-12-2024+02-12-2024&status=выполнено'
+            ),
+            await task_server.handle('GET', '/tasks?due=overdue&limit=1'),
+            await task_server.handle('GET', '/tasks?due=скоро'),
+            await task_server.handle('GET', '/tasks?due=7&category=test'),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что сервер ищет задачи по сроку'
+    assert results[0][1]['tasks'] == [], error_msg
+    assert results[1][1]['total'] == 2, error_msg
+    assert [row['id'] for row in results[1][1]['tasks']] == ['1'], error_msg
+    error_msg = 'Проверьте, что неверный поиск по сроку отклоняется'
+    assert results[2][0] == 400, error_msg
+    assert results[3][0] == 400, error_msg
+
+
+def test_cursor_pagination(tmp_path):
+    task_server, _ = make_server(tmp_path)
+
+    async def requests():
+        return [
+            await task_server.handle('GET', '/tasks?after=0&limit=1'),
+            await task_server.handle('GET', '/tasks?after=1&limit=1'),
+            await task_server.handle('GET', '/tasks?after=1&offset=1'),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что список задач делится на страницы по курсору'
+    assert [row['id'] for row in results[0][1]['tasks']] == ['1'], error_msg
+    assert results[0][1]['next'] == 1, error_msg
+    assert [row['id'] for row in results[1][1]['tasks']] == ['2'], error_msg
+    assert results[1][1]['next'] is None, error_msg
+    assert results[2][0] == 400, error_msg
+
+
+def test_search_archive(tmp_path):
+    task_server, _ = make_server(tmp_path)
+    store = task_server.store
+    store.set_status(dict(store.get(1)), 'выполнено')
+    store.archive(days=0)
+
+    async def requests():
+        return [
+            await task_server.handle('GET', '/tasks?status=выполнено'),
+            await task_server.handle('GET', '/tasks?keyword=test&archive=1'),
+            await task_server.handle('GET', '/tasks?keyword=test&archive=0'),
+            await task_server.handle('GET', '/tasks?archive=1'),
+        ]
+    results = run(task_server, requests())
+    error_msg = 'Проверьте, что сервер ищет задачи в архиве'
+    assert [row['id'] for row in results[0][1]['tasks']] == ['1'], error_msg
+    assert results[1][1]['total'] == 2, error_msg
+    assert results[2][1]['total'] == 1, error_msg
+    error_msg = 'Проверьте, что архив нельзя запросить без поиска'
+    assert results[3][0] == 400, error_msg
@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+from .. import main, shards
+from .test_store import OLD_DATA, write_base
+
+
+NEW_TASK = dict(OLD_DATA[1], id='3', title='new')
+
+
+def read_manifest(filename):
+    with open(os.path.join(filename, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)['shards']
+
+
+def test_shard_per_category(tmp_path):
+    filename = str(tmp_path / 'data.shards')
+    with shards.ShardedRepository(filename) as storage:
+        storage.insert_many(OLD_DATA + [NEW_TASK])
+        manifest = read_manifest(filename)
+        error_msg = 'Проверьте, что у каждой категории свой файл'
+        assert sorted(manifest) == ['test_cat1', 'test_cat2'], error_msg
+        assert manifest['test_cat2']['count'] == 2, error_msg
+        assert manifest['test_cat2']['min_id'] == 2, error_msg
+        assert manifest['test_cat2']['max_id'] == 3, error_msg
+        storage.update(dict(OLD_DATA[0], category='test_cat2'))
+        manifest = read_manifest(filename)
+        error_msg = 'Проверьте, что задача переносится в шард новой категории'
+        assert list(manifest) == ['test_cat2'], error_msg
+        assert manifest['test_cat2']['min_id'] == 1, error_msg
+        assert storage.search({'category': 'test_cat2'})[0]['id'] == '1', (
+            error_msg
+        )
+        shard = os.path.join(filename, manifest['test_cat2']['file'])
+        storage.delete_category('test_cat2')
+        error_msg = 'Проверьте, что удаление категории удаляет ее файл'
+        assert not os.path.exists(shard), error_msg
+        assert read_manifest(filename) == {}, error_msg
+        assert storage.read_all() == [], error_msg
+
+
+def test_search_reads_one_shard(tmp_path, monkeypatch):
+    filename = str(tmp_path / 'data.shards')
+    storage = shards.ShardedRepository(filename, workers=2)
+    storage.insert_many(OLD_DATA + [NEW_TASK])
+    read = []
+    read_shard = storage._read_shard
+
+    def counted(info):
+        read.append(info['file'])
+        return read_shard(info)
+    monkeypatch.setattr(storage, '_read_shard', counted)
+    error_msg = 'Проверьте, что поиск по категории читает один файл'
+    assert storage.search({'category': 'test_cat1'}) == [OLD_DATA[0]], (
+        error_msg
+    )
+    assert len(read) == 1, error_msg
+    error_msg = 'Проверьте, что задача по id ищется по диапазонам id'
+    assert storage.get(3) == NEW_TASK, error_msg
+    assert len(read) == 2, error_msg
+    error_msg = 'Проверьте, что все файлы читаются в нескольких потоках'
+    assert storage.read_all() == OLD_DATA + [NEW_TASK], error_msg
+    assert len(read) == 4, error_msg
+
+
+def test_import_export(tmp_path):
+    csv_filename = str(tmp_path / 'data.csv')
+    filename = str(tmp_path / 'data.shards')
+    write_base(csv_filename)
+    with shards.ShardedRepository.import_csv(csv_filename, filename) as st:
+        error_msg = 'Проверьте, что задачи переносятся из csv файла'
+        assert st.read_all() == OLD_DATA, error_msg
+        assert st.export_csv(str(tmp_path / 'out.csv')) == 2, error_msg
+    wrong_file = str(tmp_path / 'wrong.shards')
+    write_base(wrong_file)
+    with pytest.raises(main.FileError):
+        main.check_file(wrong_file, 'sharded')
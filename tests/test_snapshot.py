@@ -0,0 +1,85 @@
+import os
+import pickle
+
+from .. import main
+from .test_store import OLD_DATA, write_base
+
+
+def make_store(filename, reads=None):
+    manager = main.TaskManager(use_log=False)
+    if reads is not None:
+        read_all = manager.read_all
+        manager.read_all = lambda *args: reads.append(1) or read_all(*args)
+    return main.TaskStore(filename, manager, snapshot_min_tasks=1)
+
+
+def touch(filename):
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+
+def test_snapshot_is_reused(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = make_store(filename)
+    store.save_indexes()
+    error_msg = 'Проверьте, что снимок записывается рядом с файлом данных'
+    assert os.path.isfile(store.snapshot.name), error_msg
+    reads = []
+    reopened = make_store(filename, reads)
+    error_msg = 'Проверьте, что при запуске загружается снимок, а не файл'
+    assert reopened.get(1) == OLD_DATA[0], error_msg
+    assert reads == [], error_msg
+    assert [row['id'] for row in reopened.search({'keyword': 'test'})] == [
+        '1', '2'
+    ], error_msg
+    assert [row['id'] for row in reopened.search_dates()] == ['1', '2'], (
+        error_msg
+    )
+    assert reopened.next_id() == 3, error_msg
+
+
+def test_snapshot_after_changes(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = make_store(filename)
+    store.create([3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'])
+    store.delete({'id': 1})
+    store.save_indexes()
+    reads = []
+    reopened = make_store(filename, reads)
+    error_msg = 'Проверьте, что при выходе снимок обновляется'
+    assert sorted(reopened.tasks) == [2, 3], error_msg
+    assert reopened.has_value('category', 'test_cat1'), error_msg
+    assert reads == [], error_msg
+
+
+def test_stale_snapshot_is_rebuilt(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    make_store(filename).save_indexes()
+    write_base(filename, OLD_DATA[:1])
+    touch(filename)
+    reads = []
+    reopened = make_store(filename, reads)
+    error_msg = 'Проверьте, что устаревший снимок не загружается'
+    assert sorted(reopened.tasks) == [1], error_msg
+    assert reads == [1], error_msg
+    reopened.save_indexes()
+    error_msg = 'Проверьте, что снимок записывается заново'
+    assert sorted(make_store(filename, reads).tasks) == [1], error_msg
+    assert reads == [1], error_msg
+
+
+def test_broken_snapshot(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = make_store(filename)
+    store.save_indexes()
+    with open(store.snapshot.name, 'wb') as file:
+        pickle.dump(store.snapshot.get_tag(store._signature), file)
+    reads = []
+    reopened = make_store(filename, reads)
+    error_msg = 'Проверьте, что при поврежденном снимке читается файл'
+    assert sorted(reopened.tasks) == [1, 2], error_msg
+    assert reads == [1], error_msg
@@ -0,0 +1,62 @@
+import csv
+import os
+
+from .. import sorting
+
+
+TEST_DATA = [
+    {'id': '3', 'date': '01-01-2025', 'prio': 'низкий', 'status': 'выполнено'},
+    {'id': '10', 'date': '02-12-2024', 'prio': 'высокий',
+     'status': 'не выполнено'},
+    {'id': '2', 'date': '01-01-2025', 'prio': 'высокий',
+     'status': 'не выполнено'},
+    {'id': '1', 'date': '15-06-2024', 'prio': 'средний',
+     'status': 'выполнено'},
+]
+
+
+def get_ids(data):
+    return [int(row['id']) for row in data]
+
+
+def test_sort_rows_by_date():
+    error_msg = 'Проверьте, что даты сравниваются как даты, а не как строки'
+    result = sorting.sort_rows(TEST_DATA, ['date'])
+    assert get_ids(result) == [1, 10, 3, 2], error_msg
+
+
+def test_sort_rows_multiple_keys():
+    error_msg = 'Проверьте, что сортировка по нескольким полям работает'
+    result = sorting.sort_rows(TEST_DATA, ['-prio', 'id'])
+    assert get_ids(result) == [2, 10, 1, 3], error_msg
+    result = sorting.sort_rows(TEST_DATA, ['status', '-date'])
+    assert get_ids(result) == [2, 10, 3, 1], error_msg
+
+
+def test_sort_rows_is_stable_and_does_not_copy():
+    result = sorting.sort_rows(TEST_DATA, ['-date'])
+    error_msg = 'Проверьте, что сортировка устойчивая'
+    assert get_ids(result) == [3, 2, 10, 1], error_msg
+    error_msg = 'Проверьте, что словари задач не копируются'
+    assert all(
+        any(row is item for item in TEST_DATA) for row in result
+    ), error_msg
+    assert get_ids(TEST_DATA) == [3, 10, 2, 1], error_msg
+
+
+def test_external_sort(tmp_path):
+    rows = [
+        dict(row, title=f'task {row["id"]}', description='', category='c')
+        for row in TEST_DATA * 3
+    ]
+    target = str(tmp_path / 'sorted.csv')
+    error_msg = 'Проверьте, что внешняя сортировка сливает все части'
+    assert sorting.external_sort(rows, target, ['-date', 'id'],
+                                 run_size=2) == 12, error_msg
+    with open(target, encoding='utf-8', newline='') as file:
+        result = list(csv.DictReader(file))
+    assert result == sorting.sort_rows(rows, ['-date', 'id']), error_msg
+    assert os.listdir(tmp_path) == ['sorted.csv'], error_msg
+    error_msg = 'Проверьте, что часть ограничена по размеру строк'
+    runs = list(sorting.iter_runs(rows, run_size=100, run_memory=40))
+    assert [len(run) for run in runs] == [2] * 6, error_msg
@@ -0,0 +1,114 @@
+import csv
+import os
+
+import pytest
+
+from .. import main
+from ..settings import FIELD_NAMES
+
+
+OLD_DATA = [
+    {
+        'id': '1',
+        'title': 'test_title',
+        'description': 'test_desc',
+        'category': 'test_cat1',
+        'date': '02-12-2024',
+        'prio': 'низкий',
+        'status': 'не выполнено'
+    },
+    {
+        'id': '2',
+        'title': 'test_title',
+        'description': 'test_desc',
+        'category': 'test_cat2',
+        'date': '02-12-2024',
+        'prio': 'низкий',
+        'status': 'не выполнено'
+    }
+]
+
+
+def write_base(filename, data=OLD_DATA):
+    with open(filename, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, FIELD_NAMES)
+        writer.writeheader()
+        for row in data:
+            writer.writerow(row)
+
+
+def read_file(filename):
+    with open(filename, 'r', encoding='utf-8', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def test_store_get(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    error_msg = 'Проверьте, что хранилище находит задачу по id'
+    assert store.get(2) == OLD_DATA[1], error_msg
+    assert type(store.get(5)) is str, error_msg
+    error_msg = 'Проверьте, что неизмененный файл не перечитывается'
+    assert store.refresh() is False, error_msg
+
+
+def test_store_reloads_changed_file(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    write_base(filename, OLD_DATA[:1])
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    error_msg = 'Проверьте, что измененный файл перечитывается'
+    assert store.refresh() is True, error_msg
+    assert len(store) == 1, error_msg
+
+
+def test_store_writes(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    store.create([3, 'new', 'new_desc', 'test_cat1', '03-12-2024', 'высокий'])
+    task = dict(store.get(1), title='new_title')
+    store.update(task)
+    store.set_status(dict(store.get(3)), 'выполнено')
+    store.delete({'category': 'test_cat2'})
+    error_msg = ('Проверьте, что изменения хранилища ',
+                 'совпадают с данными в файле')
+    assert store.get_data() == read_file(filename), error_msg
+    assert [row['id'] for row in store.get_data()] == ['1', '3'], error_msg
+    assert store.get(1)['title'] == 'new_title', error_msg
+    assert store.get(3)['status'] == 'выполнено', error_msg
+    error_msg = ('Проверьте, что после собственной записи ',
+                 'хранилище не перечитывает файл')
+    assert store.refresh() is False, error_msg
+
+
+def test_failed_write_keeps_store(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename)
+    repository = store.manager.get_repository(filename)
+
+    def failing(*args):
+        raise OSError('диск переполнен')
+    repository.update = failing
+    with pytest.raises(OSError):
+        store.update(dict(store.get(1), title='new_title'))
+    error_msg = 'Проверьте, что неудачная запись не меняет хранилище'
+    assert store.get(1)['title'] == 'test_title', error_msg
+    assert store.search({'keyword': 'new_title'}) == [
+        'Такой задачи не существует'
+    ], error_msg
+
+
+def test_store_in_log_mode(tmp_path):
+    filename = str(tmp_path / 'data.csv')
+    write_base(filename)
+    store = main.TaskStore(filename, main.TaskManager(use_log=True))
+    store.delete({'id': 1})
+    store.set_status(dict(store.get(2)), 'выполнено')
+    error_msg = 'Проверьте, что хранилище работает в режиме журнала'
+    assert main.TaskManager().read_all(filename) == store.get_data(), error_msg
+    assert store.refresh() is False, error_msg
@@ -0,0 +1,50 @@
+import pytest
+
+from .. import main
+from .test_store import OLD_DATA
+
+
+def test_task_is_compact():
+    task = main.Task.from_row(OLD_DATA[0])
+    error_msg = 'Проверьте, что Task не хранит атрибуты в __dict__'
+    assert not hasattr(task, '__dict__'), error_msg
+    with pytest.raises(AttributeError):
+        task.extra = 1
+    error_msg = 'Проверьте, что id, приоритет, статус и дата хранятся в кодах'
+    assert task.id == 1, error_msg
+    assert type(task._prio) is int, error_msg
+    assert type(task._status) is int, error_msg
+    assert type(task._date) is int, error_msg
+
+
+def test_task_as_dict():
+    task = main.Task.from_row(OLD_DATA[0])
+    error_msg = 'Проверьте, что Task равен словарю с теми же данными'
+    assert task == OLD_DATA[0], error_msg
+    assert task.get_dict() == OLD_DATA[0], error_msg
+    assert task.get('id') == '1', error_msg
+    assert task.get('unknown') is None, error_msg
+    task['status'] = 'выполнено'
+    error_msg = 'Проверьте, что поля Task можно изменять как в словаре'
+    assert task['status'] == 'выполнено', error_msg
+    with pytest.raises(KeyError):
+        task['unknown'] = 1
+
+
+def test_task_keeps_unknown_values():
+    task = main.Task(1, 'title', 'desc', 'cat', '2-12-2024', 'срочный')
+    error_msg = 'Проверьте, что нестандартные значения сохраняются как есть'
+    assert task.date == '2-12-2024', error_msg
+    assert task.prio == 'срочный', error_msg
+
+
+def test_manager_works_with_tasks():
+    data = [main.Task.from_row(row) for row in OLD_DATA]
+    manager = main.TaskManager()
+    error_msg = 'Проверьте, что TaskManager работает со списком Task'
+    assert manager.search_id(data, 2) is data[1], error_msg
+    assert manager.search_params(data, {'category': 'test_cat2'}) == [
+        data[1]
+    ], error_msg
+    assert manager.search_params(data, {'keyword': 'desc'}) == data, error_msg
+    assert main.get_id(data) == 3, error_msg
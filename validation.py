@@ -0,0 +1,78 @@
+'''
+Проверка значений полей задачи.
+
+Используется при вводе задач в главном меню (AskUser) и при пакетной
+обработке (batch.py), поэтому правила везде одинаковые.
+'''
+
+from collections.abc import Mapping
+from datetime import datetime
+
+from settings import PRIORITIES, STATUSES
+
+
+# Поля, которые пользователь заполняет при создании задачи.
+TASK_FIELDS = ('title', 'description', 'category', 'date', 'prio')
+
+ERRORS = {
+    'title': 'У задания должно быть название!',
+    'description': 'У задания должно быть описание!',
+    'category': 'У задания должна быть категория!',
+    'date': 'Срок выполнения указан неверно!',
+    'prio': 'Приоритет может быть низким средним или высоким!',
+    'status': 'Статус может быть "выполнено" или "не выполнено"!',
+}
+
+
+def is_valid_date(value: str) -> bool:
+    '''Проверяет, что дата указана в формате DD-MM-YYYY.'''
+
+    try:
+        datetime.strptime(value, '%d-%m-%Y')
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
+def check_field(field: str, value) -> str | None:
+    '''
+    Проверяет значение поля задачи.
+
+    Аргументы:
+        field: название поля из ERRORS.
+        value: значение поля.
+
+    Возвращает:
+        сообщение об ошибке или None, если значение верное.
+    '''
+
+    if field == 'date':
+        valid = is_valid_date(value)
+    elif field == 'prio':
+        valid = value in PRIORITIES
+    elif field == 'status':
+        valid = value in STATUSES
+    elif field in ERRORS:
+        valid = isinstance(value, str) and value != ''
+    else:
+        return f'Такого поля "{field}" не существует'
+    return None if valid else ERRORS[field]
+
+
+def validate_task(
+        row: Mapping,
+        fields: tuple[str, ...] = TASK_FIELDS,
+        ) -> list[str]:
+    '''
+    Проверяет указанные поля задачи.
+
+    Возвращает:
+        список сообщений об ошибках, пустой, если ошибок нет.
+    '''
+
+    errors = []
+    for field in fields:
+        error = check_field(field, row.get(field))
+        if error is not None:
+            errors.append(error)
+    return errors